@@ -0,0 +1,213 @@
+import functools
+import hashlib
+import inspect
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .instrumentation import registrar_cache
+
+
+# Valor centinela: permite cachear resultados None
+_NADA = object()
+
+
+class LRUCache:
+    """
+    Caché acotada en memoria del proceso (primer nivel).
+
+    Cada entrada guarda su vencimiento; al superar `max_items` se descarta la
+    menos usada recientemente.
+    """
+
+    def __init__(self, max_items):
+        self.max_items = max_items
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return _NADA
+            valor, vence = entrada
+            if vence is not None and vence < time.monotonic():
+                del self._datos[clave]
+                return _NADA
+            self._datos.move_to_end(clave)
+            return valor
+
+    def set(self, clave, valor, ttl=None):
+        with self._lock:
+            self._datos[clave] = (valor, time.monotonic() + ttl if ttl else None)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_items:
+                self._datos.popitem(last=False)
+
+    def delete(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def clear(self):
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self):
+        return len(self._datos)
+
+
+class TwoTierCache:
+    """
+    Caché de dos niveles: un LRU por proceso delante del backend compartido
+    de Django (CACHES['default']: Redis en producción, locmem o archivos en
+    local).
+
+    Las claves viven en espacios de nombres versionados: invalidar un espacio
+    incrementa su versión en el backend compartido, con lo que todas sus
+    claves quedan obsoletas en todos los workers sin recorrerlas. Cada worker
+    consulta la versión como mucho cada CACHE_VERSION_TTL segundos.
+    """
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+        self.local = LRUCache(settings.CACHE_LOCAL_MAX_ITEMS)
+        self._versiones = LRUCache(1024)
+        self._contadores = {'hits_local': 0, 'hits_compartido': 0, 'misses': 0, 'sets': 0}
+        self._lock = threading.Lock()
+
+    @property
+    def compartido(self):
+        return caches[self.alias]
+
+    def get(self, namespace, clave, default=None):
+        completa = self._clave(namespace, clave)
+
+        valor = self.local.get(completa)
+        if valor is not _NADA:
+            self._contar('hits_local')
+            registrar_cache(acierto=True)
+            return valor
+
+        valor = self.compartido.get(completa, _NADA)
+        if valor is not _NADA:
+            self._contar('hits_compartido')
+            registrar_cache(acierto=True)
+            self.local.set(completa, valor, settings.CACHE_LOCAL_TTL)
+            return valor
+
+        self._contar('misses')
+        registrar_cache(acierto=False)
+        return default
+
+    def set(self, namespace, clave, valor, ttl=None):
+        completa = self._clave(namespace, clave)
+        ttl = ttl or settings.CACHE_DEFAULT_TTL
+
+        self.compartido.set(completa, valor, ttl)
+        self.local.set(completa, valor, min(ttl, settings.CACHE_LOCAL_TTL))
+        self._contar('sets')
+
+    def get_or_set(self, namespace, clave, calcular, ttl=None):
+        valor = self.get(namespace, clave, _NADA)
+        if valor is _NADA:
+            valor = calcular()
+            self.set(namespace, clave, valor, ttl)
+        return valor
+
+    def delete(self, namespace, clave):
+        completa = self._clave(namespace, clave)
+        self.compartido.delete(completa)
+        self.local.delete(completa)
+
+    def invalidar(self, namespace):
+        """
+        Invalida todas las claves del espacio de nombres en todos los workers
+        """
+        clave_version = self._clave_version(namespace)
+        try:
+            self.compartido.incr(clave_version)
+        except ValueError:
+            self.compartido.set(clave_version, 2, None)
+        self._versiones.delete(clave_version)
+
+    def estadisticas(self):
+        with self._lock:
+            contadores = dict(self._contadores)
+        consultas = contadores['hits_local'] + contadores['hits_compartido'] + contadores['misses']
+        contadores['hit_ratio'] = (
+            round((contadores['hits_local'] + contadores['hits_compartido']) / consultas, 4)
+            if consultas else None
+        )
+        contadores['items_local'] = len(self.local)
+        contadores['backend'] = settings.CACHES[self.alias]['BACKEND']
+        return contadores
+
+    def limpiar_local(self):
+        self.local.clear()
+        self._versiones.clear()
+
+    def _clave(self, namespace, clave):
+        return f'{namespace}:v{self._version(namespace)}:{clave}'
+
+    def _clave_version(self, namespace):
+        return f'ns:{namespace}:version'
+
+    def _version(self, namespace):
+        clave_version = self._clave_version(namespace)
+        version = self._versiones.get(clave_version)
+        if version is _NADA:
+            version = self.compartido.get(clave_version)
+            if version is None:
+                version = 1
+                self.compartido.add(clave_version, version, None)
+            self._versiones.set(clave_version, version, settings.CACHE_VERSION_TTL)
+        return version
+
+    def _contar(self, contador):
+        with self._lock:
+            self._contadores[contador] += 1
+
+
+# Instancia compartida por el proceso
+cache = TwoTierCache()
+
+
+def cached(namespace, ttl=None, clave=None):
+    """
+    Decorador que cachea el resultado de una función o método de servicio.
+
+    La clave se arma con el nombre de la función y sus argumentos (sin
+    `self`/`cls`), o con `clave(*args, **kwargs)` si se indica.
+
+    Uso:
+        @cached('ia_modelo', ttl=300)
+        def obtener_metricas_modelo_activo(self): ...
+
+        cache.invalidar('ia_modelo')
+    """
+    def decorador(funcion):
+        parametros = list(inspect.signature(funcion).parameters)
+        omitir_primero = bool(parametros) and parametros[0] in ('self', 'cls')
+        nombre = f'{funcion.__module__}.{funcion.__qualname__}'
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if clave is not None:
+                sufijo = clave(*args, **kwargs)
+            else:
+                argumentos = args[1:] if omitir_primero else args
+                sufijo = hashlib.md5(
+                    repr((argumentos, sorted(kwargs.items()))).encode()
+                ).hexdigest()
+
+            return cache.get_or_set(
+                namespace, f'{nombre}:{sufijo}', lambda: funcion(*args, **kwargs), ttl
+            )
+
+        envoltura.sin_cache = funcion
+        return envoltura
+
+    return decorador
@@ -0,0 +1,96 @@
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+# Medición de la petición en curso (None fuera de PerformanceMiddleware)
+medicion_actual = ContextVar('medicion_actual', default=None)
+
+# Literales y listas de parámetros que no cambian la "forma" de una consulta
+_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTAS = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+
+
+class MedicionPeticion:
+    """
+    Acumuladores de una petición: consultas SQL, caché y serialización
+    """
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.tiempo_db = 0.0
+        self.formas_sql = Counter()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.tiempo_serializacion = 0.0
+        self.consultas_lentas = []
+
+    def ejecutar_sql(self, execute, sql, params, many, context):
+        """
+        execute_wrapper de Django: cuenta y mide cada consulta
+        """
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            self.tiempo_db += duracion
+            self.consultas += 1
+            self.formas_sql[forma_sql(sql)] += 1
+
+            # Captura opcional de consultas lentas (DB_SLOW_QUERY_MS = 0 la desactiva)
+            if settings.DB_SLOW_QUERY_MS and duracion * 1000 >= settings.DB_SLOW_QUERY_MS:
+                self.consultas_lentas.append(
+                    (context['connection'].alias, sql, params, many, duracion * 1000)
+                )
+
+    def posibles_n_mas_1(self, umbral):
+        """
+        Formas de consulta repetidas al menos `umbral` veces
+        """
+        return [
+            {'sql': sql[:300], 'repeticiones': veces}
+            for sql, veces in self.formas_sql.most_common()
+            if veces >= umbral
+        ]
+
+
+def forma_sql(sql):
+    """
+    Normaliza una consulta a su forma: sin literales y con las listas IN
+    colapsadas, para que la misma consulta con distintos valores coincida
+    """
+    sql = _LITERALES.sub('?', sql)
+    return _LISTAS.sub('(%s...)', sql)
+
+
+def registrar_cache(acierto):
+    medicion = medicion_actual.get()
+    if medicion is not None:
+        if acierto:
+            medicion.cache_hits += 1
+        else:
+            medicion.cache_misses += 1
+
+
+@contextmanager
+def medir_serializacion():
+    """
+    Suma a la petición en curso el tiempo de generar el cuerpo de la
+    respuesta (lo usan los renderers de apps.core.renderers)
+    """
+    medicion = medicion_actual.get()
+    if medicion is None:
+        yield
+        return
+
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        medicion.tiempo_serializacion += time.perf_counter() - inicio
@@ -0,0 +1,91 @@
+"""
+Management command para medir peticiones por segundo de endpoints de la API
+Uso: python manage.py benchmark_endpoints [--url /api/productos/ ...] [--peticiones 200] [--concurrencia 4]
+
+Compara la configuración de conexiones ejecutándolo con distintas variables:
+    DB_CONN_MAX_AGE=0 python manage.py benchmark_endpoints
+    DB_CONN_MAX_AGE=60 python manage.py benchmark_endpoints
+    DB_POOL=true python manage.py benchmark_endpoints
+"""
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from django.test import Client
+
+
+class Command(BaseCommand):
+    help = 'Mide peticiones/segundo y latencia de endpoints (por defecto, el catálogo)'
+
+    URLS_CATALOGO = ['/api/productos/', '/api/categorias/', '/api/producto-variante/']
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', action='append', dest='urls', help='Endpoint a medir (repetible)')
+        parser.add_argument('--peticiones', type=int, default=200, help='Peticiones por endpoint (default: 200)')
+        parser.add_argument('--concurrencia', type=int, default=4, help='Hilos simultáneos (default: 4)')
+
+    def handle(self, *args, **options):
+        db = settings.DATABASES['default']
+        pool = db.get('OPTIONS', {}).get('pool')
+        self.stdout.write(self.style.WARNING('⏱️ Benchmark de endpoints'))
+        self.stdout.write(
+            f"   Motor: {db['ENGINE']} | CONN_MAX_AGE: {db.get('CONN_MAX_AGE', 0)} | "
+            f"health checks: {db.get('CONN_HEALTH_CHECKS', False)} | "
+            f"pool: {pool or 'no'}"
+        )
+        self.stdout.write(f"   {options['peticiones']} peticiones x {options['concurrencia']} hilos")
+        self.stdout.write('')
+
+        for url in options['urls'] or self.URLS_CATALOGO:
+            resultado = self._medir(url, options['peticiones'], options['concurrencia'])
+            self.stdout.write(
+                f"{url:<35} {resultado['rps']:>8.1f} req/s   "
+                f"p50 {resultado['p50']:>7.2f} ms   p95 {resultado['p95']:>7.2f} ms   "
+                f"errores {resultado['errores']}"
+            )
+
+    def _medir(self, url, peticiones, concurrencia):
+        latencias = []
+        errores = []
+        lock = threading.Lock()
+        por_hilo = [peticiones // concurrencia + (1 if i < peticiones % concurrencia else 0)
+                    for i in range(concurrencia)]
+
+        def trabajar(cantidad):
+            # Cada hilo tiene su propia conexión, como un worker. El test client
+            # desconecta close_old_connections de request_started/finished, así
+            # que se llama aquí, como lo haría el handler real, para que
+            # CONN_MAX_AGE y el pool se comporten igual que en producción
+            client = Client()
+            try:
+                for _ in range(cantidad):
+                    inicio = time.perf_counter()
+                    close_old_connections()
+                    respuesta = client.get(url)
+                    close_old_connections()
+                    duracion = (time.perf_counter() - inicio) * 1000
+                    with lock:
+                        latencias.append(duracion)
+                        if respuesta.status_code >= 400:
+                            errores.append(respuesta.status_code)
+            finally:
+                connections.close_all()
+
+        hilos = [threading.Thread(target=trabajar, args=(n,)) for n in por_hilo]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        total = time.perf_counter() - inicio
+
+        latencias.sort()
+        return {
+            'rps': len(latencias) / total if total else 0,
+            'p50': statistics.median(latencias) if latencias else 0,
+            'p95': latencias[int(len(latencias) * 0.95) - 1] if latencias else 0,
+            'errores': len(errores),
+        }
@@ -0,0 +1,66 @@
+"""
+Management command para generar ventas sintéticas de alto volumen (benchmarks)
+Uso: python manage.py generate_synthetic_data [--ventas 100000] [--clientes N] [--productos 200]
+                                              [--dias 730] [--credito 0.3] [--semilla 42]
+                                              [--lote 50000] [--limpiar]
+
+Genera Venta, DetalleVenta, CuotaCredito y Pago (más el catálogo y los
+usuarios que falten) con estacionalidad, mezcla de crédito y distribución de
+productos de cola larga. Inserta con COPY en PostgreSQL; la misma semilla
+con los mismos parámetros produce los mismos datos.
+
+--limpiar vacía ventas, detalles, cuotas y pagos antes de generar; después hay
+que reconstruir el feature store y reentrenar en modo completo.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.core.synthetic_data import SyntheticDataGenerator
+
+
+class Command(BaseCommand):
+    help = 'Genera ventas, detalles, cuotas y pagos sintéticos para pruebas de carga'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ventas', type=int, default=100000, help='Ventas a generar (default: 100000)')
+        parser.add_argument('--clientes', type=int, help='Clientes (default: ventas/20, mínimo 100)')
+        parser.add_argument('--vendedores', type=int, default=10, help='Vendedores (default: 10)')
+        parser.add_argument('--productos', type=int, default=200, help='Productos mínimos en el catálogo (default: 200)')
+        parser.add_argument('--dias', type=int, default=730, help='Días hacia atrás desde hoy (default: 730)')
+        parser.add_argument('--credito', type=float, default=0.3, help='Proporción base de ventas a crédito (default: 0.3)')
+        parser.add_argument('--semilla', type=int, default=42, help='Semilla aleatoria (default: 42)')
+        parser.add_argument('--lote', type=int, default=50000, help='Ventas por lote/transacción (default: 50000)')
+        parser.add_argument('--limpiar', action='store_true', help='Vaciar ventas, detalles, cuotas y pagos antes')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING('🧪 Generando datos sintéticos...'))
+
+        try:
+            totales = SyntheticDataGenerator(
+                ventas=options['ventas'],
+                clientes=options['clientes'],
+                vendedores=options['vendedores'],
+                productos=options['productos'],
+                dias=options['dias'],
+                proporcion_credito=options['credito'],
+                semilla=options['semilla'],
+                lote=options['lote'],
+            ).generar(limpiar=options['limpiar'])
+
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {totales['ventas']} ventas, {totales['detalles']} detalles, "
+                f"{totales['cuotas']} cuotas y {totales['pagos']} pagos en {totales['segundos']}s"
+            ))
+            self.stdout.write(
+                '   Recalcular los derivados: update_feature_store --rebuild, train_ml --modo completo, '
+                'rebuild_sales_stats, compute_credit_risk, build_recommendations, compute_replenishment'
+            )
+            if options['limpiar']:
+                # Los ids vuelven a empezar por debajo de las marcas del feature store
+                # y del modelo activo: una pasada incremental ignoraría los datos nuevos
+                self.stdout.write(self.style.WARNING(
+                    '⚠️ Con --limpiar, update_feature_store sin --rebuild y train_ml incremental '
+                    'no verán las ventas regeneradas'
+                ))
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'❌ Error: {str(e)}'))
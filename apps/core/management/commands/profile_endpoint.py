@@ -0,0 +1,352 @@
+"""
+Management command para perfilar un endpoint o un servicio de forma reproducible
+Uso: python manage.py profile_endpoint <url|servicio> [--iteraciones 10] [--metodo POST] [--datos JSON]
+                                       [--kwargs JSON] [--usuario ID] [--salida profiles/]
+                                       [--seed VENTAS] [--semilla 42]
+
+Ejemplos:
+    python manage.py profile_endpoint /api/productos/
+    python manage.py profile_endpoint /api/productos/ --seed 20000
+    python manage.py profile_endpoint /api/reports/dashboard/ --iteraciones 20
+    python manage.py profile_endpoint apps.ia.services.ml_service.MLService.entrenar --iteraciones 1
+    python manage.py profile_endpoint apps.venta.services.VentaService.crear_venta \\
+        --kwargs '{"items": [{"variante_id": 1, "cantidad": 1}], "tipo_venta": "contado"}'
+
+Cada iteración corre dentro de una transacción que se revierte, así las
+corridas parten siempre de los mismos datos. Los modelos y artefactos de IA
+se leen y escriben en directorios temporales (backend 'local'): perfilar un
+entrenamiento no publica artefactos ni poda los existentes. Con --seed, una
+base sin ventas se llena antes con generate_synthetic_data (misma --semilla,
+mismos datos).
+
+Por cada objetivo se escriben en --salida:
+    <nombre>.prof       estadísticas de cProfile (abrir con snakeviz / pstats)
+    <nombre>.txt        árbol de llamadas ordenado por tiempo acumulado
+    <nombre>.collapsed  stacks colapsados por muestreo (flamegraph.pl, speedscope)
+    <nombre>.json       resumen; el anterior queda como <nombre>.prev.json y se
+                        compara con la corrida actual
+"""
+import cProfile
+import importlib
+import io
+import json
+import os
+import pstats
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+
+class _Muestreador(threading.Thread):
+    """
+    Toma muestras periódicas de la pila del hilo perfilado y las acumula
+    como stacks colapsados ("raiz;...;hoja" -> cantidad)
+    """
+
+    def __init__(self, hilo_id, intervalo):
+        super().__init__(daemon=True)
+        self.hilo_id = hilo_id
+        self.intervalo = intervalo
+        self.stacks = Counter()
+        self._detener = threading.Event()
+
+    def run(self):
+        while not self._detener.wait(self.intervalo):
+            frame = sys._current_frames().get(self.hilo_id)
+            pila = []
+            while frame is not None:
+                codigo = frame.f_code
+                pila.append(f'{os.path.basename(codigo.co_filename)}:{codigo.co_name}')
+                frame = frame.f_back
+            if pila:
+                self.stacks[';'.join(reversed(pila))] += 1
+
+    def detener(self):
+        self._detener.set()
+        self.join()
+
+
+class _Revertir(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Perfila un endpoint o servicio con cProfile y muestreo, y compara con la corrida anterior'
+
+    def add_arguments(self, parser):
+        parser.add_argument('objetivo', help="URL ('/api/...') o ruta de un servicio ('apps.x.services.Clase.metodo')")
+        parser.add_argument('--iteraciones', type=int, default=10, help='Iteraciones perfiladas (default: 10)')
+        parser.add_argument('--calentamiento', type=int, default=1, help='Iteraciones previas sin perfilar (default: 1)')
+        parser.add_argument('--metodo', default='GET', help='Método HTTP para URLs (default: GET)')
+        parser.add_argument('--datos', help='Cuerpo JSON para URLs')
+        parser.add_argument('--kwargs', help='Argumentos JSON para servicios')
+        parser.add_argument('--usuario', type=int, help='ID del usuario autenticado (default: primer superusuario)')
+        parser.add_argument('--intervalo-ms', type=float, default=1.0, help='Intervalo de muestreo en ms (default: 1)')
+        parser.add_argument('--salida', default=os.path.join(settings.BASE_DIR, 'profiles'), help='Directorio de resultados')
+        parser.add_argument('--seed', type=int, metavar='VENTAS', help='Si la base no tiene ventas, generar VENTAS ventas sintéticas antes')
+        parser.add_argument('--semilla', type=int, default=42, help='Semilla de --seed (default: 42)')
+
+    def handle(self, *args, **options):
+        objetivo = options['objetivo']
+
+        from apps.venta.models import Venta
+        if options['seed']:
+            if Venta.objects.exists():
+                self.stdout.write('ℹ️ La base ya tiene ventas: se omite --seed')
+            else:
+                call_command(
+                    'generate_synthetic_data', ventas=options['seed'], semilla=options['semilla'],
+                    stdout=self.stdout, stderr=self.stderr
+                )
+        if not Venta.objects.exists():
+            self.stdout.write(self.style.WARNING(
+                '⚠️ La base de datos no tiene ventas: el perfil no será representativo '
+                '(usar --seed o cargar datos con manage.py generate_synthetic_data)'
+            ))
+
+        with self._directorios_ia_temporales():
+            self._perfilar(objetivo, options)
+
+    def _perfilar(self, objetivo, options):
+        ejecutar = self._preparar(objetivo, options)
+
+        self.stdout.write(self.style.WARNING(
+            f"🔬 Perfilando {objetivo}: {options['iteraciones']} iteraciones "
+            f"(+{options['calentamiento']} de calentamiento)"
+        ))
+
+        for _ in range(options['calentamiento']):
+            self._iteracion(ejecutar)
+
+        perfil = cProfile.Profile()
+        muestreador = _Muestreador(threading.get_ident(), options['intervalo_ms'] / 1000)
+        consultas = []
+        duraciones = []
+
+        muestreador.start()
+        try:
+            for _ in range(options['iteraciones']):
+                with CaptureQueriesContext(connection) as capturadas:
+                    inicio = time.perf_counter()
+                    perfil.enable()
+                    try:
+                        self._iteracion(ejecutar)
+                    finally:
+                        perfil.disable()
+                    duraciones.append(time.perf_counter() - inicio)
+                consultas.append(len(capturadas.captured_queries))
+        finally:
+            muestreador.detener()
+
+        resumen = self._resumen(objetivo, perfil, duraciones, consultas)
+        self._escribir(objetivo, options['salida'], perfil, muestreador.stacks, resumen)
+
+    @contextmanager
+    def _directorios_ia_temporales(self):
+        """
+        IA_MODEL_DIR e IA_ARTIFACT_DIR en directorios temporales con backend
+        'local', con una copia del modelo activo para los objetivos que
+        predicen
+        """
+        from apps.ia.models import ModeloEntrenamiento
+        from apps.ia.services.artifact_store import ArtifactStore
+
+        with tempfile.TemporaryDirectory(prefix='profile_modelos_') as model_dir, \
+                tempfile.TemporaryDirectory(prefix='profile_artefactos_') as artifact_dir:
+            activo = ModeloEntrenamiento.objects.filter(activo=True).first()
+            if activo:
+                try:
+                    ruta = ArtifactStore().ruta_local(activo.archivo_modelo, activo.checksum)
+                    shutil.copy2(ruta, os.path.join(model_dir, os.path.relpath(ruta, settings.IA_MODEL_DIR)))
+                except (OSError, ValueError) as e:
+                    self.stdout.write(self.style.WARNING(f'⚠️ No se pudo copiar el modelo activo: {str(e)}'))
+
+            with override_settings(
+                IA_MODEL_DIR=model_dir,
+                IA_ARTIFACT_DIR=artifact_dir,
+                IA_ARTIFACT_BACKEND='local',
+            ):
+                yield
+
+    def _preparar(self, objetivo, options):
+        """
+        Retorna una función sin argumentos que ejecuta una vez el objetivo
+        """
+        if objetivo.startswith('/'):
+            from apps.usuarios.models import Usuario
+
+            client = Client()
+            usuario = (
+                Usuario.objects.filter(id=options['usuario']).first()
+                if options['usuario'] else Usuario.objects.filter(is_superuser=True).first()
+            )
+            # La API solo autentica con JWT: se firma un token de acceso para el usuario
+            cabeceras = {}
+            if usuario:
+                from rest_framework_simplejwt.tokens import AccessToken
+                cabeceras['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(usuario)}'
+            else:
+                self.stdout.write(self.style.WARNING('⚠️ No se encontró el usuario: las peticiones irán sin autenticar'))
+
+            metodo = getattr(client, options['metodo'].lower())
+            datos = options['datos']
+
+            def ejecutar():
+                if datos:
+                    respuesta = metodo(objetivo, data=datos, content_type='application/json', **cabeceras)
+                else:
+                    respuesta = metodo(objetivo, **cabeceras)
+                if respuesta.status_code >= 400:
+                    raise CommandError(f'{objetivo} respondió {respuesta.status_code}')
+
+            return ejecutar
+
+        modulo, _, nombre = objetivo.rpartition('.')
+        try:
+            funcion = self._resolver(modulo, nombre)
+        except (ImportError, AttributeError, ValueError) as e:
+            raise CommandError(f'No se pudo importar {objetivo}: {str(e)}')
+
+        kwargs = json.loads(options['kwargs']) if options['kwargs'] else {}
+        return lambda: funcion(**kwargs)
+
+    @staticmethod
+    def _resolver(modulo, nombre):
+        """
+        Importa 'paquete.modulo.funcion' o 'paquete.modulo.Clase.metodo'
+        (para métodos de instancia se crea la instancia sin argumentos)
+        """
+        try:
+            return getattr(importlib.import_module(modulo), nombre)
+        except ImportError:
+            modulo, _, clase = modulo.rpartition('.')
+            if not modulo:
+                raise
+            contenedor = getattr(importlib.import_module(modulo), clase)
+            atributo = contenedor.__dict__.get(nombre)
+            if isinstance(atributo, (staticmethod, classmethod)):
+                return getattr(contenedor, nombre)
+            return getattr(contenedor(), nombre)
+
+    @staticmethod
+    def _iteracion(ejecutar):
+        # Transacción revertida: cada iteración ve los mismos datos
+        try:
+            with transaction.atomic():
+                ejecutar()
+                raise _Revertir()
+        except _Revertir:
+            pass
+
+    def _resumen(self, objetivo, perfil, duraciones, consultas):
+        estadisticas = pstats.Stats(perfil)
+        funciones = sorted(
+            estadisticas.stats.items(), key=lambda item: item[1][3], reverse=True
+        )[:40]
+
+        return {
+            'objetivo': objetivo,
+            'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'iteraciones': len(duraciones),
+            'ms_por_iteracion': round(sum(duraciones) / len(duraciones) * 1000, 2),
+            'ms_min': round(min(duraciones) * 1000, 2),
+            'ms_max': round(max(duraciones) * 1000, 2),
+            'consultas_por_iteracion': round(sum(consultas) / len(consultas), 1),
+            'funciones': {
+                f'{os.path.basename(archivo)}:{linea}({nombre})': {
+                    'llamadas': datos[1],
+                    'tottime_ms': round(datos[2] * 1000 / len(duraciones), 3),
+                    'cumtime_ms': round(datos[3] * 1000 / len(duraciones), 3),
+                }
+                for (archivo, linea, nombre), datos in funciones
+            },
+        }
+
+    def _escribir(self, objetivo, salida, perfil, stacks, resumen):
+        os.makedirs(salida, exist_ok=True)
+        nombre = re.sub(r'[^A-Za-z0-9]+', '_', objetivo).strip('_') or 'raiz'
+        base = os.path.join(salida, nombre)
+
+        perfil.dump_stats(f'{base}.prof')
+
+        texto = io.StringIO()
+        estadisticas = pstats.Stats(perfil, stream=texto)
+        estadisticas.sort_stats('cumulative').print_stats(60)
+        estadisticas.print_callees(20)
+        with open(f'{base}.txt', 'w') as f:
+            f.write(texto.getvalue())
+
+        with open(f'{base}.collapsed', 'w') as f:
+            for pila, cantidad in stacks.most_common():
+                f.write(f'{pila} {cantidad}\n')
+
+        anterior = None
+        if os.path.exists(f'{base}.json'):
+            with open(f'{base}.json') as f:
+                anterior = json.load(f)
+            os.replace(f'{base}.json', f'{base}.prev.json')
+        with open(f'{base}.json', 'w') as f:
+            json.dump(resumen, f, indent=2)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {resumen['ms_por_iteracion']} ms/iteración "
+            f"(min {resumen['ms_min']}, max {resumen['ms_max']}) | "
+            f"{resumen['consultas_por_iteracion']} consultas/iteración | {sum(stacks.values())} muestras"
+        ))
+        self.stdout.write('')
+        self.stdout.write(f"{'cumtime ms':>11} {'tottime ms':>11} {'llamadas':>9}  función")
+        for funcion, datos in list(resumen['funciones'].items())[:15]:
+            self.stdout.write(
+                f"{datos['cumtime_ms']:>11.2f} {datos['tottime_ms']:>11.2f} {datos['llamadas']:>9}  {funcion}"
+            )
+
+        if anterior:
+            self._comparar(anterior, resumen)
+
+        self.stdout.write('')
+        self.stdout.write(f'💾 Resultados en: {base}.{{prof,txt,collapsed,json}}')
+
+    def _comparar(self, anterior, actual):
+        def variacion(antes, despues):
+            return f'{(despues - antes) / antes * 100:+.1f}%' if antes else 'n/a'
+
+        self.stdout.write('')
+        self.stdout.write(self.style.WARNING(f"📊 Comparación con la corrida del {anterior['fecha']}"))
+        self.stdout.write(
+            f"   ms/iteración: {anterior['ms_por_iteracion']} → {actual['ms_por_iteracion']} "
+            f"({variacion(anterior['ms_por_iteracion'], actual['ms_por_iteracion'])})"
+        )
+        self.stdout.write(
+            f"   consultas/iteración: {anterior['consultas_por_iteracion']} → {actual['consultas_por_iteracion']} "
+            f"({variacion(anterior['consultas_por_iteracion'], actual['consultas_por_iteracion'])})"
+        )
+
+        # Funciones cuyo tiempo propio más cambió
+        funciones = set(anterior['funciones']) | set(actual['funciones'])
+        cambios = sorted(
+            (
+                (
+                    actual['funciones'].get(f, {}).get('tottime_ms', 0)
+                    - anterior['funciones'].get(f, {}).get('tottime_ms', 0),
+                    f
+                )
+                for f in funciones
+            ),
+            key=lambda c: abs(c[0]),
+            reverse=True
+        )[:8]
+        for delta, funcion in cambios:
+            if abs(delta) >= 0.01:
+                self.stdout.write(f'   {delta:>+10.2f} ms  {funcion}')
@@ -0,0 +1,70 @@
+"""
+Management command para ver las consultas lentas que más tiempo consumen
+Uso: python manage.py slow_queries [--dias 7] [--limite 10] [--plan] [--limpiar DIAS]
+
+La captura se activa con DB_SLOW_QUERY_MS (ej: DB_SLOW_QUERY_MS=200).
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Max, Sum
+from django.utils import timezone
+
+from apps.core.models import ConsultaLenta
+
+
+class Command(BaseCommand):
+    help = 'Consultas lentas agrupadas por huella, ordenadas por tiempo total'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=7, help='Días hacia atrás (default: 7)')
+        parser.add_argument('--limite', type=int, default=10, help='Cantidad de consultas (default: 10)')
+        parser.add_argument('--plan', action='store_true', help='Mostrar el último plan EXPLAIN de cada una')
+        parser.add_argument('--limpiar', type=int, metavar='DIAS', help='Eliminar capturas más antiguas que DIAS')
+
+    def handle(self, *args, **options):
+        if options['limpiar'] is not None:
+            eliminadas, _ = ConsultaLenta.objects.filter(
+                fecha__lt=timezone.now() - timedelta(days=options['limpiar'])
+            ).delete()
+            self.stdout.write(self.style.SUCCESS(f'🧹 {eliminadas} capturas eliminadas'))
+            return
+
+        recientes = ConsultaLenta.objects.filter(
+            fecha__gte=timezone.now() - timedelta(days=options['dias'])
+        )
+        ranking = recientes.values('huella').annotate(
+            ejecuciones=Count('id'),
+            total_ms=Sum('duracion_ms'),
+            promedio_ms=Avg('duracion_ms'),
+            max_ms=Max('duracion_ms'),
+        ).order_by('-total_ms')[:options['limite']]
+
+        if not ranking:
+            self.stdout.write(self.style.WARNING('ℹ️ No hay consultas lentas registradas en el período'))
+            return
+
+        self.stdout.write(self.style.WARNING(f'🐢 Consultas lentas de los últimos {options["dias"]} días'))
+
+        for posicion, fila in enumerate(ranking, start=1):
+            capturas = recientes.filter(huella=fila['huella'])
+            ejemplo = capturas.order_by('-fecha').first()
+            vistas = capturas.values_list('vista', flat=True).distinct()[:5]
+
+            self.stdout.write('')
+            self.stdout.write(self.style.SUCCESS(
+                f"#{posicion} {fila['huella'][:12]}  total {fila['total_ms']:.0f} ms | "
+                f"{fila['ejecuciones']} ejecuciones | prom {fila['promedio_ms']:.1f} ms | "
+                f"máx {fila['max_ms']:.1f} ms"
+            ))
+            self.stdout.write(f"   Vistas: {', '.join(vistas)}")
+            self.stdout.write(f"   SQL: {ejemplo.sql[:500]}")
+
+            if options['plan']:
+                con_plan = capturas.exclude(plan='').order_by('-fecha').first()
+                if con_plan:
+                    self.stdout.write('   Plan:')
+                    for linea in con_plan.plan.splitlines():
+                        self.stdout.write(f'      {linea}')
+                else:
+                    self.stdout.write('   Plan: (sin muestra)')
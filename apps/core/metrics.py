@@ -0,0 +1,123 @@
+"""
+Métricas Prometheus del proyecto (expuestas en /metrics).
+
+Con varios workers de gunicorn cada proceso escribe sus valores en
+PROMETHEUS_MULTIPROC_DIR y la vista /metrics los agrega al leerlos. La
+variable de entorno debe existir antes de que se importe prometheus_client
+(ver config/gunicorn.conf.py); sin ella se usa el registro del proceso,
+suficiente para runserver.
+"""
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+)
+
+
+# Buckets en segundos para latencias de petición y de operaciones internas
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+PETICION_DURACION = Histogram(
+    'http_request_duration_seconds',
+    'Duración de las peticiones por vista/acción',
+    ['vista', 'metodo', 'status'],
+    buckets=_BUCKETS
+)
+PETICION_DB_DURACION = Histogram(
+    'http_request_db_seconds',
+    'Tiempo de base de datos por petición',
+    ['vista'],
+    buckets=_BUCKETS
+)
+PETICION_CONSULTAS = Histogram(
+    'http_request_db_queries',
+    'Consultas SQL por petición',
+    ['vista'],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+)
+CHECKOUT_ETAPA = Histogram(
+    'checkout_stage_seconds',
+    'Duración de cada etapa de VentaService.crear_venta',
+    ['etapa'],
+    buckets=_BUCKETS
+)
+ESPERA_BLOQUEO = Histogram(
+    'db_lock_wait_seconds',
+    'Espera para obtener bloqueos de fila (select_for_update)',
+    ['operacion'],
+    buckets=_BUCKETS
+)
+FCM_DURACION = Histogram(
+    'fcm_send_seconds',
+    'Duración de los envíos de notificaciones FCM',
+    buckets=_BUCKETS
+)
+FCM_FALLOS = Counter(
+    'fcm_send_failures_total',
+    'Envíos de notificaciones FCM fallidos'
+)
+ML_CARGA_MODELO = Histogram(
+    'ml_model_load_seconds',
+    'Duración de la carga del modelo activo en el worker',
+    buckets=_BUCKETS
+)
+ML_PREDICCION = Histogram(
+    'ml_predict_seconds',
+    'Duración de las predicciones',
+    ['operacion'],
+    buckets=_BUCKETS
+)
+
+
+class Cronometro:
+    """
+    Mide etapas consecutivas de un mismo proceso:
+
+        cronometro = Cronometro(CHECKOUT_ETAPA)
+        ...
+        cronometro.marcar('validacion')   # tiempo desde el inicio
+        ...
+        cronometro.marcar('registro')     # tiempo desde la marca anterior
+    """
+
+    def __init__(self, histograma):
+        self.histograma = histograma
+        self._ultimo = time.perf_counter()
+
+    def marcar(self, etapa):
+        ahora = time.perf_counter()
+        self.histograma.labels(etapa=etapa).observe(ahora - self._ultimo)
+        self._ultimo = ahora
+
+
+def nombre_vista(request):
+    """
+    Nombre de la vista para las etiquetas: 'VentaViewSet.crear' para
+    ViewSets de DRF y el nombre de la función para las vistas @api_view
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'sin_ruta'
+
+    vista = getattr(match.func, 'cls', None)
+    nombre = vista.__name__ if vista is not None else match.func.__name__
+    acciones = getattr(match.func, 'actions', None)
+    if acciones:
+        accion = acciones.get(request.method.lower())
+        if accion:
+            nombre = f'{nombre}.{accion}'
+    return nombre
+
+
+def exportar():
+    """
+    Retorna (contenido, content_type) con todas las métricas; en modo
+    multiproceso agrega los archivos de todos los workers
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+    else:
+        registro = REGISTRY
+    return generate_latest(registro), CONTENT_TYPE_LATEST
@@ -0,0 +1,104 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.middleware.gzip import GZipMiddleware
+
+from .instrumentation import MedicionPeticion, medicion_actual
+from .metrics import PETICION_CONSULTAS, PETICION_DB_DURACION, PETICION_DURACION, nombre_vista
+
+logger = logging.getLogger('apps.performance')
+
+
+class GZipUmbralMiddleware(GZipMiddleware):
+    """
+    GZip negociado (Accept-Encoding) solo para respuestas grandes: por debajo
+    de API_GZIP_MIN_BYTES comprimir cuesta más CPU de lo que ahorra en red
+    """
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < settings.API_GZIP_MIN_BYTES:
+            return response
+        return super().process_response(request, response)
+
+
+class PerformanceMiddleware:
+    """
+    Instrumentación por petición: tiempo total, consultas y tiempo de base de
+    datos, aciertos de caché y tiempo de render de la respuesta.
+
+    - Con PERF_SERVER_TIMING agrega el header Server-Timing (visible en las
+      DevTools del navegador) y X-Possible-N-Plus-One
+    - Marca posibles N+1: la misma forma de consulta repetida
+      PERF_N_MAS_1_UMBRAL veces o más
+    - Guarda las consultas que superan DB_SLOW_QUERY_MS (apps.core.slow_queries)
+    - Alimenta los histogramas de /metrics (apps.core.metrics)
+    - Registra como JSON (logger 'apps.performance') una muestra
+      (PERF_SAMPLE_RATE) de las peticiones lentas o con posibles N+1
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        medicion = MedicionPeticion()
+        token = medicion_actual.set(medicion)
+        try:
+            with ExitStack() as stack:
+                for conexion in connections.all():
+                    stack.enter_context(conexion.execute_wrapper(medicion.ejecutar_sql))
+                response = self.get_response(request)
+        finally:
+            medicion_actual.reset(token)
+
+        total_ms = (time.perf_counter() - medicion.inicio) * 1000
+        db_ms = medicion.tiempo_db * 1000
+        serializacion_ms = medicion.tiempo_serializacion * 1000
+        n_mas_1 = medicion.posibles_n_mas_1(settings.PERF_N_MAS_1_UMBRAL)
+
+        vista = nombre_vista(request)
+
+        if medicion.consultas_lentas:
+            try:
+                from .slow_queries import SlowQueryRecorder
+                SlowQueryRecorder.guardar(medicion.consultas_lentas, vista)
+            except Exception as e:
+                logger.warning(json.dumps({'evento': 'error_consultas_lentas', 'error': str(e)}))
+        PETICION_DURACION.labels(
+            vista=vista, metodo=request.method, status=response.status_code
+        ).observe(total_ms / 1000)
+        PETICION_DB_DURACION.labels(vista=vista).observe(medicion.tiempo_db)
+        PETICION_CONSULTAS.labels(vista=vista).observe(medicion.consultas)
+
+        if settings.PERF_SERVER_TIMING:
+            response['Server-Timing'] = ', '.join([
+                f'total;dur={total_ms:.1f}',
+                f'db;dur={db_ms:.1f};desc="{medicion.consultas} consultas"',
+                f'ser;dur={serializacion_ms:.1f};desc="render"',
+                f'cache;desc="hits={medicion.cache_hits} misses={medicion.cache_misses}"',
+            ])
+            if n_mas_1:
+                response['X-Possible-N-Plus-One'] = str(len(n_mas_1))
+
+        lenta = total_ms >= settings.PERF_SLOW_MS
+        if (lenta or n_mas_1) and random.random() < settings.PERF_SAMPLE_RATE:
+            logger.warning(json.dumps({
+                'evento': 'peticion_lenta' if lenta else 'posible_n_mas_1',
+                'metodo': request.method,
+                'ruta': request.path,
+                'vista': vista,
+                'status': response.status_code,
+                'total_ms': round(total_ms, 1),
+                'db_ms': round(db_ms, 1),
+                'consultas': medicion.consultas,
+                'serializacion_ms': round(serializacion_ms, 1),
+                'cache_hits': medicion.cache_hits,
+                'cache_misses': medicion.cache_misses,
+                'n_mas_1': n_mas_1,
+            }, ensure_ascii=False))
+
+        return response
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 23:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsultaLenta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('huella', models.CharField(db_index=True, help_text='MD5 de la consulta normalizada', max_length=32)),
+                ('sql', models.TextField(help_text='Consulta normalizada (sin literales ni parámetros)')),
+                ('vista', models.CharField(max_length=150)),
+                ('base_datos', models.CharField(default='default', max_length=50)),
+                ('duracion_ms', models.FloatField()),
+                ('plan', models.TextField(blank=True, help_text='Salida de EXPLAIN (solo una muestra de las consultas)')),
+                ('fecha', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Consulta Lenta',
+                'verbose_name_plural': 'Consultas Lentas',
+                'ordering': ['-fecha'],
+            },
+        ),
+    ]
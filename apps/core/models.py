@@ -0,0 +1,23 @@
+from django.db import models
+
+
+class ConsultaLenta(models.Model):
+    """
+    Consulta SQL que superó DB_SLOW_QUERY_MS durante una petición
+    (capturada por PerformanceMiddleware)
+    """
+    huella = models.CharField(max_length=32, db_index=True, help_text="MD5 de la consulta normalizada")
+    sql = models.TextField(help_text="Consulta normalizada (sin literales ni parámetros)")
+    vista = models.CharField(max_length=150)
+    base_datos = models.CharField(max_length=50, default='default')
+    duracion_ms = models.FloatField()
+    plan = models.TextField(blank=True, help_text="Salida de EXPLAIN (solo una muestra de las consultas)")
+    fecha = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = 'Consulta Lenta'
+        verbose_name_plural = 'Consultas Lentas'
+        ordering = ['-fecha']
+
+    def __str__(self):
+        return f"{self.duracion_ms:.0f} ms - {self.vista} - {self.huella[:8]}"
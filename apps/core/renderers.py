@@ -0,0 +1,55 @@
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .instrumentation import medir_serializacion
+
+
+# Los tipos que orjson/msgpack no serializan por sí mismos (Decimal, fechas,
+# timedelta, UUID, QuerySet...) se convierten igual que en el JSONRenderer
+# de DRF, así las respuestas no cambian de forma al cambiar de renderer
+_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Renderer JSON basado en orjson
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    OPCIONES = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_SERIALIZE_NUMPY
+        | orjson.OPT_PASSTHROUGH_DATETIME
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        opciones = self.OPCIONES
+        if accepted_media_type and 'indent=' in accepted_media_type:
+            opciones |= orjson.OPT_INDENT_2
+
+        with medir_serializacion():
+            return orjson.dumps(data, default=_encoder.default, option=opciones)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renderer MessagePack (Accept: application/msgpack)
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        with medir_serializacion():
+            return msgpack.packb(data, default=_encoder.default, use_bin_type=True)
@@ -5,6 +5,8 @@ import os
 from django.conf import settings
 from django.utils import timezone
 
+from apps.core.metrics import FCM_DURACION, FCM_FALLOS
+
 logger = logging.getLogger(__name__)
 
 class NotificationService:
@@ -68,14 +70,17 @@ class NotificationService:
             )
 
             # Enviar mensaje
-            response = messaging.send(message)
+            with FCM_DURACION.time():
+                response = messaging.send(message)
             logger.info(f"Notificación enviada exitosamente. ID: {response}")
             return True
 
         except messaging.UnregisteredError:
+            FCM_FALLOS.inc()
             logger.warning(f"Token FCM inválido o expirado: {token}")
             return False
         except Exception as e:
+            FCM_FALLOS.inc()
             logger.error(f"Error enviando notificación: {str(e)}")
             return False
 
@@ -171,7 +176,9 @@ class NotificationService:
             )
 
             # Enviar a todos los tokens - FUNCIÓN CORRECTA para v7.x
-            response = messaging.send_each_for_multicast(message)
+            with FCM_DURACION.time():
+                response = messaging.send_each_for_multicast(message)
+            FCM_FALLOS.inc(response.failure_count)
 
             logger.info(f"Notificaciones enviadas: {response.success_count}/{len(tokens)}")
 
@@ -193,6 +200,7 @@ class NotificationService:
             }
 
         except Exception as e:
+            FCM_FALLOS.inc(len(tokens))
             logger.error(f"Error enviando notificaciones múltiples: {str(e)}")
             return {'success_count': 0, 'failure_count': len(tokens)}
 
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from .instrumentation import forma_sql
+from .models import ConsultaLenta
+
+logger = logging.getLogger('apps.performance')
+
+# Cláusulas que hacen que un SELECT bloquee filas o escriba: EXPLAIN ANALYZE
+# las volvería a ejecutar
+_NO_EXPLICABLE = re.compile(
+    r'\bFOR\s+(?:NO\s+KEY\s+)?UPDATE\b|\bFOR\s+(?:KEY\s+)?SHARE\b|\bINTO\b|\bNEXTVAL\s*\(|\bSETVAL\s*\(',
+    re.IGNORECASE
+)
+
+
+class SlowQueryRecorder:
+    """
+    Guarda las consultas lentas de una petición con su huella (forma
+    normalizada) y, para una muestra de los SELECT de solo lectura, su plan
+    de ejecución.
+
+    Se llama al terminar la petición, fuera de los execute_wrapper, para que
+    el INSERT no se mida a sí mismo. Los EXPLAIN corren en un hilo aparte
+    después del commit: la petición no espera a que se re-ejecute la consulta.
+    """
+
+    @staticmethod
+    def guardar(consultas, vista):
+        """
+        Args:
+            consultas (list): tuplas (alias, sql, params, many, duracion_ms)
+            vista (str): vista que ejecutó las consultas
+        """
+        registros = []
+        a_explicar = []
+        for alias, sql, params, many, duracion_ms in consultas:
+            forma = forma_sql(sql)
+            registro = ConsultaLenta(
+                huella=hashlib.md5(forma.encode()).hexdigest(),
+                sql=forma,
+                vista=vista[:150],
+                base_datos=alias,
+                duracion_ms=round(duracion_ms, 2),
+            )
+            registros.append(registro)
+
+            if (
+                not many
+                and SlowQueryRecorder.es_explicable(sql)
+                and random.random() < settings.DB_SLOW_QUERY_EXPLAIN_RATE
+            ):
+                a_explicar.append((registro, alias, sql, params))
+
+        ConsultaLenta.objects.bulk_create(registros)
+
+        # Sin pk (backends que no la retornan en bulk_create) no hay dónde guardar el plan
+        pendientes = [
+            (registro.pk, alias, sql, params)
+            for registro, alias, sql, params in a_explicar
+            if registro.pk is not None
+        ]
+        if pendientes:
+            transaction.on_commit(lambda: SlowQueryRecorder._explicar_en_segundo_plano(pendientes))
+
+    @staticmethod
+    def es_explicable(sql):
+        """
+        Solo un SELECT simple: sin bloqueos de fila (FOR UPDATE/SHARE), sin
+        SELECT INTO ni secuencias, y sin varias sentencias
+        """
+        sql = sql.strip().rstrip(';')
+        return (
+            sql[:6].upper() == 'SELECT'
+            and ';' not in sql
+            and not _NO_EXPLICABLE.search(sql)
+        )
+
+    @staticmethod
+    def guardar_planes(pendientes):
+        """
+        Args:
+            pendientes (list): tuplas (consulta_lenta_id, alias, sql, params)
+        """
+        for consulta_id, alias, sql, params in pendientes:
+            plan = SlowQueryRecorder.explicar(alias, sql, params)
+            ConsultaLenta.objects.filter(id=consulta_id).update(plan=plan)
+
+    @staticmethod
+    def _explicar_en_segundo_plano(pendientes):
+        def ejecutar():
+            try:
+                SlowQueryRecorder.guardar_planes(pendientes)
+            except Exception as e:
+                logger.warning(json.dumps({'evento': 'error_explain_consultas_lentas', 'error': str(e)}))
+            finally:
+                # Conexiones propias de este hilo
+                connections.close_all()
+
+        threading.Thread(target=ejecutar, daemon=True).start()
+
+    @staticmethod
+    def explicar(alias, sql, params):
+        """
+        Plan de ejecución de la consulta. En PostgreSQL usa
+        EXPLAIN (ANALYZE, BUFFERS), que vuelve a ejecutarla (por eso solo se
+        aplica a SELECT de solo lectura y a una muestra).
+        """
+        conexion = connections[alias]
+        prefijos = {
+            'postgresql': 'EXPLAIN (ANALYZE, BUFFERS) ',
+            'mysql': 'EXPLAIN ANALYZE ',
+            'sqlite': 'EXPLAIN QUERY PLAN ',
+        }
+        prefijo = prefijos.get(conexion.vendor, 'EXPLAIN ')
+
+        try:
+            with conexion.cursor() as cursor:
+                cursor.execute(prefijo + sql, params)
+                filas = cursor.fetchall()
+        except Exception as e:
+            return f'EXPLAIN no disponible: {str(e)}'
+
+        return '\n'.join(str(fila[-1]) for fila in filas)
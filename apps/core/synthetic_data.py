@@ -0,0 +1,416 @@
+import csv
+import io
+import time
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from apps.categorias.models import Categoria
+from apps.cuota.models import CuotaCredito
+from apps.pago.models import Pago
+from apps.producto_variante.models import VarianteProducto
+from apps.productos.models import Producto
+from apps.usuarios.models import Usuario
+from apps.venta.models import DetalleVenta, Venta
+
+
+class BulkWriter:
+    """
+    Inserta filas en bloque con SQL directo: COPY en PostgreSQL (psycopg 3 o
+    psycopg2) y executemany en los demás motores.
+
+    Al no pasar por el ORM se respetan las fechas generadas en los campos
+    auto_now_add (Venta.fecha, Pago.fecha_pago).
+    """
+
+    def __init__(self, using='default'):
+        self.connection = connections[using]
+
+    def escribir(self, modelo, campos, filas):
+        qn = self.connection.ops.quote_name
+        tabla = qn(modelo._meta.db_table)
+        columnas = ', '.join(qn(modelo._meta.get_field(campo).column) for campo in campos)
+
+        with self.connection.cursor() as cursor:
+            if self.connection.vendor == 'postgresql':
+                crudo = cursor.cursor
+                if hasattr(crudo, 'copy'):
+                    with crudo.copy(f'COPY {tabla} ({columnas}) FROM STDIN') as copy:
+                        for fila in filas:
+                            copy.write_row(fila)
+                else:
+                    # psycopg2: CSV en memoria (None se escribe vacío = NULL)
+                    buffer = io.StringIO()
+                    csv.writer(buffer).writerows(filas)
+                    buffer.seek(0)
+                    crudo.copy_expert(f'COPY {tabla} ({columnas}) FROM STDIN WITH (FORMAT csv)', buffer)
+            else:
+                marcadores = ', '.join(['%s'] * len(campos))
+                cursor.executemany(f'INSERT INTO {tabla} ({columnas}) VALUES ({marcadores})', filas)
+
+    def limpiar(self, modelos):
+        tablas = [modelo._meta.db_table for modelo in modelos]
+        with self.connection.cursor() as cursor:
+            for sql in self.connection.ops.sql_flush(no_style(), tablas, allow_cascade=False):
+                cursor.execute(sql)
+
+    def reiniciar_secuencias(self, modelos):
+        # Los ids se asignan explícitamente; las secuencias deben continuar después
+        with self.connection.cursor() as cursor:
+            for sql in self.connection.ops.sequence_reset_sql(no_style(), modelos):
+                cursor.execute(sql)
+
+
+class SyntheticDataGenerator:
+    """
+    Genera ventas sintéticas realistas para benchmarks y pruebas de carga:
+    Venta, DetalleVenta, CuotaCredito y Pago, más el catálogo y los usuarios
+    que falten.
+
+    - Estacionalidad: tendencia creciente, pico de diciembre y fines de
+      semana más fuertes.
+    - Cola larga: la popularidad de las variantes sigue una ley de Zipf y la
+      frecuencia de compra de los clientes una de Pareto.
+    - Crédito: la probabilidad de crédito crece con el total de la venta;
+      cada cliente tiene una propensión a la mora que determina atrasos,
+      cuotas impagas y el estado de la venta.
+
+    Todo sale de numpy.random.Generator derivados de la semilla, así que la
+    misma semilla y los mismos parámetros producen los mismos datos. Las
+    ventas se procesan en lotes de `lote` filas para acotar la memoria.
+    """
+
+    PESOS_DIA_SEMANA = np.array([0.85, 0.85, 0.9, 0.95, 1.1, 1.35, 1.0])  # lunes a domingo
+    CRECIMIENTO_ANUAL = 0.15
+    AMPLITUD_ESTACIONAL = 0.3
+
+    PLAZOS = np.array([3, 6, 12])
+    PROB_PLAZOS = [0.45, 0.35, 0.2]
+    INTERES_POR_PLAZO = {3: 5, 6: 10, 12: 18}
+
+    METODOS_PAGO = np.array(['efectivo', 'tarjeta', 'qr'])
+    PROB_METODOS_PAGO = [0.5, 0.3, 0.2]
+
+    PROB_ECOMMERCE = 0.25
+    PROB_SIN_CLIENTE = 0.2  # ventas al contado sin cliente registrado
+
+    TALLAS = ['S', 'M', 'L', 'XL']
+    TIPOS_PRODUCTO = ['Pantalón', 'Camisa', 'Vestido', 'Zapato', 'Bolso', 'Chaqueta', 'Polera', 'Falda']
+    MARCAS = ['Andina', 'Illimani', 'Sajama', 'Titicaca', 'Uyuni', 'Chacaltaya']
+
+    def __init__(self, ventas=100000, clientes=None, vendedores=10, productos=200, dias=730,
+                 proporcion_credito=0.3, semilla=42, lote=50000, using='default'):
+        self.ventas = ventas
+        self.clientes = clientes or max(100, ventas // 20)
+        self.vendedores = vendedores
+        self.productos = productos
+        self.dias = dias
+        self.proporcion_credito = proporcion_credito
+        self.semilla = semilla
+        self.lote = lote
+        self.writer = BulkWriter(using)
+        self.postgres = self.writer.connection.vendor == 'postgresql'
+
+    def generar(self, limpiar=False):
+        """
+        Returns:
+            dict: filas insertadas por tabla y segundos empleados
+        """
+        inicio = time.perf_counter()
+        # Flujos independientes: crear o no el catálogo no altera las ventas
+        semilla_catalogo, semilla_ventas = np.random.SeedSequence(self.semilla).spawn(2)
+        rng = np.random.default_rng(semilla_ventas)
+
+        if limpiar:
+            print('🗑️  Eliminando ventas, detalles, cuotas y pagos existentes...')
+            self.writer.limpiar([Pago, CuotaCredito, DetalleVenta, Venta])
+
+        catalogo = self._catalogo(np.random.default_rng(semilla_catalogo))
+        clientes = self._usuarios('cliente', self.clientes)
+        vendedores = self._usuarios('vendedor', self.vendedores)
+
+        # Perfiles fijos para toda la corrida
+        peso_variantes = 1 / (rng.permutation(len(catalogo['ids'])) + 1) ** 1.1
+        peso_variantes /= peso_variantes.sum()
+        peso_clientes = rng.pareto(1.5, len(clientes['ids'])) + 1
+        peso_clientes /= peso_clientes.sum()
+        propension_mora = rng.beta(1.2, 6, len(clientes['ids']))
+
+        hoy = np.datetime64(timezone.localdate(), 'D')
+        primer_dia = hoy - self.dias
+        dias_venta = np.sort(rng.choice(self.dias, size=self.ventas, p=self._pesos_dias(primer_dia)))
+
+        self._siguientes_ids = {
+            modelo: (modelo.objects.aggregate(maximo=Max('id'))['maximo'] or 0) + 1
+            for modelo in (Venta, DetalleVenta, CuotaCredito, Pago)
+        }
+        totales = dict.fromkeys(('ventas', 'detalles', 'cuotas', 'pagos'), 0)
+
+        print(f'🧪 Generando {self.ventas} ventas en {self.dias} días (semilla {self.semilla})...')
+        for desde in range(0, self.ventas, self.lote):
+            fechas = primer_dia + dias_venta[desde:desde + self.lote]
+            with transaction.atomic(using=self.writer.connection.alias):
+                conteo = self._lote(
+                    rng, fechas, hoy, catalogo, clientes, vendedores,
+                    peso_variantes, peso_clientes, propension_mora
+                )
+            for tabla, cantidad in conteo.items():
+                totales[tabla] += cantidad
+            print(f"   ✓ {desde + len(fechas)}/{self.ventas} ventas "
+                  f"({time.perf_counter() - inicio:.1f}s)")
+
+        self.writer.reiniciar_secuencias([Venta, DetalleVenta, CuotaCredito, Pago])
+
+        totales['segundos'] = round(time.perf_counter() - inicio, 1)
+        return totales
+
+    def _pesos_dias(self, primer_dia):
+        dias = np.arange(self.dias)
+        fechas = primer_dia + dias
+        dia_semana = (fechas.astype('datetime64[D]').view('int64') - 4) % 7  # 1970-01-01 fue jueves
+        dia_del_anio = (fechas - fechas.astype('datetime64[Y]')).astype(int)
+
+        pesos = (
+            (1 + self.CRECIMIENTO_ANUAL * dias / 365)
+            * self.PESOS_DIA_SEMANA[dia_semana]
+            # Pico en diciembre, valle a mitad de año
+            * (1 + self.AMPLITUD_ESTACIONAL * np.cos(2 * np.pi * (dia_del_anio - 350) / 365))
+        )
+        return pesos / pesos.sum()
+
+    def _lote(self, rng, fechas, hoy, catalogo, clientes, vendedores,
+              peso_variantes, peso_clientes, propension_mora):
+        n = len(fechas)
+
+        # Detalles: 1 a 6 ítems por venta, variantes con cola larga
+        items = np.clip(1 + rng.poisson(0.8, n), 1, 6)
+        venta_de_item = np.repeat(np.arange(n), items)
+        variante = rng.choice(len(catalogo['ids']), size=len(venta_de_item), p=peso_variantes)
+        cantidad = np.minimum(rng.geometric(0.7, len(venta_de_item)), 5)
+        precio = catalogo['precios'][variante]
+        sub_total = precio * cantidad
+        total = np.bincount(venta_de_item, weights=sub_total, minlength=n).astype(np.int64)
+
+        # Crédito más probable cuanto mayor es la compra
+        prob_credito = np.clip(self.proporcion_credito * np.sqrt(total / np.median(total)), 0, 0.95)
+        credito = rng.random(n) < prob_credito
+        cliente = rng.choice(len(clientes['ids']), size=n, p=peso_clientes)
+        sin_cliente = ~credito & (rng.random(n) < self.PROB_SIN_CLIENTE)
+        ecommerce = rng.random(n) < self.PROB_ECOMMERCE
+        vendedor = rng.integers(len(vendedores['ids']), size=n)
+
+        plazo = np.where(credito, rng.choice(self.PLAZOS, size=n, p=self.PROB_PLAZOS), 0)
+        interes = np.vectorize(self.INTERES_POR_PLAZO.get, otypes=[np.int64])(np.where(credito, plazo, 3))
+        total_con_interes = np.where(credito, total + np.round(total * interes / 100).astype(np.int64), total)
+        cuota_mensual = np.where(credito, np.round(total_con_interes / np.maximum(plazo, 1)).astype(np.int64), 0)
+
+        # Cuotas: vencen cada 30 días; atrasos e impagos según la propensión del cliente
+        venta_de_cuota = np.repeat(np.arange(n), plazo)
+        numero_cuota = np.arange(len(venta_de_cuota)) - np.repeat(np.cumsum(plazo) - plazo, plazo) + 1
+        vencimiento = fechas[venta_de_cuota] + 30 * numero_cuota
+        propension = propension_mora[cliente[venta_de_cuota]]
+        atrasada = rng.random(len(venta_de_cuota)) < propension
+        abandonada = rng.random(len(venta_de_cuota)) < propension * 0.3
+        dias_pago = np.where(
+            atrasada,
+            np.ceil(rng.exponential(5 + 40 * propension)).astype(np.int64),
+            -rng.integers(0, 10, size=len(venta_de_cuota))
+        )
+        fecha_pago_cuota = np.maximum(vencimiento + dias_pago, fechas[venta_de_cuota])
+        pagada = ~abandonada & (fecha_pago_cuota < hoy)
+        estado_cuota = np.where(pagada, 'pagada', np.where(vencimiento < hoy, 'vencida', 'pendiente'))
+        impagas = np.bincount(venta_de_cuota, weights=~pagada, minlength=n)
+        estado_venta = np.where(credito & (impagas > 0), 'pendiente', 'pagado')
+
+        # Ids explícitos para enlazar detalles, cuotas y pagos sin consultar
+        venta_ids = self._reservar_ids(Venta, n)
+        detalle_ids = self._reservar_ids(DetalleVenta, len(venta_de_item))
+        cuota_ids = self._reservar_ids(CuotaCredito, len(venta_de_cuota))
+
+        # Pagos: uno por venta al contado y uno por cuota pagada
+        contado = np.flatnonzero(~credito)
+        cuotas_pagadas = np.flatnonzero(pagada)
+        pago_venta = np.concatenate([contado, venta_de_cuota[cuotas_pagadas]])
+        pago_ids = self._reservar_ids(Pago, len(pago_venta))
+        pago_dia = np.concatenate([fechas[contado], fecha_pago_cuota[cuotas_pagadas]])
+        metodo = rng.choice(self.METODOS_PAGO, size=len(pago_venta), p=self.PROB_METODOS_PAGO)
+
+        cliente_id = np.where(sin_cliente, 0, clientes['ids'][cliente])
+        vendedor_id = np.where(ecommerce, 0, vendedores['ids'][vendedor])
+        fechas_txt = np.datetime_as_string(fechas).tolist()
+
+        self.writer.escribir(Venta, [
+            'id', 'cliente', 'vendedor', 'nombre_cliente', 'correo_cliente', 'nombre_vendedor',
+            'estado', 'fecha', 'tipo_venta', 'origen', 'plazo_meses', 'interes',
+            'total', 'total_con_interes', 'cuota_mensual'
+        ], list(zip(
+            venta_ids,
+            [c or None for c in cliente_id.tolist()],
+            [v or None for v in vendedor_id.tolist()],
+            [None if s else clientes['nombres'][c] for s, c in zip(sin_cliente.tolist(), cliente.tolist())],
+            [None if s else clientes['correos'][c] for s, c in zip(sin_cliente.tolist(), cliente.tolist())],
+            [None if e else vendedores['nombres'][v] for e, v in zip(ecommerce.tolist(), vendedor.tolist())],
+            estado_venta.tolist(),
+            fechas_txt,
+            np.where(credito, 'credito', 'contado').tolist(),
+            np.where(ecommerce, 'ecommerce', 'tienda').tolist(),
+            [p or None for p in plazo.tolist()],
+            [f'{t}.00' if c else None for t, c in zip(interes.tolist(), credito.tolist())],
+            self._montos(total),
+            self._montos(total_con_interes),
+            self._montos(cuota_mensual),
+        )))
+
+        self.writer.escribir(DetalleVenta, [
+            'id', 'venta', 'variante_producto', 'cantidad', 'precio_unitario',
+            'sub_total', 'nombre_producto', 'talla'
+        ], list(zip(
+            detalle_ids,
+            [venta_ids[v] for v in venta_de_item.tolist()],
+            catalogo['ids'][variante].tolist(),
+            cantidad.tolist(),
+            self._montos(precio),
+            self._montos(sub_total),
+            [catalogo['nombres'][v] for v in variante.tolist()],
+            [catalogo['tallas'][v] for v in variante.tolist()],
+        )))
+
+        self.writer.escribir(CuotaCredito, [
+            'id', 'venta', 'numero_cuota', 'fecha_vencimiento', 'monto_cuota', 'estado', 'fecha_pago'
+        ], list(zip(
+            cuota_ids,
+            [venta_ids[v] for v in venta_de_cuota.tolist()],
+            numero_cuota.tolist(),
+            np.datetime_as_string(vencimiento).tolist(),
+            self._montos(cuota_mensual[venta_de_cuota]),
+            estado_cuota.tolist(),
+            [f if p else None for f, p in zip(np.datetime_as_string(fecha_pago_cuota).tolist(), pagada.tolist())],
+        )))
+
+        self.writer.escribir(Pago, [
+            'id', 'venta', 'cuota', 'fecha_pago', 'monto_pagado', 'metodo_pago', 'referencia_pago'
+        ], list(zip(
+            pago_ids,
+            [venta_ids[v] for v in pago_venta.tolist()],
+            [None] * len(contado) + [cuota_ids[c] for c in cuotas_pagadas.tolist()],
+            self._fechas_hora(rng, pago_dia),
+            self._montos(np.concatenate([total[contado], cuota_mensual[venta_de_cuota[cuotas_pagadas]]])),
+            metodo.tolist(),
+            [None if m == 'efectivo' else f'SIM-{p}' for m, p in zip(metodo.tolist(), pago_ids)],
+        )))
+
+        return {
+            'ventas': n,
+            'detalles': len(detalle_ids),
+            'cuotas': len(cuota_ids),
+            'pagos': len(pago_ids),
+        }
+
+    def _reservar_ids(self, modelo, cantidad):
+        primero = self._siguientes_ids[modelo]
+        self._siguientes_ids[modelo] = primero + cantidad
+        return list(range(primero, primero + cantidad))
+
+    @staticmethod
+    def _montos(centavos):
+        return [f'{c // 100}.{c % 100:02d}' for c in np.asarray(centavos, dtype=np.int64).tolist()]
+
+    def _fechas_hora(self, rng, dias):
+        """
+        Fechas con hora en horario comercial local (9 a 21 h), en UTC: con
+        offset explícito para PostgreSQL y sin él para los motores que guardan
+        UTC sin zona (SQLite, MySQL)
+        """
+        offset = timezone.localtime().utcoffset()
+        segundos = rng.integers(9 * 3600, 21 * 3600, size=len(dias)) - int(offset.total_seconds())
+        instantes = dias.astype('datetime64[s]') + segundos
+        texto = np.char.replace(np.datetime_as_string(instantes, unit='s'), 'T', ' ')
+        if self.postgres:
+            texto = np.char.add(texto, '+00:00')
+        return texto.tolist()
+
+    def _catalogo(self, rng):
+        """
+        Completa el catálogo hasta `productos` productos (1 a 4 tallas cada
+        uno) y retorna las variantes como arrays
+        """
+        faltantes = self.productos - Producto.objects.count()
+        if faltantes > 0:
+            print(f'👕 Creando {faltantes} productos sintéticos...')
+            categorias = list(Categoria.objects.all()) or Categoria.objects.bulk_create([
+                Categoria(nombre=tipo, descripcion=f'{tipo} (datos sintéticos)')
+                for tipo in self.TIPOS_PRODUCTO
+            ])
+            productos = Producto.objects.bulk_create([
+                Producto(
+                    nombre=f'{rng.choice(self.TIPOS_PRODUCTO)} {rng.choice(self.MARCAS)} {i + 1}',
+                    descripcion='Producto generado para benchmarks',
+                    genero=str(rng.choice(['Hombre', 'Mujer', 'Unisex'])),
+                    image='productos/sintetico.jpg',
+                    marca=str(rng.choice(self.MARCAS)),
+                    categoria=categorias[int(rng.integers(len(categorias)))],
+                )
+                for i in range(faltantes)
+            ])
+
+            variantes = []
+            for producto in productos:
+                precio = int(np.exp(rng.normal(np.log(150), 0.6))) * 100 - 10
+                tallas = rng.choice(self.TALLAS, size=int(rng.integers(1, 5)), replace=False)
+                variantes.extend(
+                    VarianteProducto(
+                        producto=producto,
+                        talla=str(talla),
+                        precio=f'{precio // 100}.{precio % 100:02d}',
+                        stock=int(rng.integers(50, 500)),
+                        stock_minimo=10,
+                    )
+                    for talla in sorted(tallas)
+                )
+            VarianteProducto.objects.bulk_create(variantes, batch_size=1000)
+
+        filas = list(
+            VarianteProducto.objects.order_by('id').values_list('id', 'precio', 'producto__nombre', 'talla')
+        )
+        return {
+            'ids': np.array([f[0] for f in filas], dtype=np.int64),
+            'precios': np.array([int(round(f[1] * 100)) for f in filas], dtype=np.int64),
+            'nombres': [f[2][:100] for f in filas],
+            'tallas': [f[3] for f in filas],
+        }
+
+    def _usuarios(self, rol, cantidad):
+        """
+        Reutiliza los usuarios sintéticos del rol ('sim_<rol>_N') y crea los
+        que falten
+        """
+        prefijo = f'sim_{rol}_'
+        existentes = Usuario.objects.filter(username__startswith=prefijo).count()
+        if existentes < cantidad:
+            print(f'👤 Creando {cantidad - existentes} usuarios {rol}...')
+            clave = make_password(None)
+            Usuario.objects.bulk_create([
+                Usuario(
+                    username=f'{prefijo}{i}',
+                    first_name=rol.capitalize(),
+                    last_name=str(i),
+                    email=f'{prefijo}{i}@example.com',
+                    password=clave,
+                    rol=rol,
+                )
+                for i in range(existentes + 1, cantidad + 1)
+            ], batch_size=1000)
+
+        filas = list(
+            Usuario.objects.filter(username__startswith=prefijo).order_by('id')
+            .values_list('id', 'first_name', 'last_name', 'email')[:cantidad]
+        )
+        return {
+            'ids': np.array([f[0] for f in filas], dtype=np.int64),
+            'nombres': [f'{f[1]} {f[2]}' for f in filas],
+            'correos': [f[3] for f in filas],
+        }
@@ -0,0 +1,453 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from contextlib import redirect_stdout
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+
+import msgpack
+import numpy as np
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db.models import Count, F, Max, Min, Sum
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from apps.categorias.models import Categoria
+from apps.cuota.models import CuotaCredito
+from apps.ia.models import ModeloEntrenamiento
+from apps.pago.models import Pago
+from apps.productos.models import Producto
+from apps.usuarios.models import Usuario
+from apps.venta.models import DetalleVenta, Venta
+from .cache import LRUCache, TwoTierCache, cache, cached
+from .instrumentation import MedicionPeticion, medicion_actual
+from .middleware import GZipUmbralMiddleware
+from .models import ConsultaLenta
+from .parsers import MessagePackParser, ORJSONParser
+from .renderers import MessagePackRenderer, ORJSONRenderer
+from .slow_queries import SlowQueryRecorder
+from .synthetic_data import SyntheticDataGenerator
+
+
+class LRUCacheTests(TestCase):
+
+    def test_descarta_la_menos_usada(self):
+        lru = LRUCache(max_items=2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+
+        lru.set('c', 3)
+
+        self.assertEqual(lru.get('a'), 1)
+        self.assertEqual(lru.get('c'), 3)
+        self.assertIsNot(lru.get('b'), 2)
+        self.assertEqual(len(lru), 2)
+
+    def test_entradas_vencidas(self):
+        lru = LRUCache(max_items=10)
+        lru.set('a', 1, ttl=10)
+        ahora = time.monotonic()
+
+        with mock.patch('apps.core.cache.time.monotonic', return_value=ahora + 11):
+            self.assertIsNot(lru.get('a'), 1)
+        self.assertEqual(len(lru), 0)
+
+
+@override_settings(CACHE_LOCAL_TTL=30, CACHE_VERSION_TTL=5)
+class TwoTierCacheTests(TestCase):
+
+    def setUp(self):
+        caches['default'].clear()
+        # Dos workers con su propio primer nivel y el mismo backend compartido
+        self.worker_a = TwoTierCache()
+        self.worker_b = TwoTierCache()
+
+    def test_acierto_compartido_llena_el_nivel_local(self):
+        self.worker_a.set('productos', 'lista', [1, 2])
+
+        self.assertEqual(self.worker_b.get('productos', 'lista'), [1, 2])
+        self.assertEqual(self.worker_b.get('productos', 'lista'), [1, 2])
+
+        estadisticas = self.worker_b.estadisticas()
+        self.assertEqual(estadisticas['hits_compartido'], 1)
+        self.assertEqual(estadisticas['hits_local'], 1)
+        self.assertEqual(estadisticas['hit_ratio'], 1.0)
+
+    def test_invalidar_alcanza_a_los_otros_workers(self):
+        self.worker_a.set('productos', 'lista', 'vieja')
+        self.assertEqual(self.worker_b.get('productos', 'lista'), 'vieja')
+
+        self.worker_a.invalidar('productos')
+
+        # El que invalida lo ve enseguida; el resto al revisar la versión
+        self.assertIsNone(self.worker_a.get('productos', 'lista'))
+        with mock.patch('apps.core.cache.time.monotonic', return_value=time.monotonic() + 6):
+            self.assertIsNone(self.worker_b.get('productos', 'lista'))
+
+    def test_invalidar_no_afecta_otros_espacios(self):
+        self.worker_a.set('productos', 'lista', 1)
+        self.worker_a.set('reportes', 'lista', 2)
+
+        self.worker_a.invalidar('productos')
+
+        self.assertIsNone(self.worker_a.get('productos', 'lista'))
+        self.assertEqual(self.worker_a.get('reportes', 'lista'), 2)
+
+    def test_get_or_set_cachea_none(self):
+        calcular = mock.Mock(return_value=None)
+
+        self.worker_a.get_or_set('productos', 'vacio', calcular)
+        self.worker_a.get_or_set('productos', 'vacio', calcular)
+
+        calcular.assert_called_once()
+
+
+class CachedDecoratorTests(TestCase):
+
+    class Servicio:
+        def __init__(self):
+            self.llamadas = 0
+
+        @cached('tests_servicio')
+        def sumar(self, a, b=0):
+            self.llamadas += 1
+            return a + b
+
+    def setUp(self):
+        caches['default'].clear()
+        cache.limpiar_local()
+
+    def test_clave_por_argumentos_sin_self(self):
+        primero, segundo = self.Servicio(), self.Servicio()
+
+        self.assertEqual(primero.sumar(1, b=2), 3)
+        self.assertEqual(segundo.sumar(1, b=2), 3)
+        self.assertEqual(segundo.sumar(2, b=2), 4)
+
+        self.assertEqual(primero.llamadas, 1)
+        self.assertEqual(segundo.llamadas, 1)
+
+    def test_invalidar_recalcula(self):
+        servicio = self.Servicio()
+        servicio.sumar(1)
+
+        cache.invalidar('tests_servicio')
+        servicio.sumar(1)
+
+        self.assertEqual(servicio.llamadas, 2)
+
+    def test_sin_cache_llama_a_la_funcion(self):
+        servicio = self.Servicio()
+        servicio.sumar(1)
+
+        self.assertEqual(self.Servicio.sumar.sin_cache(servicio, 1), 1)
+        self.assertEqual(servicio.llamadas, 2)
+
+    def test_estadisticas_solo_para_staff(self):
+        client = APIClient()
+        client.force_authenticate(Usuario.objects.create(username='cliente'))
+        self.assertEqual(client.get('/api/core/cache-stats/').status_code, 403)
+
+        client.force_authenticate(Usuario.objects.create(username='staff', is_staff=True))
+        respuesta = client.get('/api/core/cache-stats/')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn('hit_ratio', respuesta.json())
+
+
+class RenderersTests(TestCase):
+
+    DATOS = {
+        'precio': Decimal('10.50'),
+        'fecha': date(2026, 1, 2),
+        'momento': datetime(2026, 1, 2, 3, 4, 5),
+        'duracion': timedelta(minutes=1),
+        'id': uuid.UUID(int=1),
+        'lista': [1, 'dos', None],
+        'numpy': np.float64(1.5),
+        1: 'clave numerica',
+    }
+
+    def test_orjson_coincide_con_el_renderer_de_drf(self):
+        datos = {k: v for k, v in self.DATOS.items() if k != 'numpy'}
+
+        self.assertEqual(
+            json.loads(ORJSONRenderer().render(datos)),
+            json.loads(JSONRenderer().render(datos))
+        )
+        self.assertEqual(json.loads(ORJSONRenderer().render(self.DATOS))['numpy'], 1.5)
+
+    def test_orjson_ida_y_vuelta(self):
+        contenido = ORJSONRenderer().render(self.DATOS)
+
+        self.assertEqual(ORJSONParser().parse(BytesIO(contenido)), json.loads(contenido))
+
+    def test_msgpack_ida_y_vuelta(self):
+        # msgpack conserva las claves no string
+        datos = {k: v for k, v in self.DATOS.items() if k not in ('numpy', 1)}
+        contenido = MessagePackRenderer().render({**datos, 1: 'uno'})
+
+        self.assertEqual(
+            MessagePackParser().parse(BytesIO(contenido)),
+            {**json.loads(JSONRenderer().render(datos)), 1: 'uno'}
+        )
+
+    def test_cuerpos_invalidos(self):
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(BytesIO(b'{"a": '))
+        with self.assertRaises(ParseError):
+            MessagePackParser().parse(BytesIO(b'\xc1'))
+
+    def test_negociacion_por_accept(self):
+        client = APIClient()
+        client.force_authenticate(Usuario.objects.create(username='staff', is_staff=True))
+
+        respuesta = client.get('/api/core/cache-stats/', HTTP_ACCEPT='application/msgpack')
+
+        self.assertEqual(respuesta['Content-Type'], 'application/msgpack')
+        self.assertIn('hit_ratio', msgpack.unpackb(respuesta.content))
+
+    def test_cuerpo_msgpack_y_json_invalido(self):
+        client = APIClient()
+
+        respuesta = client.post(
+            '/api/categorias/', msgpack.packb({'nombre': 'Ropa', 'descripcion': 'Ropa'}),
+            content_type='application/msgpack'
+        )
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(respuesta.json()['nombre'], 'Ropa')
+
+        respuesta = client.post('/api/categorias/', b'{"nombre": ', content_type='application/json')
+        self.assertEqual(respuesta.status_code, 400)
+
+
+@override_settings(API_GZIP_MIN_BYTES=1024)
+class GZipUmbralMiddlewareTests(TestCase):
+
+    def _respuesta(self, contenido):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        return GZipUmbralMiddleware(lambda r: HttpResponse(contenido))(request)
+
+    def test_comprime_respuestas_grandes(self):
+        contenido = b'x' * 2048
+
+        respuesta = self._respuesta(contenido)
+
+        self.assertEqual(respuesta['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(respuesta.content), contenido)
+
+    def test_no_comprime_respuestas_chicas(self):
+        respuesta = self._respuesta(b'x' * 100)
+
+        self.assertFalse(respuesta.has_header('Content-Encoding'))
+        self.assertEqual(respuesta.content, b'x' * 100)
+
+
+class PerformanceMiddlewareTests(TestCase):
+
+    def setUp(self):
+        categoria = Categoria.objects.create(nombre='Ropa', descripcion='Ropa')
+        # El stock de cada producto recorre sus variantes: una consulta por producto
+        for i in range(5):
+            Producto.objects.create(
+                nombre=f'Producto {i}', descripcion='-', genero='Unisex',
+                image='productos/x.jpg', marca='Marca', categoria=categoria
+            )
+
+    @override_settings(PERF_N_MAS_1_UMBRAL=3)
+    def test_sin_headers_de_diagnostico_por_defecto(self):
+        respuesta = APIClient().get('/api/productos/')
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertFalse(respuesta.has_header('Server-Timing'))
+        self.assertFalse(respuesta.has_header('X-Possible-N-Plus-One'))
+
+    @override_settings(PERF_SERVER_TIMING=True, PERF_N_MAS_1_UMBRAL=3)
+    def test_headers_de_diagnostico_habilitados(self):
+        respuesta = APIClient().get('/api/productos/')
+
+        self.assertIn('ser;dur=', respuesta['Server-Timing'])
+        self.assertIn('consultas', respuesta['Server-Timing'])
+        self.assertGreaterEqual(int(respuesta['X-Possible-N-Plus-One']), 1)
+
+    def test_el_render_suma_tiempo_de_serializacion(self):
+        medicion = MedicionPeticion()
+        token = medicion_actual.set(medicion)
+        try:
+            ORJSONRenderer().render([{'id': i} for i in range(1000)])
+        finally:
+            medicion_actual.reset(token)
+
+        self.assertGreater(medicion.tiempo_serializacion, 0)
+
+
+class MetricsViewTests(TestCase):
+
+    @override_settings(METRICS_TOKEN='secreto', METRICS_IPS_PERMITIDAS=['10.0.0.1'])
+    def test_sin_token_ni_ip_permitida_responde_404(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+        self.assertEqual(
+            self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer otro').status_code, 404
+        )
+
+    @override_settings(METRICS_TOKEN='secreto', METRICS_IPS_PERMITIDAS=[])
+    def test_con_token(self):
+        respuesta = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secreto')
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn(b'http_request_duration_seconds', respuesta.content)
+
+    @override_settings(METRICS_TOKEN='', METRICS_IPS_PERMITIDAS=['10.0.0.1'])
+    def test_desde_ip_permitida(self):
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.0.0.1').status_code, 200)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.0.0.2').status_code, 404)
+
+
+@override_settings(DB_SLOW_QUERY_EXPLAIN_RATE=1.0)
+class SlowQueryRecorderTests(TestCase):
+
+    SELECT = 'SELECT "productos_producto"."id" FROM "productos_producto" WHERE "productos_producto"."id" = %s'
+
+    def test_solo_select_de_solo_lectura(self):
+        self.assertTrue(SlowQueryRecorder.es_explicable(self.SELECT))
+        self.assertTrue(SlowQueryRecorder.es_explicable('  select 1;'))
+
+        for sql in [
+            self.SELECT + ' FOR UPDATE',
+            self.SELECT + ' FOR NO KEY UPDATE',
+            self.SELECT + ' for share',
+            self.SELECT + ' FOR KEY SHARE',
+            'SELECT * INTO copia FROM productos_producto',
+            "SELECT nextval('productos_producto_id_seq')",
+            'SELECT 1; DELETE FROM productos_producto',
+            'UPDATE "productos_producto" SET "nombre" = %s',
+            'WITH x AS (DELETE FROM productos_producto RETURNING *) SELECT * FROM x',
+        ]:
+            with self.subTest(sql=sql):
+                self.assertFalse(SlowQueryRecorder.es_explicable(sql))
+
+    def test_explain_despues_del_commit_y_fuera_de_la_peticion(self):
+        consultas = [
+            ('default', self.SELECT, (1,), False, 250.0),
+            ('default', self.SELECT + ' FOR UPDATE', (1,), False, 300.0),
+        ]
+
+        with mock.patch.object(
+            SlowQueryRecorder, '_explicar_en_segundo_plano', side_effect=SlowQueryRecorder.guardar_planes
+        ) as en_segundo_plano:
+            with self.captureOnCommitCallbacks() as callbacks:
+                SlowQueryRecorder.guardar(consultas, 'ProductoViewSet.list')
+
+            # Nada se explica durante la petición
+            en_segundo_plano.assert_not_called()
+            self.assertFalse(ConsultaLenta.objects.exclude(plan='').exists())
+
+            for callback in callbacks:
+                callback()
+
+        self.assertEqual(len(en_segundo_plano.call_args.args[0]), 1)
+        select, bloqueo = ConsultaLenta.objects.order_by('duracion_ms')
+        self.assertNotEqual(select.plan, '')
+        self.assertEqual(bloqueo.plan, '')
+        self.assertTrue(bloqueo.sql.endswith('FOR UPDATE'))
+
+
+class ProfileEndpointTests(TestCase):
+
+    def setUp(self):
+        self.model_dir = tempfile.mkdtemp()
+        self.salida = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.model_dir, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.salida, ignore_errors=True)
+
+    def _perfilar(self, objetivo, **opciones):
+        salida = StringIO()
+        call_command(
+            'profile_endpoint', objetivo, iteraciones=1, calentamiento=0, salida=self.salida,
+            stdout=salida, **opciones
+        )
+        return salida.getvalue()
+
+    @override_settings(IA_RF_N_ESTIMATORS=10, IA_TRAINING_N_JOBS=1)
+    def test_perfilar_entrenamiento_no_deja_artefactos(self):
+        with override_settings(IA_MODEL_DIR=self.model_dir, IA_ARTIFACT_DIR=self.model_dir):
+            salida = self._perfilar('apps.ia.services.ml_service.MLService.entrenar', seed=300)
+
+        self.assertEqual(Venta.objects.count(), 300)
+        self.assertIn('ms/iteración', salida)
+        self.assertEqual(os.listdir(self.model_dir), [])
+        self.assertFalse(ModeloEntrenamiento.objects.exists())
+
+    def test_seed_solo_con_la_base_vacia(self):
+        Venta.objects.create(tipo_venta='contado', estado='completada', total=100)
+
+        salida = self._perfilar('apps.core.instrumentation.forma_sql', seed=300, kwargs='{"sql": "SELECT 1"}')
+
+        self.assertIn('se omite --seed', salida)
+        self.assertEqual(Venta.objects.count(), 1)
+
+
+class SyntheticDataGeneratorTests(TestCase):
+
+    def _generar(self, semilla=7, limpiar=False):
+        with redirect_stdout(StringIO()):
+            return SyntheticDataGenerator(
+                ventas=500, clientes=30, vendedores=2, productos=10, dias=60, semilla=semilla, lote=200
+            ).generar(limpiar=limpiar)
+
+    def _ventas(self):
+        return list(Venta.objects.order_by('id').values_list(
+            'fecha', 'tipo_venta', 'origen', 'estado', 'total', 'plazo_meses', 'cliente__username'
+        ))
+
+    def test_totales_coinciden_con_las_filas_insertadas(self):
+        totales = self._generar()
+
+        self.assertEqual(totales['ventas'], 500)
+        self.assertEqual(Venta.objects.count(), 500)
+        self.assertEqual(DetalleVenta.objects.count(), totales['detalles'])
+        self.assertEqual(CuotaCredito.objects.count(), totales['cuotas'])
+        self.assertEqual(Pago.objects.count(), totales['pagos'])
+
+    def test_misma_semilla_mismos_datos(self):
+        self._generar(semilla=7)
+        primera = self._ventas()
+
+        self._generar(semilla=7, limpiar=True)
+        self.assertEqual(self._ventas(), primera)
+
+        self._generar(semilla=8, limpiar=True)
+        self.assertNotEqual(self._ventas(), primera)
+
+    def test_datos_consistentes(self):
+        self._generar()
+        hoy = timezone.localdate()
+
+        fechas = Venta.objects.aggregate(desde=Min('fecha'), hasta=Max('fecha'))
+        self.assertGreaterEqual(fechas['desde'], hoy - timedelta(days=60))
+        self.assertLess(fechas['hasta'], hoy)
+
+        # El total de cada venta es la suma de sus detalles
+        for total, suma in Venta.objects.annotate(suma=Sum('detalles__sub_total')).values_list('total', 'suma'):
+            self.assertEqual(total, round(suma, 2))
+        # Una cuota por mes de plazo, y un pago por cuota pagada
+        self.assertFalse(
+            Venta.objects.filter(tipo_venta='credito').annotate(
+                cuotas_generadas=Count('cuotas')
+            ).exclude(cuotas_generadas=F('plazo_meses')).exists()
+        )
+        self.assertEqual(
+            Pago.objects.filter(cuota__isnull=False).count(),
+            CuotaCredito.objects.filter(estado='pagada').count()
+        )
@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('cache-stats/', views.cache_stats, name='cache-stats'),
+]
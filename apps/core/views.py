@@ -0,0 +1,50 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from .cache import cache
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    """
+    GET /api/core/cache-stats/
+
+    Contadores de aciertos/fallos de la caché de dos niveles del worker que
+    atiende la petición
+    """
+    try:
+        return Response(cache.estadisticas())
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def metrics(request):
+    """
+    GET /metrics
+
+    Métricas en formato de texto de Prometheus (agregadas entre workers).
+    Solo para el token METRICS_TOKEN o las IPs de METRICS_IPS_PERMITIDAS
+    """
+    if not _metrics_permitido(request):
+        raise Http404()
+
+    from .metrics import exportar
+
+    contenido, content_type = exportar()
+    return HttpResponse(contenido, content_type=content_type)
+
+
+def _metrics_permitido(request):
+    token = settings.METRICS_TOKEN
+    if token:
+        recibido = request.META.get('HTTP_AUTHORIZATION', '')
+        if hmac.compare_digest(recibido.encode(), f'Bearer {token}'.encode()):
+            return True
+    return request.META.get('REMOTE_ADDR') in settings.METRICS_IPS_PERMITIDAS
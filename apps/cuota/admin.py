@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import CuotaCredito
+from .models import CuotaCredito, RiesgoCliente
 
 admin.site.register(CuotaCredito)
+admin.site.register(RiesgoCliente)
 # Register your models here.
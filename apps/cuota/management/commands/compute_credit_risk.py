@@ -0,0 +1,27 @@
+"""
+Management command para recalcular el riesgo crediticio de los clientes
+Uso: python manage.py compute_credit_risk
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from apps.cuota.models import RiesgoCliente
+from apps.cuota.services import RiesgoCreditoService
+
+
+class Command(BaseCommand):
+    help = 'Calcula el score de riesgo crediticio de cada cliente con cuotas'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING('🏦 Calculando riesgo crediticio...'))
+
+        try:
+            cantidad = RiesgoCreditoService.calcular()
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'❌ Error: {str(e)}'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {cantidad} clientes evaluados'))
+
+        for nivel in RiesgoCliente.objects.values('nivel').annotate(total=Count('id')).order_by('nivel'):
+            self.stdout.write(f"   {nivel['nivel']}: {nivel['total']}")
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cuota', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RiesgoCliente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cuotas_vencidas_total', models.PositiveIntegerField(default=0, help_text='Cuotas con fecha de vencimiento ya cumplida')),
+                ('cuotas_impagas', models.PositiveIntegerField(default=0, help_text='Cuotas vencidas que siguen sin pagar')),
+                ('proporcion_a_tiempo', models.FloatField(default=1.0, help_text='Proporción de cuotas vencidas pagadas a tiempo (0-1)')),
+                ('dias_atraso_promedio', models.FloatField(default=0)),
+                ('dias_atraso_max', models.PositiveIntegerField(default=0)),
+                ('saldo_pendiente', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('compras_por_mes', models.FloatField(default=0)),
+                ('score', models.FloatField(help_text='Probabilidad estimada de mora (0-1)')),
+                ('nivel', models.CharField(choices=[('bajo', 'Bajo'), ('medio', 'Medio'), ('alto', 'Alto')], max_length=10)),
+                ('fecha_calculo', models.DateTimeField()),
+                ('cliente', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='riesgo_credito', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Riesgo de Cliente',
+                'verbose_name_plural': 'Riesgos de Clientes',
+                'ordering': ['-score'],
+            },
+        ),
+    ]
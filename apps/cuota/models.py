@@ -45,3 +45,52 @@ class CuotaCredito(models.Model):
         if self.estado != 'pagada':
             return timezone.now().date() > self.fecha_vencimiento
         return False
+
+
+class RiesgoCliente(models.Model):
+    """
+    Puntaje de riesgo crediticio por cliente, recalculado en lote
+    (manage.py compute_credit_risk) a partir de sus cuotas y compras
+    """
+    NIVEL_CHOICES = [
+        ('bajo', 'Bajo'),
+        ('medio', 'Medio'),
+        ('alto', 'Alto'),
+    ]
+
+    cliente = models.OneToOneField(
+        'usuarios.Usuario',
+        on_delete=models.CASCADE,
+        related_name='riesgo_credito'
+    )
+
+    # Features de comportamiento de pago
+    cuotas_vencidas_total = models.PositiveIntegerField(
+        default=0,
+        help_text="Cuotas con fecha de vencimiento ya cumplida"
+    )
+    cuotas_impagas = models.PositiveIntegerField(
+        default=0,
+        help_text="Cuotas vencidas que siguen sin pagar"
+    )
+    proporcion_a_tiempo = models.FloatField(
+        default=1.0,
+        help_text="Proporción de cuotas vencidas pagadas a tiempo (0-1)"
+    )
+    dias_atraso_promedio = models.FloatField(default=0)
+    dias_atraso_max = models.PositiveIntegerField(default=0)
+    saldo_pendiente = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    compras_por_mes = models.FloatField(default=0)
+
+    # Resultado
+    score = models.FloatField(help_text="Probabilidad estimada de mora (0-1)")
+    nivel = models.CharField(max_length=10, choices=NIVEL_CHOICES)
+    fecha_calculo = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Riesgo de Cliente'
+        verbose_name_plural = 'Riesgos de Clientes'
+        ordering = ['-score']
+
+    def __str__(self):
+        return f"Riesgo {self.nivel} ({self.score:.2f}) - Cliente #{self.cliente_id}"
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import CuotaCredito
+from .models import CuotaCredito, RiesgoCliente
 
 
 class CuotaSerializer(serializers.ModelSerializer):
@@ -37,3 +37,29 @@ class MarcarCuotaPagadaSerializer(serializers.Serializer):
         required=False,
         help_text="Fecha del pago (opcional, por defecto hoy)"
     )
+
+
+class RiesgoClienteSerializer(serializers.ModelSerializer):
+    """
+    Serializer para el riesgo crediticio precalculado de un cliente
+    """
+    cliente_email = serializers.CharField(source='cliente.email', read_only=True)
+    nivel_display = serializers.CharField(source='get_nivel_display', read_only=True)
+
+    class Meta:
+        model = RiesgoCliente
+        fields = [
+            'cliente',
+            'cliente_email',
+            'score',
+            'nivel',
+            'nivel_display',
+            'cuotas_vencidas_total',
+            'cuotas_impagas',
+            'proporcion_a_tiempo',
+            'dias_atraso_promedio',
+            'dias_atraso_max',
+            'saldo_pendiente',
+            'compras_por_mes',
+            'fecha_calculo'
+        ]
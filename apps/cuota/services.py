@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from apps.venta.models import Venta
+from .models import CuotaCredito, RiesgoCliente
+
+
+class RiesgoCreditoService:
+    """
+    Puntaje de riesgo crediticio por cliente.
+
+    Las features se calculan para todos los clientes a la vez sobre sus
+    cuotas (atrasos, pagos a tiempo, saldo) y su frecuencia de compra, y se
+    combinan en un modelo logístico:
+
+        score = 1 / (1 + e^-(b0 + Σ wᵢ·xᵢ))
+
+    El resultado queda en una fila de RiesgoCliente por cliente, que es lo
+    único que se consulta al aprobar una venta a crédito.
+    """
+
+    # Pesos del modelo logístico (intercepto y features)
+    INTERCEPTO = -2.5
+    PESOS = {
+        'proporcion_atrasada': 3.0,     # 1 - proporción de cuotas pagadas a tiempo
+        'meses_atraso_promedio': 1.5,   # días de atraso promedio / 30
+        'proporcion_impaga': 2.0,       # cuotas vencidas sin pagar / cuotas vencidas
+        'log_compras_por_mes': -0.5,    # clientes frecuentes reducen el riesgo
+    }
+
+    @staticmethod
+    def calcular():
+        """
+        Recalcula la tabla RiesgoCliente completa para los clientes con
+        cuotas pendientes o vencidas; el resto no tiene crédito abierto
+        y queda sin fila.
+
+        Returns:
+            int: cantidad de clientes evaluados
+        """
+        hoy = timezone.now().date()
+
+        con_deuda = CuotaCredito.objects.filter(
+            estado__in=['pendiente', 'vencida'],
+            venta__cliente__isnull=False
+        ).values('venta__cliente_id')
+
+        # Todo el historial de esos clientes, incluidas sus cuotas pagadas
+        cuotas = pd.DataFrame.from_records(
+            CuotaCredito.objects.filter(
+                venta__cliente_id__in=con_deuda
+            ).values_list(
+                'venta__cliente_id', 'fecha_vencimiento', 'fecha_pago', 'estado', 'monto_cuota'
+            ),
+            columns=['cliente_id', 'fecha_vencimiento', 'fecha_pago', 'estado', 'monto_cuota']
+        )
+
+        if cuotas.empty:
+            with transaction.atomic():
+                RiesgoCliente.objects.all().delete()
+            return 0
+
+        compras = pd.Series(dict(
+            Venta.objects.filter(
+                cliente_id__in=cuotas['cliente_id'].unique(),
+                fecha__gte=hoy - timedelta(days=365)
+            ).values('cliente_id').annotate(
+                ventas=Count('id')
+            ).values_list('cliente_id', 'ventas')
+        ), dtype=float)
+
+        vencimiento = pd.to_datetime(cuotas['fecha_vencimiento'])
+        pago = pd.to_datetime(cuotas['fecha_pago'])
+        pagada = (cuotas['estado'] == 'pagada').to_numpy()
+        vencida = (vencimiento < pd.Timestamp(hoy)).to_numpy()
+        # Pagada sin fecha de pago (datos cargados a mano): no hay forma de
+        # medir su atraso, no cuenta ni a tiempo ni atrasada
+        sin_fecha_pago = pagada & pago.isna().to_numpy()
+
+        # Atraso: hasta el pago si se pagó, hasta hoy si sigue impaga
+        fin = pago.where(pagada, pd.Timestamp(hoy))
+        atraso = (fin - vencimiento).dt.days.clip(lower=0).to_numpy(dtype=float)
+
+        evaluable = (vencida | pagada) & ~sin_fecha_pago
+        cuotas = cuotas.assign(
+            evaluable=evaluable,
+            a_tiempo=pagada & (atraso == 0),
+            impaga=vencida & ~pagada,
+            atraso=np.where(evaluable, atraso, np.nan),
+            saldo=np.where(pagada, 0, cuotas['monto_cuota'].astype(float)),
+        )
+
+        features = cuotas.groupby('cliente_id').agg(
+            cuotas_vencidas_total=('evaluable', 'sum'),
+            a_tiempo=('a_tiempo', 'sum'),
+            cuotas_impagas=('impaga', 'sum'),
+            dias_atraso_promedio=('atraso', 'mean'),
+            dias_atraso_max=('atraso', 'max'),
+            saldo_pendiente=('saldo', 'sum'),
+        ).fillna({'dias_atraso_promedio': 0, 'dias_atraso_max': 0})
+
+        features['proporcion_a_tiempo'] = np.divide(
+            features['a_tiempo'], features['cuotas_vencidas_total'],
+            out=np.ones(len(features)), where=features['cuotas_vencidas_total'] > 0
+        )
+        features['compras_por_mes'] = compras.reindex(features.index).fillna(0) / 12
+
+        z = RiesgoCreditoService.INTERCEPTO + (
+            RiesgoCreditoService.PESOS['proporcion_atrasada'] * (1 - features['proporcion_a_tiempo'])
+            + RiesgoCreditoService.PESOS['meses_atraso_promedio'] * features['dias_atraso_promedio'] / 30
+            + RiesgoCreditoService.PESOS['proporcion_impaga'] * np.divide(
+                features['cuotas_impagas'], features['cuotas_vencidas_total'],
+                out=np.zeros(len(features)), where=features['cuotas_vencidas_total'] > 0
+            )
+            + RiesgoCreditoService.PESOS['log_compras_por_mes'] * np.log1p(features['compras_por_mes'])
+        )
+        features['score'] = 1 / (1 + np.exp(-z))
+        features['nivel'] = np.select(
+            [
+                features['score'] >= settings.CUOTA_RIESGO_UMBRAL_ALTO,
+                features['score'] >= settings.CUOTA_RIESGO_UMBRAL_MEDIO,
+            ],
+            ['alto', 'medio'],
+            default='bajo'
+        )
+
+        ahora = timezone.now()
+        riesgos = [
+            RiesgoCliente(
+                cliente_id=int(cliente_id),
+                cuotas_vencidas_total=int(f.cuotas_vencidas_total),
+                cuotas_impagas=int(f.cuotas_impagas),
+                proporcion_a_tiempo=round(float(f.proporcion_a_tiempo), 4),
+                dias_atraso_promedio=round(float(f.dias_atraso_promedio), 2),
+                dias_atraso_max=int(f.dias_atraso_max),
+                saldo_pendiente=round(float(f.saldo_pendiente), 2),
+                compras_por_mes=round(float(f.compras_por_mes), 2),
+                score=round(float(f.score), 4),
+                nivel=f.nivel,
+                fecha_calculo=ahora,
+            )
+            for cliente_id, f in features.iterrows()
+        ]
+
+        with transaction.atomic():
+            RiesgoCliente.objects.all().delete()
+            RiesgoCliente.objects.bulk_create(riesgos, batch_size=1000)
+
+        return len(riesgos)
@@ -1,3 +1,121 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.usuarios.models import Usuario
+from apps.venta.models import Venta
+from .models import CuotaCredito, RiesgoCliente
+from .services import RiesgoCreditoService
+
+
+def crear_cuotas(cliente, *cuotas):
+    """
+    Venta a crédito con una cuota por cada (días hasta el vencimiento,
+    estado, días de atraso del pago o None si no tiene fecha de pago)
+    """
+    hoy = timezone.now().date()
+    venta = Venta.objects.create(
+        cliente=cliente, tipo_venta='credito', estado='completada',
+        total=100 * len(cuotas), plazo_meses=len(cuotas)
+    )
+    for numero, (dias, estado, atraso) in enumerate(cuotas, start=1):
+        vencimiento = hoy + timedelta(days=dias)
+        CuotaCredito.objects.create(
+            venta=venta, numero_cuota=numero, fecha_vencimiento=vencimiento, monto_cuota=100,
+            estado=estado, fecha_pago=None if atraso is None else vencimiento + timedelta(days=atraso)
+        )
+    return venta
+
+
+class RiesgoCreditoServiceTests(TestCase):
+
+    def test_solo_clientes_con_cuotas_pendientes_o_vencidas(self):
+        al_dia = Usuario.objects.create(username='al_dia')
+        crear_cuotas(al_dia, (-60, 'pagada', 0), (-30, 'pagada', 0))
+        con_deuda = Usuario.objects.create(username='con_deuda')
+        crear_cuotas(con_deuda, (-30, 'pagada', 0), (30, 'pendiente', None))
+
+        self.assertEqual(RiesgoCreditoService.calcular(), 1)
+
+        riesgo = RiesgoCliente.objects.get()
+        self.assertEqual(riesgo.cliente, con_deuda)
+        # El historial pagado del cliente con deuda sigue contando
+        self.assertEqual(riesgo.cuotas_vencidas_total, 1)
+        self.assertEqual(riesgo.saldo_pendiente, 100)
+
+    def test_pagada_sin_fecha_de_pago_no_cuenta_como_atrasada(self):
+        cliente = Usuario.objects.create(username='sin_fecha')
+        crear_cuotas(cliente, (-60, 'pagada', 0), (-30, 'pagada', None), (30, 'pendiente', None))
+
+        RiesgoCreditoService.calcular()
+
+        riesgo = RiesgoCliente.objects.get(cliente=cliente)
+        self.assertEqual(riesgo.cuotas_vencidas_total, 1)
+        self.assertEqual(riesgo.proporcion_a_tiempo, 1.0)
+        self.assertEqual(riesgo.dias_atraso_promedio, 0)
+
+    def test_atrasos_e_impagas_suben_el_riesgo(self):
+        puntual = Usuario.objects.create(username='puntual')
+        crear_cuotas(puntual, (-60, 'pagada', 0), (-30, 'pagada', 0), (30, 'pendiente', None))
+        moroso = Usuario.objects.create(username='moroso')
+        crear_cuotas(moroso, (-60, 'pagada', 20), (-30, 'vencida', None), (30, 'pendiente', None))
+
+        RiesgoCreditoService.calcular()
+
+        riesgo_puntual = RiesgoCliente.objects.get(cliente=puntual)
+        riesgo_moroso = RiesgoCliente.objects.get(cliente=moroso)
+        self.assertEqual(riesgo_moroso.cuotas_impagas, 1)
+        self.assertEqual(riesgo_moroso.dias_atraso_max, 30)
+        self.assertEqual(riesgo_moroso.dias_atraso_promedio, 25)
+        self.assertGreater(riesgo_moroso.score, riesgo_puntual.score)
+
+    def test_recalcular_elimina_a_los_que_saldaron_su_deuda(self):
+        cliente = Usuario.objects.create(username='salda')
+        venta = crear_cuotas(cliente, (30, 'pendiente', None))
+        RiesgoCreditoService.calcular()
+
+        venta.cuotas.update(estado='pagada', fecha_pago=timezone.now().date())
+
+        self.assertEqual(RiesgoCreditoService.calcular(), 0)
+        self.assertFalse(RiesgoCliente.objects.exists())
+
+
+class RiesgoEndpointTests(TestCase):
+
+    def setUp(self):
+        self.cliente = Usuario.objects.create(username='cliente')
+        crear_cuotas(self.cliente, (30, 'pendiente', None))
+        RiesgoCreditoService.calcular()
+        self.client = APIClient()
+
+    def test_requiere_autenticacion(self):
+        respuesta = self.client.get('/api/cuotas/riesgo/', {'cliente_id': self.cliente.id})
+
+        self.assertEqual(respuesta.status_code, 401)
+
+    def test_cliente_solo_ve_su_riesgo(self):
+        otro = Usuario.objects.create(username='otro')
+        self.client.force_authenticate(otro)
+        self.assertEqual(
+            self.client.get('/api/cuotas/riesgo/', {'cliente_id': self.cliente.id}).status_code, 403
+        )
+
+        self.client.force_authenticate(self.cliente)
+        self.assertEqual(
+            self.client.get('/api/cuotas/riesgo/', {'cliente_id': self.cliente.id}).status_code, 200
+        )
+
+    def test_staff_ve_cualquier_cliente(self):
+        self.client.force_authenticate(Usuario.objects.create(username='staff', is_staff=True))
+
+        self.assertEqual(
+            self.client.get('/api/cuotas/riesgo/', {'cliente_id': self.cliente.id}).status_code, 200
+        )
+        self.assertEqual(self.client.get('/api/cuotas/riesgo/', {'cliente_id': 999}).status_code, 404)
+
+    def test_cliente_id_no_numerico(self):
+        self.client.force_authenticate(self.cliente)
 
-# Create your tests here.
+        self.assertEqual(self.client.get('/api/cuotas/riesgo/', {'cliente_id': 'x'}).status_code, 400)
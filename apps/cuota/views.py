@@ -4,8 +4,8 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
 
-from .models import CuotaCredito
-from .serializers import CuotaSerializer, MarcarCuotaPagadaSerializer
+from .models import CuotaCredito, RiesgoCliente
+from .serializers import CuotaSerializer, MarcarCuotaPagadaSerializer, RiesgoClienteSerializer
 
 
 class CuotaViewSet(viewsets.ReadOnlyModelViewSet):
@@ -18,6 +18,7 @@ class CuotaViewSet(viewsets.ReadOnlyModelViewSet):
     - GET /api/cuotas/vencidas/           → Cuotas vencidas
     - GET /api/cuotas/proximas_vencer/    → Cuotas próximas a vencer
     - POST /api/cuotas/{id}/marcar_pagada/ → Marcar cuota como pagada
+    - GET /api/cuotas/riesgo/?cliente_id=X → Riesgo crediticio del cliente
     """
     queryset = CuotaCredito.objects.all()
     serializer_class = CuotaSerializer
@@ -105,6 +106,40 @@ class CuotaViewSet(viewsets.ReadOnlyModelViewSet):
             'cuotas': serializer.data
         })
 
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def riesgo(self, request):
+        """
+        GET /api/cuotas/riesgo/?cliente_id=5
+
+        Retorna el riesgo crediticio precalculado del cliente
+        (manage.py compute_credit_risk). Solo para staff o el propio cliente.
+        """
+        try:
+            cliente_id = int(request.query_params.get('cliente_id', ''))
+        except ValueError:
+            return Response(
+                {'error': 'El parámetro cliente_id es requerido y debe ser un número'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not request.user.is_staff and request.user.id != cliente_id:
+            return Response(
+                {'error': 'No tienes permisos para ver el riesgo de este cliente'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        riesgo = RiesgoCliente.objects.select_related('cliente').filter(
+            cliente_id=cliente_id
+        ).first()
+
+        if not riesgo:
+            return Response(
+                {'error': 'El cliente no tiene riesgo calculado'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response(RiesgoClienteSerializer(riesgo).data)
+
     @action(detail=True, methods=['post']) 
     def marcar_pagada(self, request, pk=None):
         """
@@ -0,0 +1,72 @@
+"""
+Management command para evaluar configuraciones del modelo de ventas en el tiempo
+Uso: python manage.py backtest_ml [--folds 4] [--procesos N]
+        [--n-estimators 50 100] [--max-depth 6 10 0] [--min-samples-split 2 5] [--salida resultados.json]
+"""
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from apps.ia.services.backtesting import Backtester
+
+
+class Command(BaseCommand):
+    help = 'Backtesting con origen móvil y búsqueda en grilla (en paralelo) del modelo de ventas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--folds', type=int, default=4, help='Cantidad de cortes temporales (default: 4)')
+        parser.add_argument('--procesos', type=int, help='Procesos del pool (default: núcleos - 1)')
+        parser.add_argument('--n-estimators', type=int, nargs='+', help='Valores de n_estimators')
+        parser.add_argument('--max-depth', type=int, nargs='+', help='Valores de max_depth (0 = sin límite)')
+        parser.add_argument('--min-samples-split', type=int, nargs='+', help='Valores de min_samples_split')
+        parser.add_argument('--salida', help='Guardar los resultados en un archivo JSON')
+
+    def handle(self, *args, **options):
+        grilla = dict(Backtester.GRILLA_DEFECTO)
+        if options['n_estimators']:
+            grilla['n_estimators'] = options['n_estimators']
+        if options['max_depth']:
+            grilla['max_depth'] = [d or None for d in options['max_depth']]
+        if options['min_samples_split']:
+            grilla['min_samples_split'] = options['min_samples_split']
+
+        backtester = Backtester(folds=options['folds'], procesos=options['procesos'])
+        self.stdout.write(self.style.WARNING(
+            f'🧪 Backtesting: {options["folds"]} folds, {backtester.procesos} procesos'
+        ))
+
+        def progreso(hechas, total):
+            self.stdout.write(f'\r   {hechas}/{total} evaluaciones', ending='')
+            self.stdout.flush()
+
+        try:
+            inicio = time.perf_counter()
+            resultados = backtester.ejecutar(grilla=grilla, progreso=progreso)
+            duracion = time.perf_counter() - inicio
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'❌ Error: {str(e)}'))
+            return
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {len(resultados)} configuraciones evaluadas en {duracion:.1f}s '
+            f'({resultados[0]["registros"]} registros)'
+        ))
+        self.stdout.write('')
+        self.stdout.write(
+            f"{'n_est':>6} {'depth':>6} {'split':>6} {'MAE':>10} {'±':>8} {'R²':>8} "
+            f"{'fit (s)':>9} {'pred ms/1k':>11} {'KB':>9}"
+        )
+        for r in resultados:
+            p = r['parametros']
+            self.stdout.write(
+                f"{p['n_estimators']:>6} {str(p['max_depth']):>6} {p['min_samples_split']:>6} "
+                f"{r['mae']:>10.2f} {r['mae_std']:>8.2f} {r['r2']:>8.4f} "
+                f"{r['tiempo_entrenamiento']:>9.3f} {r['prediccion_ms_por_1000']:>11.3f} {r['tamano_kb']:>9.1f}"
+            )
+
+        if options['salida']:
+            with open(options['salida'], 'w') as f:
+                json.dump(resultados, f, indent=2)
+            self.stdout.write('')
+            self.stdout.write(f"💾 Resultados guardados en: {options['salida']}")
@@ -0,0 +1,25 @@
+"""
+Management command para cerrar los días de la detección de anomalías en línea
+Uso: python manage.py close_sales_days
+
+Programar una vez al día (ej: cron a las 00:05). Sin ventas nadie dispara el
+cambio de día, y un día sin ventas también debe poder alertar.
+"""
+from django.core.management.base import BaseCommand
+from apps.ia.services import StreamingAnomalyDetector
+
+
+class Command(BaseCommand):
+    help = 'Incorpora los días cerrados (incluidos los sin ventas) a las estadísticas en línea'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING('📅 Cerrando días de ventas...'))
+
+        try:
+            alertas = StreamingAnomalyDetector.cerrar_dias()
+            for alerta in alertas:
+                self.stdout.write(self.style.ERROR(f"🚨 {alerta.get_tipo_display()}: {alerta.descripcion}"))
+            self.stdout.write(self.style.SUCCESS(f'✅ Días cerrados ({len(alertas)} alertas nuevas)'))
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'❌ Error: {str(e)}'))
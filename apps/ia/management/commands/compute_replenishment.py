@@ -0,0 +1,31 @@
+"""
+Management command para recalcular las sugerencias de reposición de stock
+Uso: python manage.py compute_replenishment [--aplicar-stock-minimo]
+"""
+from django.core.management.base import BaseCommand
+from apps.ia.services import ReplenishmentEngine
+
+
+class Command(BaseCommand):
+    help = 'Calcula punto de reorden, stock de seguridad y cantidad sugerida para todas las variantes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--aplicar-stock-minimo',
+            action='store_true',
+            help='Actualizar stock_minimo de cada variante con el valor sugerido'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING('📦 Calculando sugerencias de reposición...'))
+        
+        try:
+            cantidad = ReplenishmentEngine().calcular(
+                aplicar_stock_minimo=options['aplicar_stock_minimo']
+            )
+            self.stdout.write(self.style.SUCCESS(f'✅ {cantidad} variantes procesadas'))
+            if options['aplicar_stock_minimo']:
+                self.stdout.write('   stock_minimo actualizado con los valores sugeridos')
+            
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'❌ Error: {str(e)}'))
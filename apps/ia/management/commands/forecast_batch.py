@@ -0,0 +1,48 @@
+"""
+Management command para generar pronósticos de todos los productos en lote
+Uso: python manage.py forecast_batch [--periodo mensual|semanal] [--cantidad 3] [--productos 1 2 3]
+"""
+from django.core.management.base import BaseCommand
+from apps.ia.services import BatchForecaster
+
+
+class Command(BaseCommand):
+    help = 'Genera y guarda los pronósticos por producto para el modelo activo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--periodo',
+            choices=['semanal', 'mensual'],
+            default='mensual',
+            help='Tipo de período (default: mensual)'
+        )
+        parser.add_argument(
+            '--cantidad',
+            type=int,
+            default=3,
+            help='Cantidad de períodos a futuro (default: 3)'
+        )
+        parser.add_argument(
+            '--productos',
+            type=int,
+            nargs='+',
+            help='IDs de productos (default: todos)'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING('📈 Generando pronósticos por producto...'))
+        
+        try:
+            pronosticos = BatchForecaster().generar(
+                productos_ids=options['productos'],
+                periodo=options['periodo'],
+                cantidad_periodos=options['cantidad']
+            )
+            productos = len({p['producto_id'] for p in pronosticos})
+            
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ {len(pronosticos)} pronósticos guardados para {productos} productos'
+            ))
+            
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'❌ Error: {str(e)}'))
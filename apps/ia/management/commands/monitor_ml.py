@@ -0,0 +1,58 @@
+"""
+Management command para monitorear la precisión del modelo en producción
+Uso: python manage.py monitor_ml [--sin-reentrenar]
+"""
+from django.core.management.base import BaseCommand
+from apps.ia.services import ModelMonitor
+
+
+class Command(BaseCommand):
+    help = 'Evalúa pronósticos cerrados y la deriva del modelo activo; reentrena si hay deriva'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sin-reentrenar',
+            action='store_true',
+            help='Solo calcular métricas, sin encolar un entrenamiento por deriva'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING('📡 Monitoreando modelo en producción...'))
+        
+        try:
+            monitor = ModelMonitor()
+            resumen = monitor.monitorear(reentrenar=not options['sin_reentrenar'])
+            metricas = monitor.metricas()
+            
+            self.stdout.write(self.style.SUCCESS('✅ Monitoreo completado'))
+            self.stdout.write('')
+            self.stdout.write(f"   Pronósticos evaluados: {resumen['pronosticos_evaluados']}")
+            self.stdout.write(f"   Ventas nuevas evaluadas: {resumen['registros_evaluados']}")
+            
+            produccion = metricas['produccion']
+            if produccion:
+                self.stdout.write('')
+                self.stdout.write("📊 Modelo activo:")
+                self.stdout.write(f"   MAE entrenamiento: {produccion['mae_entrenamiento']:.2f}")
+                self.stdout.write(f"   MAE producción: {produccion['mae_produccion']:.2f} ({produccion['registros']} registros)")
+                if produccion['deriva']:
+                    self.stdout.write(self.style.ERROR(
+                        f"   ⚠️ Deriva: el error supera {produccion['umbral_deriva']}x el de entrenamiento"
+                    ))
+            
+            pronosticos = metricas['pronosticos']
+            if pronosticos['evaluados']:
+                self.stdout.write('')
+                self.stdout.write(f"📈 Pronósticos (últimos {pronosticos['ventana_dias']} días):")
+                self.stdout.write(f"   MAE: {pronosticos['mae']:.2f}")
+                if pronosticos['wape'] is not None:
+                    self.stdout.write(f"   WAPE: {pronosticos['wape']:.2%}")
+            
+            if resumen['reentrenamiento']:
+                trabajo = resumen['reentrenamiento']
+                estado = 'encolado' if trabajo['creado'] else 'ya en curso'
+                self.stdout.write('')
+                self.stdout.write(self.style.WARNING(f"🔁 Reentrenamiento {estado}: trabajo #{trabajo['trabajo_id']}"))
+                
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'❌ Error: {str(e)}'))
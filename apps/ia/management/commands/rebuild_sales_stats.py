@@ -0,0 +1,28 @@
+"""
+Management command para inicializar la detección de anomalías en línea
+Uso: python manage.py rebuild_sales_stats [--dias N]
+"""
+from django.core.management.base import BaseCommand
+from apps.ia.services import StreamingAnomalyDetector
+
+
+class Command(BaseCommand):
+    help = 'Recalcula desde el historial las estadísticas usadas por la detección de anomalías en línea'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias',
+            type=int,
+            default=90,
+            help='Número de días de historial (default: 90)'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING(f'📈 Recalculando estadísticas de los últimos {options["dias"]} días...'))
+        
+        try:
+            cantidad = StreamingAnomalyDetector.reconstruir(dias=options['dias'])
+            self.stdout.write(self.style.SUCCESS(f'✅ {cantidad} estadísticas (general y por producto) inicializadas'))
+            
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'❌ Error: {str(e)}'))
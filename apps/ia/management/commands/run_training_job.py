@@ -0,0 +1,23 @@
+"""
+Management command que ejecuta un trabajo de entrenamiento encolado
+Uso: python manage.py run_training_job <trabajo_id>
+
+Normalmente lo lanza TrainingJobService en un proceso separado.
+"""
+from django.core.management.base import BaseCommand
+from apps.ia.services import TrainingJobService
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta un trabajo de entrenamiento de ML encolado'
+
+    def add_arguments(self, parser):
+        parser.add_argument('trabajo_id', type=int, help='ID del TrabajoEntrenamiento')
+
+    def handle(self, *args, **options):
+        trabajo = TrainingJobService.ejecutar(options['trabajo_id'])
+        
+        if trabajo.estado == 'completado':
+            self.stdout.write(self.style.SUCCESS(f'✅ Trabajo #{trabajo.id} completado'))
+        else:
+            self.stdout.write(self.style.ERROR(f'❌ Trabajo #{trabajo.id} fallido: {trabajo.error}'))
@@ -1,34 +1,64 @@
 """
 Management command para entrenar modelos de ML
-Uso: python manage.py train_ml
+Uso: python manage.py train_ml [--modo auto|completo|incremental] [--background]
 """
 from django.core.management.base import BaseCommand
-from apps.ia.services import MLService
+from apps.ia.services import TrainingJobService
 
 
 class Command(BaseCommand):
     help = 'Entrena o re-entrena los modelos de Machine Learning'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modo',
+            choices=['auto', 'completo', 'incremental'],
+            default='auto',
+            help='Tipo de entrenamiento (default: auto)'
+        )
+        parser.add_argument(
+            '--background',
+            action='store_true',
+            help='Encolar el entrenamiento en un proceso separado y retornar de inmediato'
+        )
+
     def handle(self, *args, **options):
-        self.stdout.write(self.style.WARNING('🤖 Iniciando entrenamiento de modelos ML...'))
-        self.stdout.write('')
-        
+        if options['background']:
+            trabajo, creado = TrainingJobService.encolar(modo=options['modo'])
+            if creado:
+                self.stdout.write(self.style.SUCCESS(f'📨 Entrenamiento encolado: trabajo #{trabajo.id}'))
+            else:
+                self.stdout.write(self.style.WARNING(f'⏳ Ya hay un entrenamiento en curso: trabajo #{trabajo.id}'))
+            return
+
         try:
-            ml_service = MLService()
-            resultado = ml_service.entrenar()
-            
-            if resultado['success']:
+            trabajo, creado = TrainingJobService.crear(modo=options['modo'])
+            if not creado:
+                self.stdout.write(self.style.WARNING(f'⏳ Ya hay un entrenamiento en curso: trabajo #{trabajo.id}'))
+                return
+
+            self.stdout.write(self.style.WARNING('🤖 Iniciando entrenamiento de modelos ML...'))
+            self.stdout.write('')
+            trabajo = TrainingJobService.ejecutar(trabajo.id)
+
+            if trabajo.estado == 'completado' and trabajo.resultado['modo'] == 'sin_cambios':
+                self.stdout.write(self.style.SUCCESS(
+                    f"✅ Sin datos nuevos suficientes: se conserva el modelo activo "
+                    f"(versión {trabajo.resultado['version']})"
+                ))
+            elif trabajo.estado == 'completado':
+                resultado = trabajo.resultado
                 self.stdout.write(self.style.SUCCESS('✅ Entrenamiento completado exitosamente'))
                 self.stdout.write('')
                 self.stdout.write(f"📊 Métricas:")
                 self.stdout.write(f"   MAE: {resultado['metricas']['mae']:.2f}")
-                self.stdout.write(f"   R² Score: {resultado['metricas']['r2']:.4f}")
-                self.stdout.write(f"   Registros entrenamiento: {resultado['metricas']['registros_train']}")
+                self.stdout.write(f"   R² Score: {resultado['metricas']['r2_score']:.4f}")
+                self.stdout.write(f"   Registros entrenamiento: {resultado['metricas']['registros_entrenamiento']}")
                 self.stdout.write('')
-                self.stdout.write(f"💾 Modelo guardado: {resultado['archivo']}")
-                self.stdout.write(f"📌 Versión: {resultado['version']}")
+                self.stdout.write(f"💾 Modelo guardado: {resultado['archivo_modelo']}")
+                self.stdout.write(f"📌 Versión: {resultado['version']} ({resultado['modo']})")
             else:
-                self.stdout.write(self.style.ERROR(f'❌ Error: {resultado["error"]}'))
-                
+                self.stdout.write(self.style.ERROR(f'❌ Error: {trabajo.error}'))
+
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'❌ Error inesperado: {str(e)}'))
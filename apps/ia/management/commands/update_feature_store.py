@@ -0,0 +1,33 @@
+"""
+Management command para mantener el feature store de ventas diarias
+Uso: python manage.py update_feature_store [--rebuild]
+"""
+from django.core.management.base import BaseCommand
+from apps.ia.services import FeatureStore
+
+
+class Command(BaseCommand):
+    help = 'Actualiza de forma incremental (o reconstruye) el feature store de ventas por producto y día'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Borrar y recalcular toda la tabla desde las transacciones'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            store = FeatureStore()
+            
+            if options['rebuild']:
+                self.stdout.write(self.style.WARNING('🔄 Reconstruyendo feature store...'))
+                filas = store.reconstruir()
+            else:
+                self.stdout.write(self.style.WARNING('📊 Actualizando feature store...'))
+                filas = store.actualizar()
+            
+            self.stdout.write(self.style.SUCCESS(f'✅ {filas} filas (producto, día) escritas'))
+            
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'❌ Error: {str(e)}'))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:29
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ia', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrabajoEntrenamiento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('ejecutando', 'Ejecutando'), ('completado', 'Completado'), ('fallido', 'Fallido')], default='pendiente', max_length=20)),
+                ('etapa', models.CharField(choices=[('en_cola', 'En cola'), ('extrayendo', 'Extrayendo datos'), ('entrenando', 'Entrenando modelos'), ('evaluando', 'Evaluando modelo'), ('guardando', 'Guardando modelo'), ('finalizado', 'Finalizado')], default='en_cola', max_length=20)),
+                ('progreso', models.PositiveSmallIntegerField(default=0, help_text='Porcentaje de avance 0-100')),
+                ('fecha_creacion', models.DateTimeField(default=django.utils.timezone.now)),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True)),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('pid', models.IntegerField(blank=True, help_text='PID del proceso que ejecuta el trabajo', null=True)),
+                ('resultado', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('modelo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trabajos', to='ia.modeloentrenamiento')),
+                ('solicitado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trabajos_entrenamiento', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Trabajo de Entrenamiento',
+                'verbose_name_plural': 'Trabajos de Entrenamiento',
+                'ordering': ['-fecha_creacion'],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ia', '0002_trabajoentrenamiento'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='modeloentrenamiento',
+            name='fecha_corte_datos',
+            field=models.DateField(blank=True, help_text='Fecha de la venta más reciente incluida', null=True),
+        ),
+        migrations.AddField(
+            model_name='modeloentrenamiento',
+            name='modelo_base',
+            field=models.ForeignKey(blank=True, help_text='Modelo sobre el que se agregaron árboles (solo incremental)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='modelos_derivados', to='ia.modeloentrenamiento'),
+        ),
+        migrations.AddField(
+            model_name='modeloentrenamiento',
+            name='tipo_entrenamiento',
+            field=models.CharField(choices=[('completo', 'Completo'), ('incremental', 'Incremental')], default='completo', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='modeloentrenamiento',
+            name='ultima_venta_id',
+            field=models.BigIntegerField(blank=True, help_text='Marca de agua: última venta incluida en el entrenamiento', null=True),
+        ),
+        migrations.AddField(
+            model_name='trabajoentrenamiento',
+            name='modo',
+            field=models.CharField(choices=[('auto', 'Automático'), ('completo', 'Completo'), ('incremental', 'Incremental')], default='auto', max_length=20),
+        ),
+    ]
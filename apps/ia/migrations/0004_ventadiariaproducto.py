@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ia', '0003_modeloentrenamiento_fecha_corte_datos_and_more'),
+        ('productos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VentaDiariaProducto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('unidades', models.PositiveIntegerField(default=0)),
+                ('ingresos', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('cantidad_detalles', models.PositiveIntegerField(default=0)),
+                ('promedio_movil_7d', models.FloatField(default=0)),
+                ('promedio_movil_30d', models.FloatField(default=0)),
+                ('ingresos_60d', models.FloatField(default=0, help_text='Ingresos de los últimos 60 días')),
+                ('ingresos_60d_anterior', models.FloatField(default=0, help_text='Ingresos de los 60 días previos')),
+                ('tendencia_60d', models.FloatField(default=0, help_text='Cambio relativo entre ambas ventanas de 60 días')),
+                ('ultimo_detalle_id', models.BigIntegerField(db_index=True, help_text='Mayor DetalleVenta incluido (marca de agua de actualización)')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ventas_diarias', to='productos.producto')),
+            ],
+            options={
+                'verbose_name': 'Venta Diaria por Producto',
+                'verbose_name_plural': 'Ventas Diarias por Producto',
+                'ordering': ['producto', 'fecha'],
+                'indexes': [models.Index(fields=['fecha'], name='ia_ventadia_fecha_2ab57e_idx')],
+                'unique_together': {('producto', 'fecha')},
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:37
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ia', '0004_ventadiariaproducto'),
+        ('productos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PronosticoProducto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo_periodo', models.CharField(choices=[('semanal', 'Semanal'), ('mensual', 'Mensual')], max_length=10)),
+                ('periodo', models.CharField(help_text='Periodo predicho (ej: 2025-11)', max_length=20)),
+                ('fecha_inicio', models.DateField()),
+                ('fecha_fin', models.DateField()),
+                ('ventas_predichas', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('cantidad_predicha', models.IntegerField(default=0)),
+                ('ventas_historicas', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('tendencia', models.CharField(max_length=20)),
+                ('recomendacion', models.CharField(max_length=200)),
+                ('fecha_generacion', models.DateTimeField(default=django.utils.timezone.now)),
+                ('modelo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='pronosticos', to='ia.modeloentrenamiento')),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pronosticos', to='productos.producto')),
+            ],
+            options={
+                'verbose_name': 'Pronóstico de Producto',
+                'verbose_name_plural': 'Pronósticos de Productos',
+                'ordering': ['producto', 'fecha_inicio'],
+                'unique_together': {('modelo', 'producto', 'tipo_periodo', 'fecha_inicio')},
+            },
+        ),
+    ]
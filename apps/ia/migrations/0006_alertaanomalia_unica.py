@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:37
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def eliminar_alertas_duplicadas(apps, schema_editor):
+    """
+    Conserva la alerta más antigua de cada (tipo, fecha_referencia, producto_id)
+    """
+    AlertaAnomalia = apps.get_model('ia', 'AlertaAnomalia')
+
+    conservar = AlertaAnomalia.objects.values(
+        'tipo', 'fecha_referencia', 'producto_id'
+    ).annotate(primera=Min('id')).values_list('primera', flat=True)
+
+    AlertaAnomalia.objects.exclude(id__in=list(conservar)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ia', '0005_pronosticoproducto'),
+    ]
+
+    operations = [
+        migrations.RunPython(eliminar_alertas_duplicadas, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='alertaanomalia',
+            constraint=models.UniqueConstraint(condition=models.Q(('producto_id__isnull', False)), fields=('tipo', 'fecha_referencia', 'producto_id'), name='alerta_unica_producto'),
+        ),
+        migrations.AddConstraint(
+            model_name='alertaanomalia',
+            constraint=models.UniqueConstraint(condition=models.Q(('producto_id__isnull', True)), fields=('tipo', 'fecha_referencia'), name='alerta_unica_general'),
+        ),
+    ]
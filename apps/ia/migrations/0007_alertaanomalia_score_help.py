@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ia', '0006_alertaanomalia_unica'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='alertaanomalia',
+            name='score_anomalia',
+            field=models.FloatField(help_text='Score de anomalía (negativo = anómalo; decision_function del IsolationForest o -1 por z-score)'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ia', '0007_alertaanomalia_score_help'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadisticaVentas',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(help_text="'general' o 'producto:<id>'", max_length=50, unique=True)),
+                ('producto_id', models.IntegerField(blank=True, null=True)),
+                ('producto_nombre', models.CharField(blank=True, max_length=200, null=True)),
+                ('dia_actual', models.DateField(blank=True, null=True)),
+                ('total_dia', models.FloatField(default=0)),
+                ('dias_observados', models.PositiveIntegerField(default=0)),
+                ('media', models.FloatField(default=0)),
+                ('m2', models.FloatField(default=0, help_text='Suma de cuadrados de las diferencias (Welford)')),
+                ('ewma', models.FloatField(default=0)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Estadística de Ventas',
+                'verbose_name_plural': 'Estadísticas de Ventas',
+            },
+        ),
+    ]
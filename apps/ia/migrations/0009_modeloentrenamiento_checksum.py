@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ia', '0008_estadisticaventas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='modeloentrenamiento',
+            name='checksum',
+            field=models.CharField(blank=True, help_text='SHA-256 del artefacto comprimido', max_length=64, null=True),
+        ),
+        migrations.AlterField(
+            model_name='modeloentrenamiento',
+            name='archivo_modelo',
+            field=models.CharField(help_text='Nombre del artefacto (.pkl.z comprimido o .pkl)', max_length=255),
+        ),
+    ]
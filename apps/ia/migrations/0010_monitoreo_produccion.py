@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ia', '0009_modeloentrenamiento_checksum'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='modeloentrenamiento',
+            name='fecha_monitoreo',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='modeloentrenamiento',
+            name='mae_produccion',
+            field=models.FloatField(blank=True, help_text='MAE sobre ventas posteriores al entrenamiento', null=True),
+        ),
+        migrations.AddField(
+            model_name='modeloentrenamiento',
+            name='registros_produccion',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='modeloentrenamiento',
+            name='ultima_venta_monitoreada',
+            field=models.BigIntegerField(blank=True, help_text='Marca de agua: última venta evaluada por el monitoreo', null=True),
+        ),
+        migrations.AddField(
+            model_name='pronosticoproducto',
+            name='cantidad_real',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='pronosticoproducto',
+            name='error_absoluto',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='pronosticoproducto',
+            name='fecha_evaluacion',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='pronosticoproducto',
+            name='ventas_reales',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:47
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ia', '0010_monitoreo_produccion'),
+        ('producto_variante', '0002_varianteproducto_dias_reposicion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SugerenciaReposicion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('demanda_diaria', models.FloatField(help_text='Unidades por día pronosticadas')),
+                ('desviacion_diaria', models.FloatField(default=0)),
+                ('dias_reposicion', models.PositiveIntegerField()),
+                ('stock_seguridad', models.PositiveIntegerField(default=0)),
+                ('punto_reorden', models.PositiveIntegerField(default=0, help_text='Pedir cuando el stock llegue a este nivel')),
+                ('nivel_objetivo', models.PositiveIntegerField(default=0, help_text='Stock a alcanzar al reponer')),
+                ('stock_minimo_sugerido', models.PositiveIntegerField(default=0)),
+                ('stock_actual', models.PositiveIntegerField(default=0)),
+                ('dias_cobertura', models.FloatField(blank=True, help_text='Días que cubre el stock actual', null=True)),
+                ('fecha_calculo', models.DateTimeField(default=django.utils.timezone.now)),
+                ('variante', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sugerencia_reposicion', to='producto_variante.varianteproducto')),
+            ],
+            options={
+                'verbose_name': 'Sugerencia de Reposición',
+                'verbose_name_plural': 'Sugerencias de Reposición',
+                'ordering': ['variante'],
+            },
+        ),
+    ]
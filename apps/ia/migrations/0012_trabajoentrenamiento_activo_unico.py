@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 23:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ia', '0011_sugerenciareposicion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='trabajoentrenamiento',
+            constraint=models.UniqueConstraint(condition=models.Q(('estado__in', ['pendiente', 'ejecutando'])), fields=('estado',), name='trabajo_entrenamiento_activo_unico'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 23:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ia', '0012_trabajoentrenamiento_activo_unico'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='trabajoentrenamiento',
+            name='trabajo_entrenamiento_activo_unico',
+        ),
+        migrations.AddConstraint(
+            model_name='trabajoentrenamiento',
+            constraint=models.UniqueConstraint(models.Value(True), condition=models.Q(('estado__in', ['pendiente', 'ejecutando'])), name='trabajo_entrenamiento_un_activo'),
+        ),
+    ]
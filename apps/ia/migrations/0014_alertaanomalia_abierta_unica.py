@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 23:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ia', '0013_trabajoentrenamiento_un_activo'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='alertaanomalia',
+            name='alerta_unica_producto',
+        ),
+        migrations.RemoveConstraint(
+            model_name='alertaanomalia',
+            name='alerta_unica_general',
+        ),
+        migrations.AddConstraint(
+            model_name='alertaanomalia',
+            constraint=models.UniqueConstraint(condition=models.Q(('estado__in', ['nueva', 'revisada']), ('producto_id__isnull', False)), fields=('tipo', 'fecha_referencia', 'producto_id'), name='alerta_abierta_unica_producto'),
+        ),
+        migrations.AddConstraint(
+            model_name='alertaanomalia',
+            constraint=models.UniqueConstraint(condition=models.Q(('estado__in', ['nueva', 'revisada']), ('producto_id__isnull', True)), fields=('tipo', 'fecha_referencia'), name='alerta_abierta_unica_general'),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
@@ -18,7 +19,39 @@ class ModeloEntrenamiento(models.Model):
     # Metadatos del entrenamiento
     registros_entrenamiento = models.IntegerField(default=0)
     registros_prueba = models.IntegerField(default=0)
-    archivo_modelo = models.CharField(max_length=255, help_text='Ruta del archivo .pkl')
+    archivo_modelo = models.CharField(max_length=255, help_text='Nombre del artefacto (.pkl.z comprimido o .pkl)')
+    checksum = models.CharField(max_length=64, null=True, blank=True, help_text='SHA-256 del artefacto comprimido')
+    
+    # Entrenamiento incremental
+    TIPO_ENTRENAMIENTO_CHOICES = (
+        ('completo', 'Completo'),
+        ('incremental', 'Incremental'),
+    )
+    tipo_entrenamiento = models.CharField(
+        max_length=20, choices=TIPO_ENTRENAMIENTO_CHOICES, default='completo'
+    )
+    modelo_base = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='modelos_derivados',
+        help_text='Modelo sobre el que se agregaron árboles (solo incremental)'
+    )
+    ultima_venta_id = models.BigIntegerField(
+        null=True, blank=True, help_text='Marca de agua: última venta incluida en el entrenamiento'
+    )
+    fecha_corte_datos = models.DateField(
+        null=True, blank=True, help_text='Fecha de la venta más reciente incluida'
+    )
+    
+    # Monitoreo en producción (predicciones vs ventas reales posteriores al corte)
+    mae_produccion = models.FloatField(null=True, blank=True, help_text='MAE sobre ventas posteriores al entrenamiento')
+    registros_produccion = models.IntegerField(default=0)
+    ultima_venta_monitoreada = models.BigIntegerField(
+        null=True, blank=True, help_text='Marca de agua: última venta evaluada por el monitoreo'
+    )
+    fecha_monitoreo = models.DateTimeField(null=True, blank=True)
     
     activo = models.BooleanField(default=True)
     notas = models.TextField(blank=True, null=True)
@@ -55,7 +88,7 @@ class AlertaAnomalia(models.Model):
     fecha_referencia = models.DateField(help_text='Fecha de la venta anómala')
     
     descripcion = models.TextField()
-    score_anomalia = models.FloatField(help_text='Score de anomalía (-1 = anomalía, 1 = normal)')
+    score_anomalia = models.FloatField(help_text='Score de anomalía (negativo = anómalo; decision_function del IsolationForest o -1 por z-score)')
     
     # Datos contextuales
     producto_id = models.IntegerField(null=True, blank=True)
@@ -70,6 +103,257 @@ class AlertaAnomalia(models.Model):
         ordering = ['-fecha_deteccion']
         verbose_name = 'Alerta de Anomalía'
         verbose_name_plural = 'Alertas de Anomalías'
+        constraints = [
+            # Una sola alerta abierta (nueva o revisada) por tipo, día y producto
+            # (o día, si es general); una vez resuelta se puede volver a alertar
+            models.UniqueConstraint(
+                fields=['tipo', 'fecha_referencia', 'producto_id'],
+                condition=models.Q(producto_id__isnull=False, estado__in=['nueva', 'revisada']),
+                name='alerta_abierta_unica_producto'
+            ),
+            models.UniqueConstraint(
+                fields=['tipo', 'fecha_referencia'],
+                condition=models.Q(producto_id__isnull=True, estado__in=['nueva', 'revisada']),
+                name='alerta_abierta_unica_general'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.get_tipo_display()} - {self.fecha_referencia}"
+
+
+class TrabajoEntrenamiento(models.Model):
+    """
+    Trabajo de entrenamiento ejecutado en un proceso separado
+    """
+    ESTADO_CHOICES = (
+        ('pendiente', 'Pendiente'),
+        ('ejecutando', 'Ejecutando'),
+        ('completado', 'Completado'),
+        ('fallido', 'Fallido'),
+    )
+    
+    ETAPA_CHOICES = (
+        ('en_cola', 'En cola'),
+        ('extrayendo', 'Extrayendo datos'),
+        ('entrenando', 'Entrenando modelos'),
+        ('evaluando', 'Evaluando modelo'),
+        ('guardando', 'Guardando modelo'),
+        ('finalizado', 'Finalizado'),
+    )
+    
+    MODO_CHOICES = (
+        ('auto', 'Automático'),
+        ('completo', 'Completo'),
+        ('incremental', 'Incremental'),
+    )
+    
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='pendiente')
+    modo = models.CharField(max_length=20, choices=MODO_CHOICES, default='auto')
+    etapa = models.CharField(max_length=20, choices=ETAPA_CHOICES, default='en_cola')
+    progreso = models.PositiveSmallIntegerField(default=0, help_text='Porcentaje de avance 0-100')
+    
+    solicitado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='trabajos_entrenamiento'
+    )
+    fecha_creacion = models.DateTimeField(default=timezone.now)
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    pid = models.IntegerField(null=True, blank=True, help_text='PID del proceso que ejecuta el trabajo')
+    
+    modelo = models.ForeignKey(
+        ModeloEntrenamiento,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='trabajos'
+    )
+    resultado = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['-fecha_creacion']
+        verbose_name = 'Trabajo de Entrenamiento'
+        verbose_name_plural = 'Trabajos de Entrenamiento'
+        constraints = [
+            # Un solo trabajo activo (pendiente o ejecutando) en todo el sistema:
+            # índice único sobre una constante, limitado a los estados activos
+            models.UniqueConstraint(
+                models.Value(True),
+                condition=models.Q(estado__in=['pendiente', 'ejecutando']),
+                name='trabajo_entrenamiento_un_activo'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"Entrenamiento #{self.id} - {self.get_estado_display()} ({self.progreso}%)"
+
+
+class VentaDiariaProducto(models.Model):
+    """
+    Feature store: ventas agregadas por producto y día, con promedios
+    móviles y tendencia precalculados. Solo existen filas para los días
+    en que el producto tuvo ventas.
+    """
+    producto = models.ForeignKey(
+        'productos.Producto',
+        on_delete=models.CASCADE,
+        related_name='ventas_diarias'
+    )
+    fecha = models.DateField()
+    
+    unidades = models.PositiveIntegerField(default=0)
+    ingresos = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    cantidad_detalles = models.PositiveIntegerField(default=0)
+    
+    # Features calculadas sobre la serie diaria (días sin ventas cuentan como 0)
+    promedio_movil_7d = models.FloatField(default=0)
+    promedio_movil_30d = models.FloatField(default=0)
+    ingresos_60d = models.FloatField(default=0, help_text='Ingresos de los últimos 60 días')
+    ingresos_60d_anterior = models.FloatField(default=0, help_text='Ingresos de los 60 días previos')
+    tendencia_60d = models.FloatField(default=0, help_text='Cambio relativo entre ambas ventanas de 60 días')
+    
+    ultimo_detalle_id = models.BigIntegerField(
+        db_index=True, help_text='Mayor DetalleVenta incluido (marca de agua de actualización)'
+    )
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Venta Diaria por Producto'
+        verbose_name_plural = 'Ventas Diarias por Producto'
+        ordering = ['producto', 'fecha']
+        unique_together = ['producto', 'fecha']
+        indexes = [
+            models.Index(fields=['fecha']),
+        ]
+    
+    def __str__(self):
+        return f"Producto #{self.producto_id} - {self.fecha}: {self.unidades} u."
+
+
+class PronosticoProducto(models.Model):
+    """
+    Pronóstico precalculado por producto y período, generado en lote para
+    una versión de modelo. El endpoint por producto lo sirve como consulta.
+    """
+    TIPO_PERIODO_CHOICES = [
+        ('semanal', 'Semanal'),
+        ('mensual', 'Mensual'),
+    ]
+    
+    modelo = models.ForeignKey(
+        ModeloEntrenamiento,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='pronosticos'
+    )
+    producto = models.ForeignKey(
+        'productos.Producto',
+        on_delete=models.CASCADE,
+        related_name='pronosticos'
+    )
+    tipo_periodo = models.CharField(max_length=10, choices=TIPO_PERIODO_CHOICES)
+    periodo = models.CharField(max_length=20, help_text='Periodo predicho (ej: 2025-11)')
+    fecha_inicio = models.DateField()
+    fecha_fin = models.DateField()
+    
+    ventas_predichas = models.DecimalField(max_digits=12, decimal_places=2)
+    cantidad_predicha = models.IntegerField(default=0)
+    ventas_historicas = models.DecimalField(max_digits=12, decimal_places=2)
+    tendencia = models.CharField(max_length=20)
+    recomendacion = models.CharField(max_length=200)
+    
+    fecha_generacion = models.DateTimeField(default=timezone.now)
+    
+    # Resultado real, completado cuando el período cierra
+    ventas_reales = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    cantidad_real = models.IntegerField(null=True, blank=True)
+    error_absoluto = models.FloatField(null=True, blank=True)
+    fecha_evaluacion = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Pronóstico de Producto'
+        verbose_name_plural = 'Pronósticos de Productos'
+        ordering = ['producto', 'fecha_inicio']
+        unique_together = ['modelo', 'producto', 'tipo_periodo', 'fecha_inicio']
+    
+    def __str__(self):
+        return f"Producto #{self.producto_id} - {self.periodo}: {self.ventas_predichas}"
+
+
+class EstadisticaVentas(models.Model):
+    """
+    Estadísticas acumuladas de ventas diarias (general o por producto) para
+    la detección de anomalías en línea. Se actualizan con cada venta
+    confirmada: media y varianza por el método de Welford y un promedio
+    móvil exponencial (EWMA) sobre los totales de los días ya cerrados.
+    """
+    clave = models.CharField(max_length=50, unique=True, help_text="'general' o 'producto:<id>'")
+    producto_id = models.IntegerField(null=True, blank=True)
+    producto_nombre = models.CharField(max_length=200, null=True, blank=True)
+    
+    # Día en curso (aún no incorporado a las estadísticas)
+    dia_actual = models.DateField(null=True, blank=True)
+    total_dia = models.FloatField(default=0)
+    
+    # Días cerrados
+    dias_observados = models.PositiveIntegerField(default=0)
+    media = models.FloatField(default=0)
+    m2 = models.FloatField(default=0, help_text='Suma de cuadrados de las diferencias (Welford)')
+    ewma = models.FloatField(default=0)
+    
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Estadística de Ventas'
+        verbose_name_plural = 'Estadísticas de Ventas'
+    
+    def __str__(self):
+        return f"{self.clave} - {self.dias_observados} días (media: {self.media:.2f})"
+    
+    @property
+    def desviacion(self):
+        if self.dias_observados < 2:
+            return 0.0
+        return (self.m2 / self.dias_observados) ** 0.5
+
+
+class SugerenciaReposicion(models.Model):
+    """
+    Punto de reorden y cantidad sugerida por variante, precalculados a
+    partir de la demanda pronosticada y el tiempo de reposición
+    """
+    variante = models.OneToOneField(
+        'producto_variante.VarianteProducto',
+        on_delete=models.CASCADE,
+        related_name='sugerencia_reposicion'
+    )
+    
+    demanda_diaria = models.FloatField(help_text='Unidades por día pronosticadas')
+    desviacion_diaria = models.FloatField(default=0)
+    dias_reposicion = models.PositiveIntegerField()
+    
+    stock_seguridad = models.PositiveIntegerField(default=0)
+    punto_reorden = models.PositiveIntegerField(default=0, help_text='Pedir cuando el stock llegue a este nivel')
+    nivel_objetivo = models.PositiveIntegerField(default=0, help_text='Stock a alcanzar al reponer')
+    stock_minimo_sugerido = models.PositiveIntegerField(default=0)
+    
+    # Foto del stock al momento del cálculo
+    stock_actual = models.PositiveIntegerField(default=0)
+    dias_cobertura = models.FloatField(null=True, blank=True, help_text='Días que cubre el stock actual')
+    
+    fecha_calculo = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = 'Sugerencia de Reposición'
+        verbose_name_plural = 'Sugerencias de Reposición'
+        ordering = ['variante']
+    
+    def __str__(self):
+        return f"Variante #{self.variante_id} - reorden en {self.punto_reorden} u."
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import ModeloEntrenamiento, AlertaAnomalia
+from .models import ModeloEntrenamiento, AlertaAnomalia, TrabajoEntrenamiento, SugerenciaReposicion
 
 
 class ModeloEntrenamientoSerializer(serializers.ModelSerializer):
@@ -12,14 +12,60 @@ class ModeloEntrenamientoSerializer(serializers.ModelSerializer):
             'id', 'nombre', 'version', 'fecha_entrenamiento',
             'mae', 'mse', 'r2_score', 
             'registros_entrenamiento', 'registros_prueba',
-            'archivo_modelo', 'activo', 'notas'
+            'archivo_modelo', 'checksum', 'tipo_entrenamiento', 'modelo_base',
+            'ultima_venta_id', 'fecha_corte_datos', 'mae_produccion', 'registros_produccion',
+            'fecha_monitoreo', 'activo', 'notas'
         ]
         read_only_fields = [
             'id', 'fecha_entrenamiento', 'mae', 'mse', 'r2_score',
-            'registros_entrenamiento', 'registros_prueba', 'archivo_modelo'
+            'registros_entrenamiento', 'registros_prueba', 'archivo_modelo', 'checksum',
+            'tipo_entrenamiento', 'modelo_base', 'ultima_venta_id', 'fecha_corte_datos',
+            'mae_produccion', 'registros_produccion', 'fecha_monitoreo'
         ]
 
 
+class TrabajoEntrenamientoSerializer(serializers.ModelSerializer):
+    """
+    Serializer para el estado de un trabajo de entrenamiento
+    """
+    estado_display = serializers.CharField(source='get_estado_display', read_only=True)
+    etapa_display = serializers.CharField(source='get_etapa_display', read_only=True)
+    
+    class Meta:
+        model = TrabajoEntrenamiento
+        fields = [
+            'id', 'estado', 'estado_display', 'modo', 'etapa', 'etapa_display', 'progreso',
+            'fecha_creacion', 'fecha_inicio', 'fecha_fin', 'fecha_actualizacion',
+            'modelo', 'resultado', 'error'
+        ]
+        read_only_fields = fields
+
+
+class SugerenciaReposicionSerializer(serializers.ModelSerializer):
+    """
+    Serializer para sugerencias de reposición (cantidad según el stock actual)
+    """
+    producto_id = serializers.IntegerField(source='variante.producto_id', read_only=True)
+    producto_nombre = serializers.CharField(source='variante.producto.nombre', read_only=True)
+    talla = serializers.CharField(source='variante.talla', read_only=True)
+    stock = serializers.IntegerField(source='variante.stock', read_only=True)
+    stock_minimo = serializers.IntegerField(source='variante.stock_minimo', read_only=True)
+    cantidad_sugerida = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = SugerenciaReposicion
+        fields = [
+            'variante', 'producto_id', 'producto_nombre', 'talla',
+            'stock', 'stock_minimo', 'demanda_diaria', 'dias_reposicion',
+            'stock_seguridad', 'punto_reorden', 'nivel_objetivo',
+            'stock_minimo_sugerido', 'cantidad_sugerida', 'dias_cobertura', 'fecha_calculo'
+        ]
+        read_only_fields = fields
+    
+    def get_cantidad_sugerida(self, obj):
+        return max(0, obj.nivel_objetivo - obj.variante.stock)
+
+
 class AlertaAnomaliaSerializer(serializers.ModelSerializer):
     """
     Serializer para alertas de anomalías
@@ -1,6 +1,36 @@
 # apps/ia/services/__init__.py
-from .ml_service import MLService
-from .predictor import Predictor
-from .anomaly_detector import AnomalyDetector
+#
+# Los servicios se importan bajo demanda: cargar ml_service trae pandas,
+# scikit-learn y joblib, y la mayoría de los workers web nunca atienden una
+# petición de IA. `from apps.ia.services import MLService` sigue funcionando,
+# pero el módulo recién se importa en ese momento.
+import importlib
 
-__all__ = ['MLService', 'Predictor', 'AnomalyDetector']
+_SERVICIOS = {
+    'MLService': '.ml_service',
+    'Predictor': '.predictor',
+    'AnomalyDetector': '.anomaly_detector',
+    'ModelRegistry': '.model_registry',
+    'TrainingJobService': '.training_jobs',
+    'FeatureStore': '.feature_store',
+    'BatchForecaster': '.batch_forecaster',
+    'StreamingAnomalyDetector': '.streaming_detector',
+    'ArtifactStore': '.artifact_store',
+    'ModelMonitor': '.monitoring',
+    'ReplenishmentEngine': '.replenishment',
+    'AlertService': '.alertas',
+}
+
+__all__ = list(_SERVICIOS)
+
+
+def __getattr__(nombre):
+    if nombre in _SERVICIOS:
+        valor = getattr(importlib.import_module(_SERVICIOS[nombre], __name__), nombre)
+        globals()[nombre] = valor
+        return valor
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,63 @@
+from django.db import IntegrityError, transaction
+
+from apps.ia.models import AlertaAnomalia
+
+
+class AlertService:
+    """
+    Inserción de alertas de anomalías sin duplicar las abiertas.
+
+    Lo usan la detección por lotes y la detección en línea. No depende de
+    pandas: se importa en cada venta confirmada.
+    """
+
+    ESTADOS_ABIERTOS = ['nueva', 'revisada']
+
+    @staticmethod
+    def clave(alerta):
+        return (alerta.tipo, alerta.fecha_referencia, alerta.producto_id)
+
+    @staticmethod
+    def guardar(alertas):
+        """
+        Inserta las alertas que no tienen ya una alerta abierta con la misma
+        clave (tipo, día, producto).
+
+        Returns:
+            list: solo las alertas insertadas por esta llamada
+        """
+        nuevas = {}
+        for alerta in alertas:
+            nuevas.setdefault(AlertService.clave(alerta), alerta)
+        if not nuevas:
+            return []
+
+        abiertas = AlertaAnomalia.objects.filter(
+            estado__in=AlertService.ESTADOS_ABIERTOS,
+            tipo__in={tipo for tipo, _, _ in nuevas},
+            fecha_referencia__in={fecha for _, fecha, _ in nuevas},
+        ).values_list('tipo', 'fecha_referencia', 'producto_id')
+        for clave in abiertas:
+            nuevas.pop(clave, None)
+        if not nuevas:
+            return []
+
+        # Caso normal: un solo INSERT que retorna los ids
+        try:
+            with transaction.atomic():
+                return AlertaAnomalia.objects.bulk_create(list(nuevas.values()), batch_size=1000)
+        except IntegrityError:
+            pass
+
+        # Otra corrida insertó alguna de las mismas claves entre la consulta y
+        # el INSERT: se inserta de a una y se descartan las que chocan
+        insertadas = []
+        for alerta in nuevas.values():
+            alerta.pk = None
+            try:
+                with transaction.atomic():
+                    alerta.save(force_insert=True)
+                insertadas.append(alerta)
+            except IntegrityError:
+                continue
+        return insertadas
@@ -1,12 +1,14 @@
 import numpy as np
+import pandas as pd
 from datetime import datetime, timedelta
 from decimal import Decimal
+from django.conf import settings
 from django.db.models import Sum, Count, Avg
 from django.utils import timezone
 
 from apps.venta.models import Venta, DetalleVenta
-from apps.productos.models import Producto
 from apps.ia.models import AlertaAnomalia
+from .alertas import AlertService
 from .ml_service import MLService
 
 
@@ -30,7 +32,18 @@ class AnomalyDetector:
         alertas_tendencias = self._detectar_tendencias_negativas(fecha_inicio)
         alertas.extend(alertas_tendencias)
         
-        return alertas
+        return self._guardar_alertas(alertas)
+    
+    def _guardar_alertas(self, alertas):
+        """
+        Inserta las alertas en bloque, descartando las que ya tienen una
+        alerta abierta (mismo tipo, día y producto); retorna solo las insertadas
+        """
+        fecha_deteccion = timezone.now()
+        for alerta in alertas:
+            alerta.fecha_deteccion = fecha_deteccion
+        
+        return AlertService.guardar(alertas)
     
     def _detectar_anomalias_diarias(self, fecha_inicio):
         
@@ -60,89 +73,95 @@ class AnomalyDetector:
                 # Es una anomalía
                 tipo = 'venta_alta' if z_score > 0 else 'venta_baja'
                 
-                # Verificar si ya existe esta alerta
-                existe = AlertaAnomalia.objects.filter(
-                    fecha_referencia=venta_dia['fecha'],
+                alertas.append(AlertaAnomalia(
                     tipo=tipo,
-                    estado__in=['nueva', 'revisada']
-                ).exists()
-                
-                if not existe:
-                    alerta = AlertaAnomalia.objects.create(
-                        tipo=tipo,
-                        fecha_referencia=venta_dia['fecha'],
-                        descripcion=f"Ventas {'inusualmente altas' if tipo == 'venta_alta' else 'inusualmente bajas'} "
-                                   f"detectadas: Bs. {total:.2f} (promedio: Bs. {media:.2f})",
-                        score_anomalia=-1 if abs(z_score) > 2 else 1,
-                        valor_real=Decimal(str(round(total, 2))),
-                        valor_esperado=Decimal(str(round(media, 2))),
-                        estado='nueva'
-                    )
-                    alertas.append(alerta)
+                    fecha_referencia=venta_dia['fecha'],
+                    descripcion=f"Ventas {'inusualmente altas' if tipo == 'venta_alta' else 'inusualmente bajas'} "
+                               f"detectadas: Bs. {total:.2f} (promedio: Bs. {media:.2f})",
+                    score_anomalia=-1 if abs(z_score) > 2 else 1,
+                    valor_real=Decimal(str(round(total, 2))),
+                    valor_esperado=Decimal(str(round(media, 2))),
+                    estado='nueva'
+                ))
         
         return alertas
     
     def _detectar_anomalias_productos(self, fecha_inicio):
         
-        alertas = []
-        
-        productos_vendidos = DetalleVenta.objects.filter(
-            venta__fecha__gte=fecha_inicio
-        ).values('variante_producto__producto').distinct()
-        
-        for prod in productos_vendidos:
-            producto_id = prod['variante_producto__producto']
-            
-            try:
-                producto = Producto.objects.get(id=producto_id)
-            except Producto.DoesNotExist:
-                continue
-            
-            ventas_producto = DetalleVenta.objects.filter(
-                variante_producto__producto_id=producto_id,
+        # Matriz (sub_total, cantidad) por producto y día en una sola consulta
+        ventas = pd.DataFrame.from_records(
+            DetalleVenta.objects.filter(
                 venta__fecha__gte=fecha_inicio
-            ).values('venta__fecha').annotate(
+            ).values(
+                'variante_producto__producto_id',
+                'variante_producto__producto__nombre',
+                'venta__fecha'
+            ).annotate(
                 total=Sum('sub_total'),
                 cantidad=Sum('cantidad')
+            ).values_list(
+                'variante_producto__producto_id',
+                'variante_producto__producto__nombre',
+                'venta__fecha',
+                'total',
+                'cantidad'
+            ),
+            columns=['producto_id', 'producto_nombre', 'fecha', 'total', 'cantidad']
+        )
+        
+        if ventas.empty:
+            return []
+        
+        ventas['total'] = ventas['total'].astype(float)
+        por_producto = ventas.groupby('producto_id')['total']
+        media = por_producto.transform('mean')
+        # Se requieren al menos 5 días con ventas para comparar con la media del producto
+        suficientes = por_producto.transform('size') >= 5
+        
+        if self.ml_service.modelo_anomalias is not None and self.ml_service.anomalias_relativas:
+            # Un solo decision_function del IsolationForest para toda la matriz,
+            # sobre valores relativos a la media de cada producto
+            # (valores negativos = anómalo, más negativo = más anómalo)
+            score = self.ml_service.modelo_anomalias.decision_function(
+                self.ml_service.features_anomalias(ventas)
             )
+            ventas = ventas.assign(media=media, score=score)[
+                suficientes & (score < settings.IA_ANOMALY_SCORE_THRESHOLD)
+            ].sort_values('score')
             
-            if len(ventas_producto) < 5:
-                continue
-            
-            totales = [float(v['total']) for v in ventas_producto]
-            media = np.mean(totales)
-            std = np.std(totales)
+            # Solo las más anómalas de la corrida
+            if len(ventas) > settings.IA_ANOMALY_MAX_ALERTAS:
+                print(
+                    f"ℹ️ {len(ventas) - settings.IA_ANOMALY_MAX_ALERTAS} producto-días anómalos "
+                    f"descartados (IA_ANOMALY_MAX_ALERTAS={settings.IA_ANOMALY_MAX_ALERTAS})"
+                )
+                ventas = ventas.head(settings.IA_ANOMALY_MAX_ALERTAS)
+        else:
+            # Sin modelo entrenado (o entrenado con valores absolutos): z-score
+            # de cada día respecto a la media del producto
+            std = por_producto.transform('std', ddof=0)
+            z_score = ((ventas['total'] - media) / std.where(std > 0)).fillna(0)
             
-            for venta in ventas_producto:
-                total = float(venta['total'])
-                z_score = (total - media) / std if std > 0 else 0
-                
-                if abs(z_score) > 2.5:  # Umbral más alto para productos
-                    # Verificar si ya existe
-                    existe = AlertaAnomalia.objects.filter(
-                        fecha_referencia=venta['venta__fecha'],
-                        producto_id=producto_id,
-                        tipo='producto_anomalo',
-                        estado__in=['nueva', 'revisada']
-                    ).exists()
-                    
-                    if not existe:
-                        alerta = AlertaAnomalia.objects.create(
-                            tipo='producto_anomalo',
-                            fecha_referencia=venta['venta__fecha'],
-                            descripcion=f"Comportamiento anómalo en producto '{producto.nombre}': "
-                                       f"ventas {'muy altas' if z_score > 0 else 'muy bajas'} - "
-                                       f"Bs. {total:.2f} (esperado: Bs. {media:.2f})",
-                            score_anomalia=-1,
-                            producto_id=producto_id,
-                            producto_nombre=producto.nombre,
-                            valor_real=Decimal(str(round(total, 2))),
-                            valor_esperado=Decimal(str(round(media, 2))),
-                            estado='nueva'
-                        )
-                        alertas.append(alerta)
-        
-        return alertas
+            ventas = ventas.assign(media=media, score=-1.0)[
+                suficientes & (z_score.abs() > settings.IA_ANOMALY_ZSCORE_PRODUCTO)
+            ]
+        
+        return [
+            AlertaAnomalia(
+                tipo='producto_anomalo',
+                fecha_referencia=venta.fecha,
+                descripcion=f"Comportamiento anómalo en producto '{venta.producto_nombre}': "
+                           f"ventas {'muy altas' if venta.total > venta.media else 'muy bajas'} - "
+                           f"Bs. {venta.total:.2f} (esperado: Bs. {venta.media:.2f})",
+                score_anomalia=round(float(venta.score), 4),
+                producto_id=int(venta.producto_id),
+                producto_nombre=venta.producto_nombre,
+                valor_real=Decimal(str(round(venta.total, 2))),
+                valor_esperado=Decimal(str(round(venta.media, 2))),
+                estado='nueva'
+            )
+            for venta in ventas.itertuples(index=False)
+        ]
     
     def _detectar_tendencias_negativas(self, fecha_inicio):
         
@@ -170,31 +189,23 @@ class AnomalyDetector:
             
             # Si hay caída mayor al 20%
             if cambio_porcentual < -20:
-                existe = AlertaAnomalia.objects.filter(
-                    fecha_referencia=timezone.now().date(),
+                alertas.append(AlertaAnomalia(
                     tipo='tendencia_negativa',
-                    estado__in=['nueva', 'revisada']
-                ).exists()
-                
-                if not existe:
-                    alerta = AlertaAnomalia.objects.create(
-                        tipo='tendencia_negativa',
-                        fecha_referencia=timezone.now().date(),
-                        descripcion=f"Tendencia negativa detectada: caída del {abs(cambio_porcentual):.1f}% "
-                                   f"en ventas comparando períodos recientes",
-                        score_anomalia=-1,
-                        valor_real=Decimal(str(round(float(ventas_segunda_mitad), 2))),
-                        valor_esperado=Decimal(str(round(float(ventas_primera_mitad), 2))),
-                        estado='nueva'
-                    )
-                    alertas.append(alerta)
+                    fecha_referencia=timezone.now().date(),
+                    descripcion=f"Tendencia negativa detectada: caída del {abs(cambio_porcentual):.1f}% "
+                               f"en ventas comparando períodos recientes",
+                    score_anomalia=-1,
+                    valor_real=Decimal(str(round(float(ventas_segunda_mitad), 2))),
+                    valor_esperado=Decimal(str(round(float(ventas_primera_mitad), 2))),
+                    estado='nueva'
+                ))
         
         return alertas
     
     def obtener_alertas_activas(self, limite=20):
         
         return AlertaAnomalia.objects.filter(
-            estado__in=['nueva', 'revisada']
+            estado__in=AlertService.ESTADOS_ABIERTOS
         ).order_by('-fecha_deteccion')[:limite]
     
     def marcar_alerta_resuelta(self, alerta_id, nota=None):
@@ -0,0 +1,197 @@
+import hashlib
+import os
+import tempfile
+
+import joblib
+from django.conf import settings
+from django.core.files import File
+
+from apps.ia.models import ModeloEntrenamiento
+
+
+class ArtifactStore:
+    """
+    Almacén de artefactos de modelos.
+
+    Los modelos se guardan comprimidos (`<nombre>.pkl.z`) con su checksum
+    SHA-256 y se publican en el backend configurado:
+
+    - 'local': solo el directorio IA_MODEL_DIR del nodo que entrena
+    - 'directorio': un directorio compartido (IA_ARTIFACT_DIR)
+    - 's3': el bucket de AWS_STORAGE_BUCKET_NAME bajo IA_ARTIFACT_S3_PREFIX
+
+    Cada nodo mantiene en IA_MODEL_DIR una caché de lectura con la versión
+    descomprimida (`<nombre>.pkl`), que es la que se carga con mmap.
+    """
+
+    EXTENSION = '.pkl.z'
+
+    def __init__(self):
+        self.cache_dir = settings.IA_MODEL_DIR
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.backend = settings.IA_ARTIFACT_BACKEND
+        self._storage = None
+
+    @property
+    def storage(self):
+        """
+        Storage remoto de Django (None para el backend local)
+        """
+        if self._storage is None and self.backend != 'local':
+            if self.backend == 's3':
+                from storages.backends.s3boto3 import S3Boto3Storage
+                self._storage = S3Boto3Storage(
+                    location=settings.IA_ARTIFACT_S3_PREFIX,
+                    file_overwrite=True
+                )
+            elif self.backend == 'directorio':
+                from django.core.files.storage import FileSystemStorage
+                self._storage = FileSystemStorage(
+                    location=settings.IA_ARTIFACT_DIR,
+                    allow_overwrite=True
+                )
+            else:
+                raise ValueError(f"Backend de artefactos desconocido: {self.backend}")
+        return self._storage
+
+    def guardar(self, modelos_data, nombre):
+        """
+        Comprime, publica y deja en caché el artefacto.
+
+        Returns:
+            tuple: (archivo, checksum)
+        """
+        archivo = f'{nombre}{self.EXTENSION}'
+        ruta_comprimida = os.path.join(self.cache_dir, archivo)
+
+        self._escribir_atomico(
+            ruta_comprimida,
+            lambda tmp: joblib.dump(modelos_data, tmp, compress=('zlib', settings.IA_ARTIFACT_COMPRESS))
+        )
+        checksum = self._checksum(ruta_comprimida)
+
+        if self.storage is not None:
+            with open(ruta_comprimida, 'rb') as f:
+                self.storage.save(archivo, File(f, name=archivo))
+
+            # El backend remoto es la fuente; en el nodo basta la caché
+            os.remove(ruta_comprimida)
+
+        # Copia descomprimida para los lectores de este nodo
+        self._escribir_atomico(
+            self._ruta_cache(archivo),
+            lambda tmp: joblib.dump(modelos_data, tmp)
+        )
+
+        return archivo, checksum
+
+    def ruta_local(self, archivo, checksum=None):
+        """
+        Ruta local del artefacto descomprimido, descargándolo y verificando
+        su checksum si este nodo aún no lo tiene
+        """
+        # Modelos anteriores al almacén: .pkl sin comprimir en IA_MODEL_DIR
+        if not archivo.endswith(self.EXTENSION):
+            return os.path.join(self.cache_dir, archivo)
+
+        ruta_cache = self._ruta_cache(archivo)
+        if os.path.exists(ruta_cache):
+            return ruta_cache
+
+        ruta_comprimida = os.path.join(self.cache_dir, archivo)
+        descargado = None
+        if not os.path.exists(ruta_comprimida):
+            if self.storage is None or not self.storage.exists(archivo):
+                raise FileNotFoundError(f"Artefacto no encontrado: {archivo}")
+
+            print(f"⬇️ Descargando artefacto: {archivo}")
+
+            # Temporal propio de este proceso: varios workers pueden estar
+            # descargando el mismo artefacto a la vez
+            fd, descargado = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as destino, self.storage.open(archivo, 'rb') as origen:
+                for bloque in origen.chunks():
+                    destino.write(bloque)
+            ruta_comprimida = descargado
+
+        try:
+            if checksum and self._checksum(ruta_comprimida) != checksum:
+                raise ValueError(f"Checksum inválido para el artefacto {archivo}")
+
+            modelos_data = joblib.load(ruta_comprimida)
+            self._escribir_atomico(ruta_cache, lambda tmp: joblib.dump(modelos_data, tmp))
+        finally:
+            if descargado:
+                os.remove(descargado)
+
+        return ruta_cache
+
+    def limpiar(self, conservar=None):
+        """
+        Elimina los artefactos (remotos y en caché) de los modelos que
+        quedan fuera de los últimos `conservar`. El modelo activo nunca se
+        elimina. Los registros de ModeloEntrenamiento se mantienen.
+
+        Returns:
+            int: cantidad de archivos eliminados
+        """
+        conservar = conservar or settings.IA_ARTIFACT_KEEP
+
+        vigentes = set(
+            ModeloEntrenamiento.objects.order_by('-fecha_entrenamiento').values_list(
+                'archivo_modelo', flat=True
+            )[:conservar]
+        )
+        vigentes.update(
+            ModeloEntrenamiento.objects.filter(activo=True).values_list('archivo_modelo', flat=True)
+        )
+
+        # Archivos locales de cada artefacto vigente (comprimido y caché)
+        locales_vigentes = set(vigentes)
+        locales_vigentes.update(
+            os.path.basename(self._ruta_cache(archivo))
+            for archivo in vigentes if archivo.endswith(self.EXTENSION)
+        )
+
+        eliminados = 0
+        for nombre in os.listdir(self.cache_dir):
+            if nombre.endswith(('.pkl', self.EXTENSION)) and nombre not in locales_vigentes:
+                os.remove(os.path.join(self.cache_dir, nombre))
+                eliminados += 1
+
+        if self.storage is not None:
+            _, remotos = self.storage.listdir('')
+            for archivo in remotos:
+                if archivo.endswith(self.EXTENSION) and archivo not in vigentes:
+                    self.storage.delete(archivo)
+                    eliminados += 1
+
+        return eliminados
+
+    def _ruta_cache(self, archivo):
+        return os.path.join(self.cache_dir, archivo[:-len('.z')])
+
+    def _escribir_atomico(self, ruta, escribir):
+        """
+        Escribe en un temporal del mismo directorio y lo renombra, para que
+        otros procesos nunca lean un archivo a medio escribir
+        """
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix='.tmp')
+        os.close(fd)
+        try:
+            escribir(tmp)
+            # mkstemp crea con 0600: los workers web pueden correr con otro usuario
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, ruta)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @staticmethod
+    def _checksum(ruta):
+        sha256 = hashlib.sha256()
+        with open(ruta, 'rb') as f:
+            for bloque in iter(lambda: f.read(1024 * 1024), b''):
+                sha256.update(bloque)
+        return sha256.hexdigest()
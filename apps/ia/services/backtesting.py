@@ -0,0 +1,154 @@
+import itertools
+import multiprocessing
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import TimeSeriesSplit
+
+from .ml_service import MLService
+
+
+# Estado de cada proceso del pool: vistas numpy sobre la memoria compartida
+_compartido = {}
+
+
+def _adjuntar_memoria(nombre_x, forma_x, nombre_y, forma_y):
+    """
+    Inicializador de los procesos del pool: se conecta a los bloques de
+    memoria compartida del dataset sin copiarlos
+    """
+    shm_x = shared_memory.SharedMemory(name=nombre_x)
+    shm_y = shared_memory.SharedMemory(name=nombre_y)
+    _compartido['shm'] = (shm_x, shm_y)
+    _compartido['X'] = np.ndarray(forma_x, dtype=np.float64, buffer=shm_x.buf)
+    _compartido['y'] = np.ndarray(forma_y, dtype=np.float64, buffer=shm_y.buf)
+
+
+def _evaluar_fold(parametros, fold, train_idx, test_idx):
+    X, y = _compartido['X'], _compartido['y']
+    X_train, y_train = X[train_idx[0]:train_idx[1]], y[train_idx[0]:train_idx[1]]
+    X_test, y_test = X[test_idx[0]:test_idx[1]], y[test_idx[0]:test_idx[1]]
+
+    modelo = RandomForestRegressor(random_state=42, n_jobs=1, **parametros)
+
+    inicio = time.perf_counter()
+    modelo.fit(X_train, y_train)
+    tiempo_entrenamiento = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    y_pred = modelo.predict(X_test)
+    tiempo_prediccion = time.perf_counter() - inicio
+
+    return {
+        'parametros': parametros,
+        'fold': fold,
+        'mae': mean_absolute_error(y_test, y_pred),
+        'r2': r2_score(y_test, y_pred) if len(y_test) > 1 else float('nan'),
+        'tiempo_entrenamiento': tiempo_entrenamiento,
+        'prediccion_ms_por_1000': tiempo_prediccion / len(y_test) * 1000 * 1000,
+        'tamano_kb': len(pickle.dumps(modelo, protocol=pickle.HIGHEST_PROTOCOL)) / 1024,
+    }
+
+
+class Backtester:
+    """
+    Backtesting con origen móvil (rolling origin) y búsqueda en grilla para
+    el modelo de ventas.
+
+    El dataset se extrae una sola vez, ordenado por fecha, y se publica en
+    memoria compartida; cada combinación (configuración, fold) se evalúa en
+    un proceso del pool que entrena solo con el pasado y mide sobre el
+    período siguiente.
+    """
+
+    GRILLA_DEFECTO = {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [6, 10, None],
+        'min_samples_split': [2, 5],
+    }
+
+    def __init__(self, folds=4, procesos=None):
+        self.folds = folds
+        self.procesos = procesos or max(1, (os.cpu_count() or 2) - 1)
+
+    def ejecutar(self, grilla=None, progreso=None):
+        """
+        Returns:
+            list: resumen por configuración ordenado por MAE promedio
+        """
+        grilla = grilla or self.GRILLA_DEFECTO
+        configuraciones = [
+            dict(zip(grilla.keys(), valores))
+            for valores in itertools.product(*grilla.values())
+        ]
+
+        ml_service = MLService()
+        df = ml_service.preparar_datos_entrenamiento()
+        X, y = ml_service._construir_features(df)
+        X = np.ascontiguousarray(X.to_numpy(dtype=np.float64))
+        y = np.ascontiguousarray(y.to_numpy(dtype=np.float64))
+
+        if len(X) < (self.folds + 1) * 10:
+            raise ValueError(f"No hay datos suficientes para {self.folds} folds ({len(X)} registros)")
+
+        # Los datos vienen ordenados por fecha: cada fold es un rango contiguo
+        cortes = [
+            ((int(train[0]), int(train[-1]) + 1), (int(test[0]), int(test[-1]) + 1))
+            for train, test in TimeSeriesSplit(n_splits=self.folds).split(X)
+        ]
+
+        shm_x = shared_memory.SharedMemory(create=True, size=X.nbytes)
+        shm_y = shared_memory.SharedMemory(create=True, size=y.nbytes)
+        try:
+            np.ndarray(X.shape, dtype=np.float64, buffer=shm_x.buf)[:] = X
+            np.ndarray(y.shape, dtype=np.float64, buffer=shm_y.buf)[:] = y
+
+            resultados = []
+            total = len(configuraciones) * len(cortes)
+            # fork: los hijos no necesitan reinicializar Django para importar este módulo
+            with ProcessPoolExecutor(
+                max_workers=self.procesos,
+                mp_context=multiprocessing.get_context('fork'),
+                initializer=_adjuntar_memoria,
+                initargs=(shm_x.name, X.shape, shm_y.name, y.shape)
+            ) as pool:
+                tareas = [
+                    pool.submit(_evaluar_fold, parametros, fold, train_idx, test_idx)
+                    for parametros in configuraciones
+                    for fold, (train_idx, test_idx) in enumerate(cortes, start=1)
+                ]
+                for tarea in as_completed(tareas):
+                    resultados.append(tarea.result())
+                    if progreso:
+                        progreso(len(resultados), total)
+        finally:
+            shm_x.close()
+            shm_x.unlink()
+            shm_y.close()
+            shm_y.unlink()
+
+        return self._resumir(configuraciones, resultados, len(X))
+
+    def _resumir(self, configuraciones, resultados, registros):
+        resumen = []
+        for parametros in configuraciones:
+            folds = [r for r in resultados if r['parametros'] == parametros]
+            resumen.append({
+                'parametros': parametros,
+                'registros': registros,
+                'folds': len(folds),
+                'mae': float(np.mean([r['mae'] for r in folds])),
+                'mae_std': float(np.std([r['mae'] for r in folds])),
+                'r2': float(np.nanmean([r['r2'] for r in folds])),
+                'tiempo_entrenamiento': float(np.mean([r['tiempo_entrenamiento'] for r in folds])),
+                'prediccion_ms_por_1000': float(np.mean([r['prediccion_ms_por_1000'] for r in folds])),
+                'tamano_kb': float(np.mean([r['tamano_kb'] for r in folds])),
+            })
+
+        return sorted(resumen, key=lambda r: r['mae'])
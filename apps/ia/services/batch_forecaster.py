@@ -0,0 +1,257 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.metrics import ML_PREDICCION
+from apps.productos.models import Producto
+from apps.ia.models import ModeloEntrenamiento, PronosticoProducto, VentaDiariaProducto
+from .feature_store import FeatureStore
+
+# Valor por defecto de `modelo_id`: el modelo activo según la base de datos
+_MODELO_ACTIVO = object()
+
+class BatchForecaster:
+    """
+    Genera los pronósticos por producto para todo el catálogo (o una lista
+    de productos) en una sola pasada: una consulta al feature store y el
+    resto como operaciones sobre arreglos.
+
+    Los resultados se guardan en PronosticoProducto asociados al modelo
+    activo, de modo que el endpoint por producto solo hace una consulta.
+    Las semanas empiezan el lunes (ISO) y los meses el día 1: los períodos
+    son los mismos durante toda la semana o el mes y las filas se reutilizan.
+    """
+
+    DIAS_HISTORIAL = 180
+    DIAS_TENDENCIA = 60
+
+    def generar(self, productos_ids=None, periodo='mensual', cantidad_periodos=3, modelo_id=_MODELO_ACTIVO):
+        """
+        Calcula y guarda los pronósticos.
+
+        Args:
+            productos_ids: lista de IDs o None para todos los productos
+            periodo: 'semanal' o 'mensual'
+            cantidad_periodos: períodos a futuro
+            modelo_id: modelo al que se asocian los pronósticos (el Predictor
+                pasa el del ModelRegistry para que coincida con su búsqueda)
+
+        Returns:
+            list: pronósticos (dicts) en el mismo formato que Predictor
+        """
+        with ML_PREDICCION.labels(operacion='pronostico_lote').time():
+            # Corrida de todo el catálogo: incorporar primero las ventas recientes
+            if productos_ids is None:
+                FeatureStore().actualizar()
+
+            productos = Producto.objects.all()
+            if productos_ids is not None:
+                productos = productos.filter(id__in=productos_ids)
+            productos = pd.Series(dict(productos.values_list('id', 'nombre')), dtype=object)
+
+            if productos.empty:
+                return []
+
+            periodos = self.calcular_periodos(periodo, cantidad_periodos)
+            estadisticas = self._estadisticas(productos.index, productos_ids is None)
+
+            if modelo_id is _MODELO_ACTIVO:
+                modelo_id = ModeloEntrenamiento.objects.filter(activo=True).values_list('id', flat=True).first()
+            pronosticos = self._pronosticar(productos, estadisticas, periodos)
+
+            with transaction.atomic():
+                existentes = PronosticoProducto.objects.filter(
+                    modelo_id=modelo_id,
+                    tipo_periodo=periodo,
+                    fecha_inicio__in=[p['fecha_inicio'] for p in periodos]
+                )
+                if productos_ids is not None:
+                    existentes = existentes.filter(producto_id__in=productos.index.tolist())
+                existentes.delete()
+
+                # Dos cálculos simultáneos del mismo producto (caché vacía en el
+                # endpoint) escriben las mismas filas: el segundo las actualiza
+                PronosticoProducto.objects.bulk_create(
+                    [
+                        PronosticoProducto(
+                            modelo_id=modelo_id,
+                            producto_id=p['producto_id'],
+                            tipo_periodo=periodo,
+                            periodo=p['periodo'],
+                            fecha_inicio=p['fecha_inicio'],
+                            fecha_fin=p['fecha_fin'],
+                            ventas_predichas=p['ventas_predichas'],
+                            cantidad_predicha=p['cantidad_predicha'],
+                            ventas_historicas=p['ventas_historicas'],
+                            tendencia=p['tendencia'],
+                            recomendacion=p['recomendacion'],
+                        )
+                        for p in pronosticos
+                    ],
+                    batch_size=1000,
+                    update_conflicts=True,
+                    unique_fields=['modelo', 'producto', 'tipo_periodo', 'fecha_inicio'],
+                    update_fields=[
+                        'periodo', 'fecha_fin', 'ventas_predichas', 'cantidad_predicha',
+                        'ventas_historicas', 'tendencia', 'recomendacion', 'fecha_generacion',
+                    ]
+                )
+
+                if productos_ids is None:
+                    self._podar()
+
+            return pronosticos
+
+    @staticmethod
+    def _podar():
+        """
+        Elimina los pronósticos cuyo período cerró antes de la ventana del
+        monitoreo (IA_MONITOREO_VENTANA_DIAS), de cualquier modelo: ya no
+        cuentan en las métricas de precisión
+
+        Returns:
+            int: filas eliminadas
+        """
+        limite = timezone.now().date() - timedelta(days=settings.IA_MONITOREO_VENTANA_DIAS)
+        eliminados, _ = PronosticoProducto.objects.filter(fecha_fin__lt=limite).delete()
+        return eliminados
+
+    @staticmethod
+    def calcular_periodos(periodo, cantidad_periodos):
+        """
+        Fechas de los períodos a pronosticar: semanas ISO desde la semana en
+        curso o meses desde el próximo
+        """
+        fecha_actual = timezone.now().date()
+        lunes = fecha_actual - timedelta(days=fecha_actual.weekday())
+        periodos = []
+
+        for i in range(cantidad_periodos):
+            if periodo == 'semanal':
+                fecha_inicio = lunes + timedelta(days=7*i)
+                fecha_fin = fecha_inicio + timedelta(days=6)
+                anio_iso, semana_iso, _ = fecha_inicio.isocalendar()
+                periodo_str = f"{anio_iso}-W{semana_iso:02d}"
+                factor_periodo = 0.25  # 1 semana = ~0.25 meses
+            else:
+                mes_futuro = fecha_actual.month + i + 1
+                anio_futuro = fecha_actual.year + (mes_futuro - 1) // 12
+                mes_futuro = ((mes_futuro - 1) % 12) + 1
+
+                fecha_inicio = datetime(anio_futuro, mes_futuro, 1).date()
+                if mes_futuro == 12:
+                    fecha_fin = datetime(anio_futuro, 12, 31).date()
+                else:
+                    fecha_fin = (datetime(anio_futuro, mes_futuro + 1, 1) - timedelta(days=1)).date()
+
+                periodo_str = f"{anio_futuro}-{mes_futuro:02d}"
+                factor_periodo = 1.0
+
+            periodos.append({
+                'periodo': periodo_str,
+                'fecha_inicio': fecha_inicio,
+                'fecha_fin': fecha_fin,
+                'factor': factor_periodo,
+            })
+
+        return periodos
+
+    def _estadisticas(self, productos_ids, todos):
+        """
+        Totales, meses con ventas y tendencia por producto, alineados con
+        `productos_ids` (ceros para productos sin historial)
+        """
+        fecha_actual = timezone.now().date()
+        historial = VentaDiariaProducto.objects.filter(
+            fecha__gte=fecha_actual - timedelta(days=self.DIAS_HISTORIAL)
+        )
+        if not todos:
+            historial = historial.filter(producto_id__in=list(productos_ids))
+
+        df = pd.DataFrame.from_records(
+            historial.values_list('producto_id', 'fecha', 'ingresos', 'unidades'),
+            columns=['producto_id', 'fecha', 'ingresos', 'unidades']
+        )
+        df['ingresos'] = df['ingresos'].astype(float)
+        fechas = pd.to_datetime(df['fecha'])
+
+        limite_reciente = pd.Timestamp(fecha_actual - timedelta(days=self.DIAS_TENDENCIA))
+        limite_anterior = pd.Timestamp(fecha_actual - timedelta(days=2 * self.DIAS_TENDENCIA))
+
+        por_producto = df.groupby('producto_id')
+        estadisticas = pd.DataFrame({
+            'total': por_producto['ingresos'].sum(),
+            'cantidad': por_producto['unidades'].sum(),
+            'meses': (fechas.dt.year * 12 + fechas.dt.month).groupby(df['producto_id']).nunique(),
+            'recientes': df['ingresos'].where(fechas >= limite_reciente, 0).groupby(df['producto_id']).sum(),
+            'anteriores': df['ingresos'].where(
+                (fechas >= limite_anterior) & (fechas < limite_reciente), 0
+            ).groupby(df['producto_id']).sum(),
+        })
+
+        return estadisticas.reindex(productos_ids).fillna(0)
+
+    def _pronosticar(self, productos, estadisticas, periodos):
+        total = estadisticas['total'].to_numpy(dtype=float)
+        cantidad = estadisticas['cantidad'].to_numpy(dtype=float)
+        anteriores = estadisticas['anteriores'].to_numpy(dtype=float)
+        recientes = estadisticas['recientes'].to_numpy(dtype=float)
+
+        con_historial = cantidad > 0
+        promedio_mensual = total / np.maximum(1, estadisticas['meses'].to_numpy())
+        tendencia = np.divide(
+            recientes - anteriores, anteriores,
+            out=np.zeros_like(anteriores), where=anteriores > 0
+        )
+        precio_promedio = np.divide(total, cantidad, out=np.zeros_like(total), where=con_historial)
+        precio_promedio[precio_promedio == 0] = 100
+
+        # Matriz (productos x períodos)
+        factores = np.array([p['factor'] for p in periodos])
+        ventas = np.outer(promedio_mensual * (1 + tendencia), factores)
+        unidades = (ventas / precio_promedio[:, None]).astype(int)
+
+        etiqueta = np.where(tendencia > 0.05, 'alza', np.where(tendencia < -0.05, 'baja', 'estable'))
+        recomendacion = np.where(
+            tendencia > 0.1, 'Alta demanda esperada - Aumentar stock',
+            np.where(
+                tendencia < -0.1,
+                'Baja demanda esperada - Considerar promoción',
+                'Demanda estable - Mantener stock actual'
+            )
+        )
+
+        pronosticos = []
+        for i, (producto_id, nombre) in enumerate(productos.items()):
+            for j, p in enumerate(periodos):
+                if con_historial[i]:
+                    valores = {
+                        'ventas_predichas': Decimal(str(round(ventas[i, j], 2))),
+                        'cantidad_predicha': int(unidades[i, j]),
+                        'ventas_historicas': Decimal(str(round(promedio_mensual[i], 2))),
+                        'tendencia': str(etiqueta[i]),
+                        'recomendacion': str(recomendacion[i]),
+                    }
+                else:
+                    valores = {
+                        'ventas_predichas': Decimal('0.00'),
+                        'cantidad_predicha': 0,
+                        'ventas_historicas': Decimal('0.00'),
+                        'tendencia': 'sin_datos',
+                        'recomendacion': 'Producto nuevo - Sin datos históricos suficientes',
+                    }
+
+                pronosticos.append({
+                    'producto_id': int(producto_id),
+                    'producto_nombre': nombre,
+                    'periodo': p['periodo'],
+                    'fecha_inicio': p['fecha_inicio'],
+                    'fecha_fin': p['fecha_fin'],
+                    **valores,
+                })
+
+        return pronosticos
@@ -0,0 +1,194 @@
+import pandas as pd
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Sum, Count, Max, Min
+from django.utils import timezone
+
+from apps.venta.models import DetalleVenta
+from apps.ia.models import VentaDiariaProducto
+
+
+class FeatureStore:
+    """
+    Mantiene la tabla VentaDiariaProducto (producto x día).
+
+    La actualización es incremental: se re-agregan desde DetalleVenta los
+    últimos IA_FEATURE_STORE_DIAS_RELECTURA días anteriores al último día
+    agregado (y los posteriores). No se filtra por id: los ids se asignan
+    antes del commit, así que ventas concurrentes pueden confirmarse con un
+    id menor a otro ya agregado. Los promedios móviles se recalculan con el
+    historial ya agregado de la propia tabla. Las ventas cargadas con fechas
+    anteriores a la ventana requieren reconstruir().
+
+    Entrenamiento y monitoreo actualizan la tabla desde procesos distintos:
+    en PostgreSQL un advisory lock de transacción serializa las escrituras
+    y, en cualquier motor, las filas se insertan con upsert.
+    """
+
+    # Clave del advisory lock de PostgreSQL (distinta a la del entrenamiento,
+    # que actualiza el feature store mientras tiene tomada la suya)
+    LOCK_ID = 73102612
+
+    # Días de historial necesarios para recalcular las ventanas móviles
+    CONTEXTO_DIAS = 120
+
+    def actualizar(self):
+        """
+        Incorpora las ventas registradas desde la última actualización.
+
+        Returns:
+            int: cantidad de filas (producto, día) escritas
+        """
+        ultimo_dia = VentaDiariaProducto.objects.aggregate(ultimo=Max('fecha'))['ultimo']
+        if ultimo_dia is None:
+            return self.reconstruir()
+
+        desde = min(ultimo_dia, timezone.now().date()) - timedelta(
+            days=settings.IA_FEATURE_STORE_DIAS_RELECTURA
+        )
+        return self._recalcular(None, desde)
+
+    def reconstruir(self):
+        """
+        Borra y vuelve a calcular toda la tabla desde DetalleVenta
+        """
+        desde = DetalleVenta.objects.aggregate(desde=Min('venta__fecha'))['desde']
+
+        with transaction.atomic():
+            self._bloquear()
+            VentaDiariaProducto.objects.all().delete()
+            if desde is None:
+                return 0
+            return self._recalcular(None, desde)
+
+    @staticmethod
+    def _bloquear():
+        """
+        Espera a las demás actualizaciones; se libera al terminar la transacción
+        """
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)', [FeatureStore.LOCK_ID])
+
+    @transaction.atomic
+    def _recalcular(self, productos_ids, desde):
+        self._bloquear()
+        hoy = timezone.now().date()
+        inicio_contexto = desde - timedelta(days=self.CONTEXTO_DIAS)
+
+        # 1. Agregados diarios desde las transacciones (solo días afectados)
+        detalles = DetalleVenta.objects.filter(venta__fecha__gte=desde)
+        if productos_ids is not None:
+            detalles = detalles.filter(variante_producto__producto_id__in=productos_ids)
+
+        nuevos = pd.DataFrame.from_records(
+            detalles.values(
+                'variante_producto__producto_id', 'venta__fecha'
+            ).annotate(
+                unidades=Sum('cantidad'),
+                ingresos=Sum('sub_total'),
+                cantidad_detalles=Count('id'),
+                ultimo_detalle_id=Max('id'),
+            ),
+            columns=[
+                'variante_producto__producto_id', 'venta__fecha', 'unidades',
+                'ingresos', 'cantidad_detalles', 'ultimo_detalle_id'
+            ]
+        ).rename(columns={
+            'variante_producto__producto_id': 'producto_id',
+            'venta__fecha': 'fecha',
+        })
+
+        # 2. Historial ya agregado, necesario para las ventanas móviles
+        contexto = VentaDiariaProducto.objects.filter(
+            fecha__gte=inicio_contexto,
+            fecha__lt=desde
+        )
+        if productos_ids is not None:
+            contexto = contexto.filter(producto_id__in=productos_ids)
+
+        contexto = pd.DataFrame.from_records(
+            contexto.values('producto_id', 'fecha', 'ingresos'),
+            columns=['producto_id', 'fecha', 'ingresos']
+        )
+
+        # 3. Reemplazar las filas afectadas
+        existentes = VentaDiariaProducto.objects.filter(fecha__gte=desde)
+        if productos_ids is not None:
+            existentes = existentes.filter(producto_id__in=productos_ids)
+        existentes.delete()
+
+        if nuevos.empty:
+            return 0
+
+        nuevos['ingresos'] = nuevos['ingresos'].astype(float)
+        historial = pd.concat([
+            contexto.astype({'ingresos': float}),
+            nuevos[['producto_id', 'fecha', 'ingresos']],
+        ])
+        features = self._calcular_features(historial, nuevos, inicio_contexto, hoy)
+        nuevos = nuevos.assign(**features)
+
+        filas = [
+            VentaDiariaProducto(
+                producto_id=fila.producto_id,
+                fecha=fila.fecha,
+                unidades=fila.unidades,
+                ingresos=round(fila.ingresos, 2),
+                cantidad_detalles=fila.cantidad_detalles,
+                promedio_movil_7d=fila.promedio_movil_7d,
+                promedio_movil_30d=fila.promedio_movil_30d,
+                ingresos_60d=fila.ingresos_60d,
+                ingresos_60d_anterior=fila.ingresos_60d_anterior,
+                tendencia_60d=fila.tendencia_60d,
+                ultimo_detalle_id=fila.ultimo_detalle_id,
+            )
+            for fila in nuevos.itertuples(index=False)
+        ]
+        VentaDiariaProducto.objects.bulk_create(
+            filas,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['producto', 'fecha'],
+            update_fields=[
+                'unidades', 'ingresos', 'cantidad_detalles', 'promedio_movil_7d',
+                'promedio_movil_30d', 'ingresos_60d', 'ingresos_60d_anterior',
+                'tendencia_60d', 'ultimo_detalle_id', 'fecha_actualizacion',
+            ]
+        )
+
+        return len(filas)
+
+    def _calcular_features(self, historial, filas, inicio, fin):
+        """
+        Calcula las ventanas móviles de todos los productos a la vez sobre
+        una matriz densa (días x productos) con ceros en días sin ventas, y
+        retorna las columnas correspondientes a `filas` (producto_id, fecha)
+        """
+        fechas = pd.date_range(inicio, max(fin, historial['fecha'].max()), freq='D')
+
+        diario = historial.assign(fecha=pd.to_datetime(historial['fecha'])).pivot_table(
+            index='fecha', columns='producto_id', values='ingresos', aggfunc='sum'
+        ).reindex(fechas).fillna(0)
+
+        suma_60d = diario.rolling(window=60, min_periods=1).sum()
+        suma_60d_anterior = suma_60d.shift(60).fillna(0)
+        tendencia = (
+            (suma_60d - suma_60d_anterior) / suma_60d_anterior.where(suma_60d_anterior > 0)
+        ).fillna(0)
+
+        # Posición de cada fila pedida dentro de la matriz densa
+        idx_fecha = diario.index.get_indexer(pd.to_datetime(filas['fecha']))
+        idx_producto = diario.columns.get_indexer(filas['producto_id'])
+
+        def valores(matriz):
+            return matriz.to_numpy()[idx_fecha, idx_producto]
+
+        return {
+            'promedio_movil_7d': valores(diario.rolling(window=7, min_periods=1).mean()),
+            'promedio_movil_30d': valores(diario.rolling(window=30, min_periods=1).mean()),
+            'ingresos_60d': valores(suma_60d),
+            'ingresos_60d_anterior': valores(suma_60d_anterior),
+            'tendencia_60d': valores(tendencia),
+        }
@@ -13,126 +13,138 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 from sklearn.preprocessing import LabelEncoder
 
+from apps.core.cache import cache, cached
 from apps.venta.models import Venta, DetalleVenta
 from apps.productos.models import Producto
-from apps.ia.models import ModeloEntrenamiento, AlertaAnomalia
+from apps.ia.models import ModeloEntrenamiento, AlertaAnomalia, VentaDiariaProducto
+from .feature_store import FeatureStore
+from .model_registry import ModelRegistry
+from .artifact_store import ArtifactStore
 
 
 class MLService:
     
+    FEATURE_COLUMNS = [
+        'anio', 'mes', 'dia_semana', 'semana_anio', 'es_fin_semana',
+        'tipo_venta_encoded', 'origen_encoded', 'producto_id',
+        'precio_unitario', 'cantidad_productos_venta',
+        'promedio_movil_7d', 'promedio_movil_30d'
+    ]
+    
     def __init__(self):
-        self.model_dir = os.path.join(settings.BASE_DIR, 'ml_models')
+        self.model_dir = settings.IA_MODEL_DIR
         self.modelo_ventas = None
         self.modelo_anomalias = None
+        self.anomalias_relativas = False
         self.label_encoders = {}
         
         # Crear directorio si no existe
         os.makedirs(self.model_dir, exist_ok=True)
         
     def cargar_modelos(self):
-        try:
-            ultimo_modelo = ModeloEntrenamiento.objects.filter(activo=True).first()
-            
-            if ultimo_modelo:
-                modelo_path = os.path.join(self.model_dir, ultimo_modelo.archivo_modelo)
-                if os.path.exists(modelo_path):
-                    modelos_data = joblib.load(modelo_path)
-                    self.modelo_ventas = modelos_data.get('modelo_ventas')
-                    self.modelo_anomalias = modelos_data.get('modelo_anomalias')
-                    self.label_encoders = modelos_data.get('label_encoders', {})
-                    print(f"✅ Modelos cargados: {ultimo_modelo.archivo_modelo}")
-                    return True
-            
-            print("⚠️ No hay modelos entrenados disponibles")
-            return False
-            
-        except Exception as e:
-            print(f"❌ Error al cargar modelos: {str(e)}")
-            return False
+        modelos_data = ModelRegistry.obtener()
+
+        if modelos_data:
+            self.modelo_ventas = modelos_data.get('modelo_ventas')
+            self.modelo_anomalias = modelos_data.get('modelo_anomalias')
+            self.anomalias_relativas = modelos_data.get('anomalias_relativas', False)
+            self.label_encoders = modelos_data.get('label_encoders', {})
+            return True
+
+        return False
     
-    def preparar_datos_entrenamiento(self):
-        ventas = Venta.objects.filter(
-            fecha__gte=timezone.now().date() - timedelta(days=365)
-        ).select_related('cliente', 'vendedor').prefetch_related('detalles')
+    def preparar_datos_entrenamiento(self, desde_venta_id=None):
+        """
+        Construye el dataset de entrenamiento (un registro por detalle de venta).
+
+        Los promedios móviles se leen del feature store (VentaDiariaProducto)
+        en lugar de recalcularse sobre las transacciones. Con `desde_venta_id`
+        solo se retornan las ventas posteriores a esa marca de agua.
+        """
+        FeatureStore().actualizar()
         
-        datos = []
+        detalles = DetalleVenta.objects.filter(
+            venta__fecha__gte=timezone.now().date() - timedelta(days=365)
+        )
+        if desde_venta_id is not None:
+            detalles = detalles.filter(venta_id__gt=desde_venta_id)
         
-        for venta in ventas:
-            fecha = venta.fecha
-            
-            anio = fecha.year
-            mes = fecha.month
-            dia_semana = fecha.weekday()
-            semana_anio = fecha.isocalendar()[1]
-            es_fin_semana = 1 if dia_semana >= 5 else 0
-            
-            total_venta = float(venta.total)
-            tipo_venta = venta.tipo_venta
-            origen = venta.origen
-            
-            cantidad_productos = venta.detalles.count()
-            cantidad_productos = venta.detalles.count()
-            
-            # Por cada detalle, crear registro para predicción por producto
-            for detalle in venta.detalles.all():
-                datos.append({
-                    'fecha': fecha,
-                    'anio': anio,
-                    'mes': mes,
-                    'dia_semana': dia_semana,
-                    'semana_anio': semana_anio,
-                    'es_fin_semana': es_fin_semana,
-                    'tipo_venta': tipo_venta,
-                    'origen': origen,
-                    'producto_id': detalle.variante_producto.producto.id,
-                    'producto_nombre': detalle.nombre_producto,
-                    'cantidad': detalle.cantidad,
-                    'precio_unitario': float(detalle.precio_unitario),
-                    'sub_total': float(detalle.sub_total),
-                    'total_venta': total_venta,
-                    'cantidad_productos_venta': cantidad_productos,
-                })
+        columnas = {
+            'venta_id': 'venta_id',
+            'venta__fecha': 'fecha',
+            'venta__tipo_venta': 'tipo_venta',
+            'venta__origen': 'origen',
+            'venta__total': 'total_venta',
+            'variante_producto__producto_id': 'producto_id',
+            'nombre_producto': 'producto_nombre',
+            'cantidad': 'cantidad',
+            'precio_unitario': 'precio_unitario',
+            'sub_total': 'sub_total',
+        }
+        df = pd.DataFrame.from_records(
+            detalles.values(*columnas.keys()), columns=list(columnas.keys())
+        ).rename(columns=columnas)
         
-        if not datos:
+        if df.empty:
+            if desde_venta_id is not None:
+                # Sin ventas nuevas: entrenar() conserva el modelo activo
+                return df
             raise ValueError("No hay datos suficientes para entrenar el modelo")
         
-        df = pd.DataFrame(datos)
+        for col in ['total_venta', 'precio_unitario', 'sub_total']:
+            df[col] = df[col].astype(float)
         
-        # Agregar features de tendencia (promedios móviles)
-        df = df.sort_values('fecha')
-        df['promedio_movil_7d'] = df.groupby('producto_id')['sub_total'].transform(
-            lambda x: x.rolling(window=7, min_periods=1).mean()
-        )
-        df['promedio_movil_30d'] = df.groupby('producto_id')['sub_total'].transform(
-            lambda x: x.rolling(window=30, min_periods=1).mean()
+        fechas = pd.to_datetime(df['fecha'])
+        df['anio'] = fechas.dt.year
+        df['mes'] = fechas.dt.month
+        df['dia_semana'] = fechas.dt.weekday
+        df['semana_anio'] = fechas.dt.isocalendar().week.astype(int)
+        df['es_fin_semana'] = (df['dia_semana'] >= 5).astype(int)
+        df['cantidad_productos_venta'] = df.groupby('venta_id')['venta_id'].transform('size')
+        
+        # Features de tendencia (promedios móviles) desde el feature store
+        store = pd.DataFrame.from_records(
+            VentaDiariaProducto.objects.filter(
+                producto_id__in=df['producto_id'].unique().tolist(),
+                fecha__gte=df['fecha'].min()
+            ).values('producto_id', 'fecha', 'promedio_movil_7d', 'promedio_movil_30d'),
+            columns=['producto_id', 'fecha', 'promedio_movil_7d', 'promedio_movil_30d']
         )
+        df = df.merge(store, on=['producto_id', 'fecha'], how='left')
+        df[['promedio_movil_7d', 'promedio_movil_30d']] = df[
+            ['promedio_movil_7d', 'promedio_movil_30d']
+        ].fillna(0)
         
-        return df
+        return df.sort_values('fecha')
     
-    def entrenar_modelo_ventas(self, df):
+    def _construir_features(self, df, ajustar_encoders=True):
         """
-        Entrena el modelo de predicción de ventas (RandomForest)
+        Codifica variables categóricas y retorna (X, y).
+        Con ajustar_encoders=False reutiliza los encoders del modelo cargado.
         """
-        # Codificar variables categóricas
-        self.label_encoders = {}
+        if ajustar_encoders:
+            self.label_encoders = {}
         df_encoded = df.copy()
         
         for col in ['tipo_venta', 'origen']:
-            le = LabelEncoder()
-            df_encoded[col + '_encoded'] = le.fit_transform(df_encoded[col])
-            self.label_encoders[col] = le
-        
-        # Features para el modelo
-        feature_columns = [
-            'anio', 'mes', 'dia_semana', 'semana_anio', 'es_fin_semana',
-            'tipo_venta_encoded', 'origen_encoded', 'producto_id',
-            'precio_unitario', 'cantidad_productos_venta',
-            'promedio_movil_7d', 'promedio_movil_30d'
-        ]
+            if ajustar_encoders:
+                le = LabelEncoder()
+                df_encoded[col + '_encoded'] = le.fit_transform(df_encoded[col])
+                self.label_encoders[col] = le
+            else:
+                df_encoded[col + '_encoded'] = self.label_encoders[col].transform(df_encoded[col])
         
-        X = df_encoded[feature_columns]
+        X = df_encoded[self.FEATURE_COLUMNS]
         y = df_encoded['sub_total']  # Variable objetivo: ventas
         
+        return X, y
+    
+    def entrenar_modelo_ventas(self, df, progreso=None):
+        """
+        Entrena el modelo de predicción de ventas (RandomForest)
+        """
+        X, y = self._construir_features(df)
+        
         # Split train/test
         X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=0.2, random_state=42
@@ -140,85 +152,253 @@ class MLService:
         
         # Entrenar modelo
         self.modelo_ventas = RandomForestRegressor(
-            n_estimators=100,
-            max_depth=10,
-            min_samples_split=5,
+            n_estimators=settings.IA_RF_N_ESTIMATORS,
+            max_depth=settings.IA_RF_MAX_DEPTH or None,
+            min_samples_split=settings.IA_RF_MIN_SAMPLES_SPLIT,
             random_state=42,
-            n_jobs=-1
+            n_jobs=settings.IA_TRAINING_N_JOBS
         )
         
         self.modelo_ventas.fit(X_train, y_train)
         
         # Calcular métricas
+        self._reportar(progreso, 'evaluando', 55)
+        return self._evaluar(X_train, X_test, y_test)
+    
+    def entrenar_modelo_ventas_incremental(self, df, progreso=None):
+        """
+        Agrega árboles al RandomForest activo entrenados solo con las filas
+        nuevas (warm start). Requiere haber llamado a _cargar_modelo_base().
+        """
+        X, y = self._construir_features(df, ajustar_encoders=False)
+        
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42
+        )
+        
+        self.modelo_ventas.set_params(
+            warm_start=True,
+            n_estimators=self.modelo_ventas.n_estimators + settings.IA_INCREMENTAL_ARBOLES,
+            n_jobs=settings.IA_TRAINING_N_JOBS
+        )
+        self.modelo_ventas.fit(X_train, y_train)
+        self.modelo_ventas.set_params(warm_start=False)
+        
+        self._reportar(progreso, 'evaluando', 55)
+        return self._evaluar(X_train, X_test, y_test)
+    
+    def _evaluar(self, X_train, X_test, y_test):
         y_pred = self.modelo_ventas.predict(X_test)
         
-        metricas = {
+        return {
             'mae': mean_absolute_error(y_test, y_pred),
             'mse': mean_squared_error(y_test, y_pred),
             'r2': r2_score(y_test, y_pred),
             'registros_train': len(X_train),
             'registros_test': len(X_test),
         }
-        
-        return metricas
     
-    def entrenar_modelo_anomalias(self, df):
+    def entrenar_modelo_anomalias(self):
         """
-        Entrena el modelo de detección de anomalías (IsolationForest)
+        Entrena el modelo de detección de anomalías (IsolationForest).
+
+        Siempre se reentrena completo sobre el último año de producto-días
+        del feature store, también en el modo incremental: las features son
+        relativas a la media de cada producto y, calculadas solo sobre uno o
+        dos días nuevos, valdrían ~1.0 y darían árboles degenerados.
         """
-        # Agrupar ventas por día para detectar patrones anómalos
-        df_daily = df.groupby(['fecha', 'producto_id']).agg({
-            'sub_total': 'sum',
-            'cantidad': 'sum'
-        }).reset_index()
+        df_daily = pd.DataFrame.from_records(
+            VentaDiariaProducto.objects.filter(
+                fecha__gte=timezone.now().date() - timedelta(days=365)
+            ).values_list('producto_id', 'ingresos', 'unidades'),
+            columns=['producto_id', 'total', 'cantidad']
+        )
+        if df_daily.empty:
+            raise ValueError("No hay ventas en el feature store para el modelo de anomalías")
         
-        # Features para detección de anomalías
-        features_anomalias = df_daily[['sub_total', 'cantidad']].values
+        features_anomalias = self.features_anomalias(df_daily)
         
         # Entrenar IsolationForest
         self.modelo_anomalias = IsolationForest(
             contamination=0.1,  # 10% de datos considerados anómalos
             random_state=42,
-            n_jobs=-1
+            n_jobs=settings.IA_TRAINING_N_JOBS
         )
         
         self.modelo_anomalias.fit(features_anomalias)
+        self.anomalias_relativas = True
         
         return True
     
-    def entrenar(self):
+    @staticmethod
+    def features_anomalias(diario):
+        """
+        Features del detector de anomalías por producto-día (columnas
+        producto_id, total, cantidad), relativas a la media de cada producto
+        en la ventana: 1.0 es un día típico del producto, así los más
+        vendidos no concentran las anomalías
+        """
+        por_producto = diario.groupby('producto_id')
+        return np.column_stack([
+            diario['total'].astype(float) / por_producto['total'].transform('mean').astype(float),
+            diario['cantidad'].astype(float) / por_producto['cantidad'].transform('mean').astype(float),
+        ])
+    
+    def _reportar(self, progreso, etapa, porcentaje):
+        if progreso:
+            progreso(etapa, porcentaje)
+    
+    def _resolver_modo(self, modo, modelo_activo):
+        """
+        Decide entre entrenamiento completo o incremental.
+
+        Returns:
+            tuple: (modo, motivo)
+        """
+        if modo == 'completo':
+            return 'completo', 'Entrenamiento completo solicitado'
+        
+        if not modelo_activo or modelo_activo.ultima_venta_id is None:
+            return 'completo', 'No hay modelo base con marca de agua'
+        
+        if modo == 'auto':
+            ultimo_completo = ModeloEntrenamiento.objects.filter(
+                tipo_entrenamiento='completo'
+            ).first()
+            limite = timezone.now() - timedelta(days=settings.IA_FULL_RETRAIN_DAYS)
+            if not ultimo_completo or ultimo_completo.fecha_entrenamiento < limite:
+                return 'completo', 'Reentrenamiento completo programado'
+        
+        return 'incremental', None
+    
+    def _cargar_modelo_base(self, modelo_activo):
+        """
+        Carga una copia privada (sin mmap) del modelo activo para actualizarla
+        sin tocar la instancia compartida del ModelRegistry
+        """
+        try:
+            modelo_path = ArtifactStore().ruta_local(
+                modelo_activo.archivo_modelo, modelo_activo.checksum
+            )
+        except (FileNotFoundError, ValueError):
+            return False
+        if not os.path.exists(modelo_path):
+            return False
+        
+        modelos_data = joblib.load(modelo_path)
+        self.modelo_ventas = modelos_data.get('modelo_ventas')
+        self.modelo_anomalias = modelos_data.get('modelo_anomalias')
+        self.anomalias_relativas = modelos_data.get('anomalias_relativas', False)
+        self.label_encoders = modelos_data.get('label_encoders', {})
+        return self.modelo_ventas is not None
+    
+    def _detectar_deriva(self, df, modelo_activo):
+        """
+        Evalúa el modelo activo sobre las filas nuevas. Retorna el motivo
+        para forzar un entrenamiento completo o None si no hay deriva.
+        """
+        try:
+            X, y = self._construir_features(df, ajustar_encoders=False)
+        except ValueError:
+            return 'Categorías nuevas no vistas por el modelo base'
+        
+        mae_nuevo = mean_absolute_error(y, self.modelo_ventas.predict(X))
+        mae_base = self.mae_referencia(modelo_activo)
+        if mae_base and mae_nuevo > mae_base * settings.IA_DRIFT_FACTOR:
+            return (
+                f'Deriva detectada: MAE en datos nuevos {mae_nuevo:.2f} '
+                f'vs {mae_base:.2f} del último entrenamiento completo'
+            )
+        
+        return None
+    
+    @staticmethod
+    def mae_referencia(modelo):
+        """
+        MAE del último entrenamiento completo del que deriva `modelo`. El
+        MAE de un incremental se mide sobre un holdout de pocas filas nuevas
+        y no sirve de línea base para la deriva.
+        """
+        while modelo.tipo_entrenamiento == 'incremental' and modelo.modelo_base_id:
+            modelo = modelo.modelo_base
+        return modelo.mae
+    
+    def entrenar(self, progreso=None, modo='auto'):
+        """
+        Entrena y registra los modelos. `progreso` es un callable opcional
+        (etapa, porcentaje) usado para reportar el avance del entrenamiento.
+
+        `modo` puede ser 'completo', 'incremental' o 'auto'. El modo
+        incremental solo usa las ventas posteriores a la marca de agua del
+        modelo activo y cae a un entrenamiento completo cuando toca por
+        calendario (IA_FULL_RETRAIN_DAYS) o cuando se detecta deriva.
+        """
         try:
             print("🚀 Iniciando entrenamiento de modelos ML...")
             
+            modelo_activo = ModeloEntrenamiento.objects.filter(activo=True).first()
+            modo, motivo = self._resolver_modo(modo, modelo_activo)
+            
             # 1. Preparar datos
             print("📊 Preparando datos de entrenamiento...")
-            df = self.preparar_datos_entrenamiento()
+            self._reportar(progreso, 'extrayendo', 5)
+            
+            if modo == 'incremental':
+                df = self.preparar_datos_entrenamiento(
+                    desde_venta_id=modelo_activo.ultima_venta_id
+                )
+                if len(df) < settings.IA_INCREMENTAL_MIN_REGISTROS:
+                    # Día tranquilo: se conserva el modelo activo sin marcar el trabajo como fallido
+                    print(
+                        f"ℹ️ Solo hay {len(df)} registros nuevos (mínimo "
+                        f"{settings.IA_INCREMENTAL_MIN_REGISTROS}); se conserva el modelo activo"
+                    )
+                    return self._resultado_sin_cambios(modelo_activo)
+                
+                if not self._cargar_modelo_base(modelo_activo):
+                    modo, motivo = 'completo', 'Archivo del modelo base no disponible'
+                else:
+                    motivo = self._detectar_deriva(df, modelo_activo)
+                    if motivo:
+                        modo = 'completo'
+            
+            if modo == 'completo':
+                print(f"ℹ️ Entrenamiento completo: {motivo}")
+                df = self.preparar_datos_entrenamiento()
+            else:
+                print(f"ℹ️ Entrenamiento incremental desde la venta #{modelo_activo.ultima_venta_id}")
             print(f"✅ {len(df)} registros preparados")
             
             # 2. Entrenar modelo de predicción
             print("🤖 Entrenando modelo de predicción de ventas...")
-            metricas = self.entrenar_modelo_ventas(df)
+            self._reportar(progreso, 'entrenando', 25)
+            if modo == 'incremental':
+                metricas = self.entrenar_modelo_ventas_incremental(df, progreso=progreso)
+            else:
+                metricas = self.entrenar_modelo_ventas(df, progreso=progreso)
             print(f"✅ Modelo entrenado - MAE: {metricas['mae']:.2f}, R²: {metricas['r2']:.4f}")
             
             # 3. Entrenar modelo de anomalías
             print("🔍 Entrenando modelo de detección de anomalías...")
-            self.entrenar_modelo_anomalias(df)
+            self._reportar(progreso, 'entrenando', 65)
+            self.entrenar_modelo_anomalias()
             print("✅ Modelo de anomalías entrenado")
             
             # 4. Guardar modelos
+            self._reportar(progreso, 'guardando', 85)
             version = datetime.now().strftime('%Y%m%d_%H%M%S')
-            nombre_archivo = f'modelo_ventas_{version}.pkl'
-            ruta_completa = os.path.join(self.model_dir, nombre_archivo)
             
             modelos_data = {
                 'modelo_ventas': self.modelo_ventas,
                 'modelo_anomalias': self.modelo_anomalias,
                 'label_encoders': self.label_encoders,
+                'anomalias_relativas': self.anomalias_relativas,
                 'version': version,
                 'fecha_entrenamiento': datetime.now(),
             }
             
-            joblib.dump(modelos_data, ruta_completa)
+            store = ArtifactStore()
+            nombre_archivo, checksum = store.guardar(modelos_data, f'modelo_ventas_{version}')
             print(f"💾 Modelos guardados en: {nombre_archivo}")
             
             # 5. Registrar en base de datos
@@ -235,9 +415,27 @@ class MLService:
                 registros_entrenamiento=metricas['registros_train'],
                 registros_prueba=metricas['registros_test'],
                 archivo_modelo=nombre_archivo,
+                checksum=checksum,
                 activo=True,
-                notas=f"Entrenamiento automático con {len(df)} registros históricos"
+                tipo_entrenamiento=modo,
+                modelo_base=modelo_activo if modo == 'incremental' else None,
+                ultima_venta_id=int(df['venta_id'].max()),
+                fecha_corte_datos=df['fecha'].max(),
+                notas=(
+                    f"Entrenamiento {modo} con {len(df)} registros"
+                    + (f" ({motivo})" if motivo else "")
+                )
             )
+            ModelRegistry.invalidar()
+            cache.invalidar('ia_modelo')
+            
+            # 6. Eliminar artefactos antiguos
+            try:
+                eliminados = store.limpiar()
+                if eliminados:
+                    print(f"🧹 {eliminados} artefactos antiguos eliminados")
+            except Exception as e:
+                print(f"⚠️ Error limpiando artefactos: {str(e)}")
             
             print("✅ Entrenamiento completado exitosamente")
             
@@ -245,6 +443,7 @@ class MLService:
                 'success': True,
                 'metricas': metricas,
                 'modelo_id': modelo_db.id,
+                'modo': modo,
                 'version': version,
                 'archivo': nombre_archivo,
             }
@@ -256,6 +455,27 @@ class MLService:
                 'error': str(e)
             }
     
+    def _resultado_sin_cambios(self, modelo_activo):
+        """
+        Resultado de un entrenamiento que no generó un modelo nuevo
+        """
+        return {
+            'success': True,
+            'metricas': {
+                'mae': modelo_activo.mae,
+                'mse': modelo_activo.mse,
+                'r2': modelo_activo.r2_score,
+                'registros_train': modelo_activo.registros_entrenamiento,
+                'registros_test': modelo_activo.registros_prueba,
+            },
+            'modelo_id': modelo_activo.id,
+            'modo': 'sin_cambios',
+            'version': modelo_activo.version,
+            'archivo': modelo_activo.archivo_modelo,
+        }
+    
+    # Por id de modelo: la invalidación de entrenar() no llega a otros procesos con caché locmem
+    @cached('ia_modelo', clave=lambda self: ModelRegistry.modelo_activo_id())
     def obtener_metricas_modelo_activo(self):
         """
         Obtiene las métricas del modelo activo
@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+
+import joblib
+from django.conf import settings
+
+from apps.core.metrics import ML_CARGA_MODELO
+from apps.ia.models import ModeloEntrenamiento
+from .artifact_store import ArtifactStore
+
+
+class ModelRegistry:
+    """
+    Registro de modelos por proceso.
+
+    Carga el modelo activo una sola vez por worker y lo reutiliza entre
+    requests. La versión activa se verifica con una consulta mínima como
+    máximo cada IA_MODEL_CHECK_INTERVAL segundos; cuando cambia, el nuevo
+    modelo se carga aparte y se reemplaza con una sola asignación, de modo
+    que los lectores siempre ven un estado completo (viejo o nuevo).
+    """
+
+    _carga_lock = threading.Lock()
+
+    # (modelo_id, archivo_modelo, modelos_data) - se reemplaza completo
+    _estado = (None, None, None)
+    _ultima_verificacion = None
+
+    # (modelo_id, momento de la verificación) para quien solo necesita el id
+    _activo_id = (None, None)
+
+    @classmethod
+    def obtener(cls):
+        """
+        Retorna el diccionario del modelo activo (o None si no hay modelo)
+        """
+        ahora = time.monotonic()
+        intervalo = settings.IA_MODEL_CHECK_INTERVAL
+
+        if cls._ultima_verificacion is not None and ahora - cls._ultima_verificacion < intervalo:
+            return cls._estado[2]
+
+        activo = ModeloEntrenamiento.objects.filter(activo=True).values_list(
+            'id', 'archivo_modelo', 'checksum'
+        ).first()
+        cls._ultima_verificacion = ahora
+
+        if activo is None:
+            cls._estado = (None, None, None)
+            return None
+
+        modelo_id, archivo, checksum = activo
+        if cls._estado[0] == modelo_id and cls._estado[2] is not None:
+            return cls._estado[2]
+
+        return cls._cargar(modelo_id, archivo, checksum)
+
+    @classmethod
+    def _cargar(cls, modelo_id, archivo, checksum=None):
+        with cls._carga_lock:
+            # Otro hilo pudo haberlo cargado mientras esperábamos
+            if cls._estado[0] == modelo_id and cls._estado[2] is not None:
+                return cls._estado[2]
+
+            try:
+                # Descarga el artefacto a la caché local si este nodo no lo tiene
+                modelo_path = ArtifactStore().ruta_local(archivo, checksum)
+            except Exception as e:
+                print(f"⚠️ Artefacto de modelo no disponible: {archivo} ({str(e)})")
+                return cls._estado[2]
+
+            if not os.path.exists(modelo_path):
+                print(f"⚠️ Archivo de modelo no encontrado: {archivo}")
+                return cls._estado[2]
+
+            try:
+                mmap_mode = 'r' if settings.IA_MODEL_MMAP else None
+                with ML_CARGA_MODELO.time():
+                    modelos_data = joblib.load(modelo_path, mmap_mode=mmap_mode)
+            except Exception as e:
+                print(f"❌ Error al cargar modelos: {str(e)}")
+                return cls._estado[2]
+
+            cls._estado = (modelo_id, archivo, modelos_data)
+            print(f"✅ Modelos cargados: {archivo}")
+            return modelos_data
+
+    @classmethod
+    def modelo_id(cls):
+        return cls._estado[0]
+
+    @classmethod
+    def modelo_activo_id(cls):
+        """
+        Id del modelo activo sin cargarlo, verificado como mucho cada
+        IA_MODEL_CHECK_INTERVAL segundos. Sirve de clave para lo que se
+        cachea por modelo: un entrenamiento en otro proceso cambia la clave
+        aunque la caché compartida no lo sea.
+        """
+        modelo_id, verificado = cls._activo_id
+        ahora = time.monotonic()
+
+        if verificado is None or ahora - verificado >= settings.IA_MODEL_CHECK_INTERVAL:
+            modelo_id = ModeloEntrenamiento.objects.filter(activo=True).values_list('id', flat=True).first()
+            cls._activo_id = (modelo_id, ahora)
+
+        return modelo_id
+
+    @classmethod
+    def invalidar(cls):
+        """
+        Fuerza la verificación de la versión activa en el próximo acceso
+        """
+        cls._ultima_verificacion = None
+        cls._activo_id = (None, None)
@@ -0,0 +1,205 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Sum, Count
+from django.utils import timezone
+
+from apps.ia.models import ModeloEntrenamiento, PronosticoProducto, VentaDiariaProducto
+from .feature_store import FeatureStore
+from .ml_service import MLService
+from .training_jobs import TrainingJobService
+
+
+class ModelMonitor:
+    """
+    Monitoreo del modelo en producción.
+
+    - Pronósticos: cada PronosticoProducto cuyo período ya cerró se compara
+      una sola vez con las ventas reales del feature store.
+    - Deriva: el modelo activo predice las ventas registradas después de su
+      marca de agua y el MAE acumulado se compara con el de entrenamiento.
+
+    Ambos pasos son incrementales: solo procesan lo nuevo desde la última
+    ejecución.
+    """
+
+    def monitorear(self, reentrenar=True):
+        """
+        Ejecuta ambos pasos y, si hay deriva, encola un entrenamiento completo.
+
+        Returns:
+            dict: resumen de la ejecución
+        """
+        FeatureStore().actualizar()
+
+        resumen = {
+            'pronosticos_evaluados': self.evaluar_pronosticos(),
+            'registros_evaluados': self.evaluar_modelo(),
+            'reentrenamiento': None,
+        }
+
+        deriva = self.metricas()['produccion']
+        if reentrenar and settings.IA_DRIFT_AUTO_RETRAIN and deriva and deriva['deriva']:
+            trabajo, creado = TrainingJobService.encolar(modo='completo')
+            resumen['reentrenamiento'] = {'trabajo_id': trabajo.id, 'creado': creado}
+
+        return resumen
+
+    def evaluar_pronosticos(self):
+        """
+        Completa ventas reales y error de los pronósticos con período cerrado
+
+        Returns:
+            int: cantidad de pronósticos evaluados
+        """
+        hoy = timezone.now().date()
+        pendientes = PronosticoProducto.objects.filter(
+            fecha_evaluacion__isnull=True,
+            fecha_fin__lt=hoy
+        )
+
+        evaluados = 0
+        periodos = pendientes.values_list('fecha_inicio', 'fecha_fin').distinct()
+        for fecha_inicio, fecha_fin in periodos:
+            reales = {
+                r['producto_id']: r
+                for r in VentaDiariaProducto.objects.filter(
+                    fecha__gte=fecha_inicio,
+                    fecha__lte=fecha_fin
+                ).values('producto_id').annotate(
+                    ingresos=Sum('ingresos'),
+                    unidades=Sum('unidades')
+                )
+            }
+
+            pronosticos = list(pendientes.filter(fecha_inicio=fecha_inicio, fecha_fin=fecha_fin))
+            ahora = timezone.now()
+            for pronostico in pronosticos:
+                real = reales.get(pronostico.producto_id, {})
+                pronostico.ventas_reales = real.get('ingresos') or Decimal('0.00')
+                pronostico.cantidad_real = real.get('unidades') or 0
+                pronostico.error_absoluto = abs(
+                    float(pronostico.ventas_predichas) - float(pronostico.ventas_reales)
+                )
+                pronostico.fecha_evaluacion = ahora
+
+            PronosticoProducto.objects.bulk_update(
+                pronosticos,
+                ['ventas_reales', 'cantidad_real', 'error_absoluto', 'fecha_evaluacion'],
+                batch_size=1000
+            )
+            evaluados += len(pronosticos)
+
+        return evaluados
+
+    def evaluar_modelo(self):
+        """
+        Acumula el error del modelo activo sobre las ventas nuevas
+
+        Returns:
+            int: cantidad de registros evaluados
+        """
+        modelo = ModeloEntrenamiento.objects.filter(activo=True).first()
+        if not modelo or modelo.ultima_venta_id is None:
+            return 0
+
+        desde = modelo.ultima_venta_monitoreada or modelo.ultima_venta_id
+
+        ml_service = MLService()
+        if not ml_service.cargar_modelos():
+            return 0
+
+        try:
+            df = ml_service.preparar_datos_entrenamiento(desde_venta_id=desde)
+        except ValueError:
+            return 0
+        if df.empty:
+            # Ninguna venta posterior a la marca: nada que evaluar
+            return 0
+
+        try:
+            X, y = ml_service._construir_features(df, ajustar_encoders=False)
+        except ValueError:
+            # Categorías que el modelo no conoce: no se pueden evaluar
+            # con este modelo, se deja constancia sin avanzar el MAE
+            modelo.ultima_venta_monitoreada = int(df['venta_id'].max())
+            modelo.fecha_monitoreo = timezone.now()
+            modelo.save(update_fields=['ultima_venta_monitoreada', 'fecha_monitoreo'])
+            return 0
+
+        errores = np.abs(y.to_numpy() - ml_service.modelo_ventas.predict(X))
+
+        # Media acumulada: combina el MAE previo con los errores nuevos
+        previos = modelo.registros_produccion
+        total = previos + len(errores)
+        modelo.mae_produccion = (
+            (modelo.mae_produccion or 0) * previos + float(errores.sum())
+        ) / total
+        modelo.registros_produccion = total
+        modelo.ultima_venta_monitoreada = int(df['venta_id'].max())
+        modelo.fecha_monitoreo = timezone.now()
+        modelo.save(update_fields=[
+            'mae_produccion', 'registros_produccion', 'ultima_venta_monitoreada', 'fecha_monitoreo'
+        ])
+
+        return len(errores)
+
+    def metricas(self):
+        """
+        Métricas de producción para /api/ia/model-info/
+        """
+        modelo = ModeloEntrenamiento.objects.filter(activo=True).first()
+
+        produccion = None
+        if modelo and modelo.mae_produccion is not None:
+            razon = modelo.mae_produccion / modelo.mae if modelo.mae else None
+            produccion = {
+                'mae_entrenamiento': modelo.mae,
+                'mae_produccion': round(modelo.mae_produccion, 4),
+                'registros': modelo.registros_produccion,
+                'razon_mae': round(razon, 4) if razon is not None else None,
+                'umbral_deriva': settings.IA_DRIFT_FACTOR,
+                'deriva': bool(
+                    razon is not None
+                    and modelo.registros_produccion >= settings.IA_DRIFT_MIN_REGISTROS
+                    and razon > settings.IA_DRIFT_FACTOR
+                ),
+                'fecha_monitoreo': modelo.fecha_monitoreo,
+            }
+
+        # Precisión de los pronósticos en la ventana móvil
+        ventana = PronosticoProducto.objects.filter(
+            fecha_evaluacion__isnull=False,
+            fecha_fin__gte=timezone.now().date() - timedelta(days=settings.IA_MONITOREO_VENTANA_DIAS)
+        )
+        totales = ventana.aggregate(
+            evaluados=Count('id'),
+            error=Sum('error_absoluto'),
+            reales=Sum('ventas_reales')
+        )
+
+        pronosticos = {
+            'ventana_dias': settings.IA_MONITOREO_VENTANA_DIAS,
+            'evaluados': totales['evaluados'],
+            'mae': round(totales['error'] / totales['evaluados'], 2) if totales['evaluados'] else None,
+            # Error absoluto ponderado: suma de errores / suma de ventas reales
+            'wape': round(totales['error'] / float(totales['reales']), 4) if totales['reales'] else None,
+            'productos_mayor_error': [
+                {
+                    'producto_id': p['producto_id'],
+                    'producto_nombre': p['producto__nombre'],
+                    'error_absoluto': round(p['error'], 2),
+                    'ventas_reales': p['reales'],
+                    'evaluados': p['evaluados'],
+                }
+                for p in ventana.values('producto_id', 'producto__nombre').annotate(
+                    error=Sum('error_absoluto'),
+                    reales=Sum('ventas_reales'),
+                    evaluados=Count('id')
+                ).order_by('-error')[:5]
+            ],
+        }
+
+        return {'produccion': produccion, 'pronosticos': pronosticos}
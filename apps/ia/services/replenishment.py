@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from scipy.stats import norm
+
+from apps.venta.models import DetalleVenta
+from apps.producto_variante.models import VarianteProducto
+from apps.ia.models import SugerenciaReposicion
+
+
+class ReplenishmentEngine:
+    """
+    Calcula para todas las variantes a la vez el punto de reorden, el stock
+    de seguridad y el nivel objetivo de reposición.
+
+    La demanda diaria de cada variante es el promedio de los últimos 60 días
+    ajustado por la tendencia contra los 60 días previos (el mismo criterio
+    que los pronósticos por producto). Con la desviación diaria y el tiempo
+    de reposición se obtiene:
+
+        stock_seguridad = z(nivel_servicio) · σ · √dias_reposicion
+        punto_reorden   = demanda · dias_reposicion + stock_seguridad
+        nivel_objetivo  = punto_reorden + demanda · dias_cobertura
+    """
+
+    DIAS_VENTANA = 60
+
+    def calcular(self, aplicar_stock_minimo=False):
+        """
+        Recalcula la tabla SugerenciaReposicion completa.
+
+        Returns:
+            int: cantidad de variantes procesadas
+        """
+        hoy = timezone.now().date()
+        inicio = hoy - timedelta(days=2 * self.DIAS_VENTANA)
+
+        variantes = pd.DataFrame.from_records(
+            VarianteProducto.objects.values_list('id', 'stock', 'dias_reposicion'),
+            columns=['variante_id', 'stock', 'dias_reposicion']
+        ).set_index('variante_id')
+
+        if variantes.empty:
+            return 0
+
+        ventas = pd.DataFrame.from_records(
+            DetalleVenta.objects.filter(
+                venta__fecha__gte=inicio,
+                venta__fecha__lt=hoy
+            ).values('variante_producto_id', 'venta__fecha').annotate(
+                unidades=Sum('cantidad')
+            ).values_list('variante_producto_id', 'venta__fecha', 'unidades'),
+            columns=['variante_id', 'fecha', 'unidades']
+        )
+
+        # Matriz densa (días x variantes) con ceros en días sin ventas
+        fechas = pd.date_range(inicio, hoy - timedelta(days=1), freq='D')
+        diario = ventas.assign(fecha=pd.to_datetime(ventas['fecha'])).pivot_table(
+            index='fecha', columns='variante_id', values='unidades', aggfunc='sum'
+        ).reindex(index=fechas, columns=variantes.index).fillna(0).to_numpy(dtype=float)
+
+        recientes = diario[-self.DIAS_VENTANA:]
+        anteriores = diario[:-self.DIAS_VENTANA]
+
+        media = recientes.mean(axis=0)
+        desviacion = recientes.std(axis=0)
+        suma_anterior = anteriores.sum(axis=0)
+        tendencia = np.divide(
+            recientes.sum(axis=0) - suma_anterior, suma_anterior,
+            out=np.zeros_like(suma_anterior), where=suma_anterior > 0
+        )
+        demanda = media * (1 + np.clip(tendencia, -0.5, 1.0))
+
+        dias_reposicion = pd.to_numeric(variantes['dias_reposicion'], errors='coerce').fillna(
+            settings.IA_REPOSICION_DIAS_DEFECTO
+        ).to_numpy(dtype=float)
+        z = norm.ppf(settings.IA_REPOSICION_NIVEL_SERVICIO)
+
+        stock_seguridad = np.ceil(z * desviacion * np.sqrt(dias_reposicion))
+        punto_reorden = np.ceil(demanda * dias_reposicion + stock_seguridad)
+        nivel_objetivo = np.ceil(punto_reorden + demanda * settings.IA_REPOSICION_DIAS_COBERTURA)
+
+        stock = variantes['stock'].to_numpy(dtype=float)
+        dias_cobertura = np.divide(
+            stock, demanda, out=np.full_like(stock, np.nan), where=demanda > 0
+        )
+
+        ahora = timezone.now()
+        sugerencias = [
+            SugerenciaReposicion(
+                variante_id=int(variante_id),
+                demanda_diaria=round(float(demanda[i]), 4),
+                desviacion_diaria=round(float(desviacion[i]), 4),
+                dias_reposicion=int(dias_reposicion[i]),
+                stock_seguridad=int(stock_seguridad[i]),
+                punto_reorden=int(punto_reorden[i]),
+                nivel_objetivo=int(nivel_objetivo[i]),
+                stock_minimo_sugerido=int(punto_reorden[i]),
+                stock_actual=int(stock[i]),
+                dias_cobertura=None if np.isnan(dias_cobertura[i]) else round(float(dias_cobertura[i]), 1),
+                fecha_calculo=ahora,
+            )
+            for i, variante_id in enumerate(variantes.index)
+        ]
+
+        with transaction.atomic():
+            SugerenciaReposicion.objects.all().delete()
+            SugerenciaReposicion.objects.bulk_create(sugerencias, batch_size=1000)
+
+            if aplicar_stock_minimo:
+                VarianteProducto.objects.bulk_update(
+                    [
+                        VarianteProducto(id=s.variante_id, stock_minimo=s.stock_minimo_sugerido)
+                        for s in sugerencias
+                    ],
+                    ['stock_minimo'],
+                    batch_size=1000
+                )
+
+        return len(sugerencias)
@@ -0,0 +1,308 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from apps.venta.models import Venta, DetalleVenta
+from apps.ia.models import AlertaAnomalia, EstadisticaVentas
+from .alertas import AlertService
+
+
+class StreamingAnomalyDetector:
+    """
+    Detección de anomalías en línea.
+
+    Cada venta confirmada suma su monto al día en curso de la estadística
+    general y de cada producto vendido con un UPDATE atómico (F()), sin
+    bloquear las filas de antemano: las ventas simultáneas no se esperan
+    entre sí. Al cambiar de día, el total del día cerrado se incorpora a la
+    media/varianza (Welford) y al EWMA; eso ocurre una vez por clave y día,
+    bajo bloqueo. Si el total acumulado del día supera EWMA + z·σ se genera
+    la alerta de inmediato; las ventas bajas solo pueden saberse al cerrar
+    el día.
+
+    En la estadística general los días sin ninguna venta cuentan como 0,
+    así una caída a cero también alerta; como sin ventas nadie dispara el
+    cambio de día, cerrar_dias() debe correr a diario (manage.py
+    close_sales_days). En los productos los días sin ventas no se cuentan,
+    igual que en la detección por lotes.
+    """
+
+    CLAVE_GENERAL = 'general'
+    ZSCORE_GENERAL = 2
+    MIN_DIAS_GENERAL = 7
+    MIN_DIAS_PRODUCTO = 5
+    # Días sin ventas que se completan con 0 como máximo al cerrar (un año)
+    MAX_DIAS_SIN_VENTAS = 366
+
+    CAMPOS = ['dia_actual', 'total_dia', 'dias_observados', 'media', 'm2', 'ewma', 'fecha_actualizacion']
+
+    @staticmethod
+    def registrar_venta(fecha, total, montos_productos):
+        """
+        Args:
+            fecha: fecha de la venta
+            total: total de la venta
+            montos_productos: {producto_id: (nombre, sub_total)}
+
+        Returns:
+            list: alertas nuevas (las ya registradas hoy no se repiten)
+        """
+        montos = {StreamingAnomalyDetector.CLAVE_GENERAL: float(total)}
+        nuevas = [EstadisticaVentas(clave=StreamingAnomalyDetector.CLAVE_GENERAL, dia_actual=fecha)]
+        for producto_id, (nombre, monto) in montos_productos.items():
+            clave = f'producto:{producto_id}'
+            montos[clave] = float(monto)
+            nuevas.append(EstadisticaVentas(
+                clave=clave, producto_id=producto_id, producto_nombre=nombre, dia_actual=fecha
+            ))
+
+        # Crear las que falten (empiezan en el día de la venta)
+        EstadisticaVentas.objects.bulk_create(nuevas, ignore_conflicts=True)
+
+        # Primera venta de un día nuevo para estas claves: cerrar el anterior
+        alertas = StreamingAnomalyDetector.cerrar_dias(fecha, claves=list(montos), guardar=False)
+
+        # Sumar la venta: un UPDATE de una fila por clave, sin transacción
+        # alrededor, así el bloqueo de cada fila dura una sola sentencia
+        ahora = timezone.now()
+        for clave in sorted(montos):
+            EstadisticaVentas.objects.filter(clave=clave, dia_actual__gte=fecha).update(
+                total_dia=F('total_dia') + montos[clave],
+                fecha_actualizacion=ahora
+            )
+
+        for estadistica in EstadisticaVentas.objects.filter(clave__in=list(montos)):
+            alerta = StreamingAnomalyDetector._verificar_dia_alto(estadistica)
+            if alerta:
+                alertas.append(alerta)
+
+        return AlertService.guardar(alertas)
+
+    @staticmethod
+    def cerrar_dias(hasta=None, claves=None, guardar=True):
+        """
+        Incorpora a las estadísticas los días anteriores a `hasta` (hoy por
+        defecto) que sigan abiertos, completando con 0 los días sin ventas
+        de la estadística general.
+
+        Returns:
+            list: alertas de venta baja (insertadas si guardar=True)
+        """
+        hasta = hasta or timezone.now().date()
+
+        with transaction.atomic():
+            # Solo las filas que cambian de día; en orden fijo, sin deadlocks
+            vencidas = EstadisticaVentas.objects.select_for_update().filter(
+                Q(dia_actual__lt=hasta) | Q(dia_actual__isnull=True)
+            )
+            if claves is not None:
+                vencidas = vencidas.filter(clave__in=claves)
+            vencidas = list(vencidas.order_by('clave'))
+
+            alertas = []
+            for estadistica in vencidas:
+                alertas.extend(StreamingAnomalyDetector._avanzar(estadistica, hasta))
+
+            if vencidas:
+                EstadisticaVentas.objects.bulk_update(vencidas, StreamingAnomalyDetector.CAMPOS)
+
+        return AlertService.guardar(alertas) if guardar else alertas
+
+    @staticmethod
+    def _avanzar(estadistica, hasta):
+        """
+        Cierra el día en curso (y los días sin ventas hasta `hasta`, en la
+        general) y deja `hasta` como día en curso
+        """
+        alertas = []
+        es_general = estadistica.producto_id is None
+
+        if estadistica.dia_actual is not None:
+            dias = []
+            if es_general or estadistica.total_dia > 0:
+                dias.append((estadistica.dia_actual, estadistica.total_dia))
+            if es_general:
+                desde = max(
+                    estadistica.dia_actual + timedelta(days=1),
+                    hasta - timedelta(days=StreamingAnomalyDetector.MAX_DIAS_SIN_VENTAS)
+                )
+                dias.extend(
+                    (desde + timedelta(days=i), 0.0) for i in range((hasta - desde).days)
+                )
+
+            for dia, total_dia in dias:
+                estadistica.dia_actual = dia
+                estadistica.total_dia = total_dia
+                alerta = StreamingAnomalyDetector._cerrar_dia(estadistica)
+                if alerta:
+                    alertas.append(alerta)
+
+        estadistica.dia_actual = hasta
+        estadistica.total_dia = 0
+        estadistica.fecha_actualizacion = timezone.now()
+        return alertas
+
+    @staticmethod
+    def _cerrar_dia(estadistica):
+        """
+        Incorpora el total del día cerrado y, para la estadística general,
+        reporta si fue un día inusualmente bajo
+        """
+        x = estadistica.total_dia
+        alerta = None
+
+        if (estadistica.producto_id is None
+                and estadistica.dias_observados >= StreamingAnomalyDetector.MIN_DIAS_GENERAL):
+            std = estadistica.desviacion
+            if std > 0 and (x - estadistica.ewma) / std < -StreamingAnomalyDetector.ZSCORE_GENERAL:
+                alerta = AlertaAnomalia(
+                    tipo='venta_baja',
+                    fecha_referencia=estadistica.dia_actual,
+                    descripcion=f"Ventas inusualmente bajas detectadas: Bs. {x:.2f} "
+                               f"(promedio: Bs. {estadistica.ewma:.2f})",
+                    score_anomalia=-1,
+                    valor_real=Decimal(str(round(x, 2))),
+                    valor_esperado=Decimal(str(round(estadistica.ewma, 2))),
+                    estado='nueva'
+                )
+
+        # Welford
+        estadistica.dias_observados += 1
+        delta = x - estadistica.media
+        estadistica.media += delta / estadistica.dias_observados
+        estadistica.m2 += delta * (x - estadistica.media)
+
+        # EWMA
+        if estadistica.dias_observados == 1:
+            estadistica.ewma = x
+        else:
+            alpha = settings.IA_STREAMING_EWMA_ALPHA
+            estadistica.ewma = alpha * x + (1 - alpha) * estadistica.ewma
+
+        return alerta
+
+    @staticmethod
+    def _verificar_dia_alto(estadistica):
+        es_general = estadistica.producto_id is None
+        min_dias = (
+            StreamingAnomalyDetector.MIN_DIAS_GENERAL if es_general
+            else StreamingAnomalyDetector.MIN_DIAS_PRODUCTO
+        )
+        umbral = StreamingAnomalyDetector.ZSCORE_GENERAL if es_general else settings.IA_ANOMALY_ZSCORE_PRODUCTO
+
+        std = estadistica.desviacion
+        if estadistica.dias_observados < min_dias or std == 0:
+            return None
+
+        total = estadistica.total_dia
+        esperado = estadistica.ewma
+        if (total - esperado) / std <= umbral:
+            return None
+
+        if es_general:
+            descripcion = (
+                f"Ventas inusualmente altas detectadas: Bs. {total:.2f} "
+                f"(promedio: Bs. {esperado:.2f})"
+            )
+        else:
+            descripcion = (
+                f"Comportamiento anómalo en producto '{estadistica.producto_nombre}': "
+                f"ventas muy altas - Bs. {total:.2f} (esperado: Bs. {esperado:.2f})"
+            )
+
+        return AlertaAnomalia(
+            tipo='venta_alta' if es_general else 'producto_anomalo',
+            fecha_referencia=estadistica.dia_actual,
+            descripcion=descripcion,
+            score_anomalia=-1,
+            producto_id=estadistica.producto_id,
+            producto_nombre=estadistica.producto_nombre,
+            valor_real=Decimal(str(round(total, 2))),
+            valor_esperado=Decimal(str(round(esperado, 2))),
+            estado='nueva'
+        )
+
+    @staticmethod
+    def reconstruir(dias=90):
+        """
+        Inicializa las estadísticas desde el historial (uso único o tras
+        cambios masivos de datos). Los días sin ventas cuentan como 0 en la
+        estadística general y no se cuentan en los productos, igual que en
+        registrar_venta().
+        """
+        # pandas solo aquí: el módulo se importa en cada venta (registrar_venta)
+        import pandas as pd
+
+        hoy = timezone.now().date()
+        fecha_inicio = hoy - timedelta(days=dias)
+        alpha = settings.IA_STREAMING_EWMA_ALPHA
+
+        general = pd.DataFrame.from_records(
+            Venta.objects.filter(fecha__gte=fecha_inicio).values('fecha').annotate(
+                total=Sum('total')
+            ).values_list('fecha', 'total'),
+            columns=['fecha', 'total']
+        )
+        if not general.empty:
+            # Días sin ninguna venta desde la primera de la ventana hasta hoy
+            dias = pd.date_range(general['fecha'].min(), hoy, freq='D').date
+            general = general.set_index('fecha')['total'].astype(float).reindex(
+                dias, fill_value=0.0
+            ).rename_axis('fecha').reset_index()
+        general['clave'] = StreamingAnomalyDetector.CLAVE_GENERAL
+        general['producto_id'] = None
+        general['producto_nombre'] = None
+
+        productos = pd.DataFrame.from_records(
+            DetalleVenta.objects.filter(venta__fecha__gte=fecha_inicio).values(
+                'variante_producto__producto_id',
+                'variante_producto__producto__nombre',
+                'venta__fecha'
+            ).annotate(total=Sum('sub_total')).values_list(
+                'variante_producto__producto_id',
+                'variante_producto__producto__nombre',
+                'venta__fecha',
+                'total'
+            ),
+            columns=['producto_id', 'producto_nombre', 'fecha', 'total']
+        )
+        productos['clave'] = 'producto:' + productos['producto_id'].astype(str)
+
+        serie = pd.concat([general, productos], ignore_index=True)
+        serie['total'] = serie['total'].astype(float)
+        serie = serie.sort_values(['clave', 'fecha'])
+
+        cerrados = serie[serie['fecha'] < hoy]
+        por_clave = cerrados.groupby('clave')['total']
+        resumen = pd.DataFrame({
+            'dias_observados': por_clave.size(),
+            'media': por_clave.mean(),
+            'm2': por_clave.var(ddof=0) * por_clave.size(),
+            'ewma': por_clave.apply(lambda s: s.ewm(alpha=alpha, adjust=False).mean().iloc[-1]),
+        })
+        de_hoy = serie[serie['fecha'] == hoy].set_index('clave')['total']
+        datos = serie.drop_duplicates('clave').set_index('clave')[['producto_id', 'producto_nombre']]
+
+        estadisticas = []
+        for clave, fila in datos.iterrows():
+            cerrado = clave in resumen.index
+            estadisticas.append(EstadisticaVentas(
+                clave=clave,
+                producto_id=None if pd.isna(fila['producto_id']) else int(fila['producto_id']),
+                producto_nombre=fila['producto_nombre'],
+                dia_actual=hoy if clave in de_hoy.index else None,
+                total_dia=float(de_hoy.get(clave, 0)),
+                dias_observados=int(resumen.at[clave, 'dias_observados']) if cerrado else 0,
+                media=float(resumen.at[clave, 'media']) if cerrado else 0,
+                m2=float(resumen.at[clave, 'm2']) if cerrado else 0,
+                ewma=float(resumen.at[clave, 'ewma']) if cerrado else 0,
+            ))
+
+        with transaction.atomic():
+            EstadisticaVentas.objects.all().delete()
+            EstadisticaVentas.objects.bulk_create(estadisticas, batch_size=1000)
+
+        return len(estadisticas)
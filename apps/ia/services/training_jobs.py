@@ -0,0 +1,267 @@
+import os
+import subprocess
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.utils import timezone
+
+from apps.ia.models import TrabajoEntrenamiento
+from .ml_service import MLService
+
+
+class TrainingJobService:
+    """
+    Encola y ejecuta entrenamientos fuera del proceso web.
+
+    Cada trabajo corre en un proceso hijo (`manage.py run_training_job`)
+    con un límite de CPU configurable. Un bloqueo consultivo garantiza que
+    solo un entrenamiento se ejecute a la vez.
+    """
+
+    # Clave del advisory lock de PostgreSQL (arbitraria, fija para el proyecto)
+    LOCK_ID = 73102611
+
+    ESTADOS_ACTIVOS = ['pendiente', 'ejecutando']
+
+    @staticmethod
+    def encolar(usuario=None, modo='auto'):
+        """
+        Crea un trabajo y lanza el proceso que lo ejecuta.
+
+        Returns:
+            tuple: (trabajo, creado). Si ya hay un trabajo activo se retorna
+            ese trabajo con creado=False.
+        """
+        trabajo, creado = TrainingJobService.crear(usuario=usuario, modo=modo)
+        if creado:
+            TrainingJobService._lanzar_proceso(trabajo)
+        return trabajo, creado
+
+    @staticmethod
+    def crear(usuario=None, modo='auto'):
+        """
+        Crea el trabajo pendiente sin lanzarlo (train_ml lo ejecuta en el
+        mismo proceso).
+
+        Returns:
+            tuple: (trabajo, creado), como encolar()
+        """
+        activo = TrainingJobService.obtener_trabajo_activo()
+        if activo:
+            return activo, False
+
+        # La restricción 'trabajo_entrenamiento_un_activo' resuelve dos
+        # solicitudes simultáneas: solo una crea el trabajo
+        try:
+            with transaction.atomic():
+                trabajo = TrabajoEntrenamiento.objects.create(
+                    solicitado_por=usuario if usuario and usuario.is_authenticated else None,
+                    modo=modo
+                )
+        except IntegrityError:
+            return TrainingJobService.obtener_trabajo_activo(), False
+
+        return trabajo, True
+
+    @staticmethod
+    def obtener_trabajo_activo():
+        """
+        Retorna el trabajo pendiente o en ejecución, descartando los que
+        dejaron de emitir latidos (proceso caído)
+        """
+        limite = timezone.now() - timedelta(seconds=settings.IA_TRAINING_TIMEOUT)
+
+        TrabajoEntrenamiento.objects.filter(
+            estado__in=TrainingJobService.ESTADOS_ACTIVOS,
+            fecha_actualizacion__lt=limite
+        ).update(
+            estado='fallido',
+            error='El trabajo dejó de emitir latidos (ver el log del trabajo en ml_models/logs/)',
+            fecha_fin=timezone.now()
+        )
+
+        return TrabajoEntrenamiento.objects.filter(
+            estado__in=TrainingJobService.ESTADOS_ACTIVOS
+        ).first()
+
+    @staticmethod
+    def ruta_log(trabajo_id):
+        return os.path.join(settings.IA_MODEL_DIR, 'logs', f'entrenamiento_{trabajo_id}.log')
+
+    @staticmethod
+    def _lanzar_proceso(trabajo):
+        manage_py = os.path.join(settings.BASE_DIR, 'manage.py')
+        ruta_log = TrainingJobService.ruta_log(trabajo.id)
+        os.makedirs(os.path.dirname(ruta_log), exist_ok=True)
+
+        # La salida del hijo queda en el log del trabajo (errores antes de reportar avance)
+        with open(ruta_log, 'ab') as log:
+            proceso = subprocess.Popen(
+                [sys.executable, manage_py, 'run_training_job', str(trabajo.id)],
+                cwd=settings.BASE_DIR,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                close_fds=True,
+                start_new_session=True,
+            )
+        TrabajoEntrenamiento.objects.filter(id=trabajo.id).update(pid=proceso.pid)
+
+        # Recolectar al hijo cuando termine para que no quede zombie en el worker
+        threading.Thread(target=proceso.wait, daemon=True).start()
+
+    @staticmethod
+    def ejecutar(trabajo_id):
+        """
+        Ejecuta el trabajo en el proceso actual (llamado desde el proceso hijo)
+        """
+        trabajo = TrabajoEntrenamiento.objects.get(id=trabajo_id)
+
+        with TrainingJobService._bloqueo_entrenamiento() as adquirido:
+            if not adquirido:
+                TrainingJobService._finalizar(
+                    trabajo, 'fallido', error='Ya hay un entrenamiento en ejecución'
+                )
+                return trabajo
+
+            TrabajoEntrenamiento.objects.filter(id=trabajo.id).update(
+                estado='ejecutando',
+                pid=os.getpid(),
+                fecha_inicio=timezone.now(),
+                fecha_actualizacion=timezone.now()
+            )
+
+            def progreso(etapa, porcentaje):
+                TrabajoEntrenamiento.objects.filter(id=trabajo.id).update(
+                    etapa=etapa,
+                    progreso=porcentaje,
+                    fecha_actualizacion=timezone.now()
+                )
+
+            with TrainingJobService._latido(trabajo.id), TrainingJobService._limitar_cpu():
+                try:
+                    resultado = MLService().entrenar(progreso=progreso, modo=trabajo.modo)
+                except Exception as e:
+                    resultado = {'success': False, 'error': str(e)}
+
+            trabajo.refresh_from_db()
+            if resultado['success']:
+                TrainingJobService._finalizar(
+                    trabajo,
+                    'completado',
+                    modelo_id=resultado['modelo_id'],
+                    resultado={
+                        'version': resultado['version'],
+                        'modo': resultado['modo'],
+                        'archivo_modelo': resultado['archivo'],
+                        'metricas': {
+                            'mae': resultado['metricas']['mae'],
+                            'mse': resultado['metricas']['mse'],
+                            'r2_score': resultado['metricas']['r2'],
+                            'registros_entrenamiento': resultado['metricas']['registros_train'],
+                            'registros_prueba': resultado['metricas']['registros_test'],
+                        },
+                    }
+                )
+            else:
+                TrainingJobService._finalizar(trabajo, 'fallido', error=resultado['error'])
+
+        return trabajo
+
+    @staticmethod
+    def _finalizar(trabajo, estado, modelo_id=None, resultado=None, error=None):
+        trabajo.estado = estado
+        trabajo.etapa = 'finalizado'
+        trabajo.progreso = 100 if estado == 'completado' else trabajo.progreso
+        trabajo.modelo_id = modelo_id
+        trabajo.resultado = resultado
+        trabajo.error = error
+        trabajo.fecha_fin = timezone.now()
+        trabajo.save()
+
+    @staticmethod
+    @contextmanager
+    def _latido(trabajo_id):
+        """
+        Actualiza fecha_actualizacion cada IA_TRAINING_HEARTBEAT segundos
+        mientras el trabajo corre: un ajuste largo pero sano no se confunde
+        con un proceso caído
+        """
+        detener = threading.Event()
+
+        def latir():
+            try:
+                while not detener.wait(settings.IA_TRAINING_HEARTBEAT):
+                    try:
+                        TrabajoEntrenamiento.objects.filter(id=trabajo_id).update(
+                            fecha_actualizacion=timezone.now()
+                        )
+                    except DatabaseError as e:
+                        print(f'⚠️ No se pudo registrar el latido del trabajo #{trabajo_id}: {e}')
+            finally:
+                connection.close()
+
+        hilo = threading.Thread(target=latir, daemon=True)
+        hilo.start()
+        try:
+            yield
+        finally:
+            detener.set()
+            hilo.join()
+
+    @staticmethod
+    @contextmanager
+    def _bloqueo_entrenamiento():
+        """
+        Bloqueo de un único ejecutor: advisory lock en PostgreSQL (válido
+        entre nodos) o flock sobre un archivo local en otros motores
+        """
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_try_advisory_lock(%s)', [TrainingJobService.LOCK_ID])
+                adquirido = cursor.fetchone()[0]
+            try:
+                yield adquirido
+            finally:
+                if adquirido:
+                    with connection.cursor() as cursor:
+                        cursor.execute('SELECT pg_advisory_unlock(%s)', [TrainingJobService.LOCK_ID])
+            return
+
+        import fcntl
+
+        os.makedirs(settings.IA_MODEL_DIR, exist_ok=True)
+        lock_path = os.path.join(settings.IA_MODEL_DIR, '.entrenamiento.lock')
+        with open(lock_path, 'w') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    @contextmanager
+    def _limitar_cpu():
+        """
+        Limita los hilos de BLAS/OpenMP y baja la prioridad del proceso
+        para no competir con los workers web
+        """
+        from threadpoolctl import threadpool_limits
+
+        if settings.IA_TRAINING_NICE:
+            try:
+                os.nice(settings.IA_TRAINING_NICE)
+            except OSError:
+                pass
+
+        limite = settings.IA_TRAINING_N_JOBS if settings.IA_TRAINING_N_JOBS > 0 else None
+        with threadpool_limits(limits=limite):
+            yield
@@ -0,0 +1,714 @@
+import os
+import shutil
+import stat
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import date, datetime, timedelta
+from io import StringIO
+from unittest import mock
+
+import joblib
+import numpy as np
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import TimeSeriesSplit
+
+from apps.categorias.models import Categoria
+from apps.core.synthetic_data import SyntheticDataGenerator
+from apps.producto_variante.models import VarianteProducto
+from apps.productos.models import Producto
+from apps.venta.models import DetalleVenta, Venta
+from apps.ia.models import (
+    AlertaAnomalia, EstadisticaVentas, ModeloEntrenamiento, PronosticoProducto, SugerenciaReposicion,
+    TrabajoEntrenamiento, VentaDiariaProducto
+)
+from apps.ia.services.alertas import AlertService
+from apps.ia.services.anomaly_detector import AnomalyDetector
+from apps.ia.services.artifact_store import ArtifactStore
+from apps.ia.services.backtesting import Backtester
+from apps.ia.services.batch_forecaster import BatchForecaster
+from apps.ia.services.feature_store import FeatureStore
+from apps.ia.services.ml_service import MLService
+from apps.ia.services.model_registry import ModelRegistry
+from apps.ia.services.monitoring import ModelMonitor
+from apps.ia.services.predictor import Predictor
+from apps.ia.services.replenishment import ReplenishmentEngine
+from apps.ia.services.streaming_detector import StreamingAnomalyDetector
+from apps.ia.services.training_jobs import TrainingJobService
+from apps.usuarios.models import Usuario
+
+
+def generar_ventas(ventas=400, dias=90, productos=8, semilla=1):
+    """
+    Ventas sintéticas reproducibles (catálogo, clientes y vendedores incluidos)
+    """
+    with redirect_stdout(StringIO()):
+        return SyntheticDataGenerator(
+            ventas=ventas, clientes=30, vendedores=2, productos=productos,
+            dias=dias, semilla=semilla
+        ).generar()
+
+
+def crear_variante(nombre='Camisa', precio=100):
+    categoria = Categoria.objects.get_or_create(nombre='Ropa', descripcion='Ropa')[0]
+    producto = Producto.objects.create(
+        nombre=nombre, descripcion=nombre, genero='Unisex', image='productos/x.jpg',
+        marca='Marca', categoria=categoria
+    )
+    return VarianteProducto.objects.create(producto=producto, talla='M', precio=precio, stock=100, stock_minimo=5)
+
+
+def crear_venta(fecha, variante, cantidad=1):
+    """
+    Venta al contado de una sola línea con la fecha indicada (fecha es auto_now_add)
+    """
+    sub_total = variante.precio * cantidad
+    venta = Venta.objects.create(tipo_venta='contado', estado='completada', total=sub_total)
+    Venta.objects.filter(id=venta.id).update(fecha=fecha)
+    venta.fecha = fecha
+    DetalleVenta.objects.create(
+        venta=venta, variante_producto=variante, cantidad=cantidad, precio_unitario=variante.precio,
+        sub_total=sub_total, nombre_producto=variante.producto.nombre, talla=variante.talla
+    )
+    return venta
+
+
+def entrenar(modo='completo'):
+    with redirect_stdout(StringIO()):
+        return MLService().entrenar(modo=modo)
+
+
+# Modelos chicos y un solo núcleo: los tests entrenan varias veces
+ENTRENAMIENTO_RAPIDO = override_settings(
+    IA_RF_N_ESTIMATORS=10,
+    IA_TRAINING_N_JOBS=1,
+    IA_ARTIFACT_BACKEND='local',
+    IA_INCREMENTAL_MIN_REGISTROS=10,
+)
+
+
+class DirectorioModelosMixin:
+    """
+    IA_MODEL_DIR e IA_ARTIFACT_DIR en directorios temporales: los tests
+    nunca tocan ml_models/ del proyecto
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.model_dir = tempfile.mkdtemp()
+        self.artifact_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.model_dir, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.artifact_dir, ignore_errors=True)
+
+        directorios = override_settings(IA_MODEL_DIR=self.model_dir, IA_ARTIFACT_DIR=self.artifact_dir)
+        directorios.enable()
+        self.addCleanup(directorios.disable)
+
+
+class TrainingJobServiceTests(TestCase):
+
+    def test_crear_retorna_el_trabajo_activo(self):
+        trabajo, creado = TrainingJobService.crear(modo='completo')
+        self.assertTrue(creado)
+
+        otro, creado = TrainingJobService.crear(modo='incremental')
+        self.assertFalse(creado)
+        self.assertEqual(otro.id, trabajo.id)
+
+    def test_un_solo_trabajo_activo_entre_estados(self):
+        TrabajoEntrenamiento.objects.create(estado='ejecutando')
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            TrabajoEntrenamiento.objects.create(estado='pendiente')
+
+        # Los trabajos terminados no cuentan
+        TrabajoEntrenamiento.objects.create(estado='completado')
+        TrabajoEntrenamiento.objects.create(estado='fallido')
+
+    @override_settings(IA_TRAINING_TIMEOUT=60)
+    def test_trabajo_sin_latido_se_marca_fallido(self):
+        trabajo = TrabajoEntrenamiento.objects.create(estado='ejecutando')
+        TrabajoEntrenamiento.objects.filter(id=trabajo.id).update(
+            fecha_actualizacion=timezone.now() - timedelta(seconds=120)
+        )
+
+        self.assertIsNone(TrainingJobService.obtener_trabajo_activo())
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.estado, 'fallido')
+
+    def test_train_ml_con_trabajo_encolado_no_falla(self):
+        trabajo = TrabajoEntrenamiento.objects.create(estado='pendiente')
+
+        salida = StringIO()
+        call_command('train_ml', stdout=salida)
+
+        self.assertIn(f'trabajo #{trabajo.id}', salida.getvalue())
+        self.assertNotIn('Error', salida.getvalue())
+        self.assertEqual(TrabajoEntrenamiento.objects.count(), 1)
+
+
+class LatidoEntrenamientoTests(TransactionTestCase):
+
+    @override_settings(IA_TRAINING_HEARTBEAT=0.05)
+    def test_latido_actualiza_el_trabajo_en_ejecucion(self):
+        trabajo = TrabajoEntrenamiento.objects.create(estado='ejecutando')
+        antes = timezone.now() - timedelta(hours=1)
+        TrabajoEntrenamiento.objects.filter(id=trabajo.id).update(fecha_actualizacion=antes)
+
+        with TrainingJobService._latido(trabajo.id):
+            time.sleep(0.3)
+
+        trabajo.refresh_from_db()
+        self.assertGreater(trabajo.fecha_actualizacion, antes)
+
+
+@override_settings(IA_ARTIFACT_BACKEND='directorio')
+class ArtifactStoreTests(DirectorioModelosMixin, TestCase):
+
+    def test_guardar_y_descargar_en_otro_nodo(self):
+        store = ArtifactStore()
+        archivo, checksum = store.guardar({'valor': [1, 2, 3]}, 'modelo_prueba')
+
+        self.assertTrue(os.path.exists(os.path.join(self.artifact_dir, archivo)))
+        modo = stat.S_IMODE(os.stat(store.ruta_local(archivo, checksum)).st_mode)
+        self.assertEqual(modo, 0o644)
+
+        # Otro nodo: caché local vacía, el artefacto se baja del directorio compartido
+        shutil.rmtree(self.model_dir)
+        os.makedirs(self.model_dir)
+        ruta = ArtifactStore().ruta_local(archivo, checksum)
+
+        self.assertEqual(joblib.load(ruta), {'valor': [1, 2, 3]})
+        self.assertEqual(
+            [nombre for nombre in os.listdir(self.model_dir) if nombre.endswith('.tmp')], []
+        )
+
+    def test_checksum_invalido(self):
+        store = ArtifactStore()
+        archivo, _ = store.guardar({'valor': 1}, 'modelo_prueba')
+        os.remove(store.ruta_local(archivo))
+
+        with self.assertRaises(ValueError):
+            store.ruta_local(archivo, '0' * 64)
+
+    def test_limpiar_conserva_el_modelo_activo(self):
+        store = ArtifactStore()
+        archivos = []
+        for i in range(3):
+            archivo, checksum = store.guardar({'valor': i}, f'modelo_{i}')
+            archivos.append(archivo)
+            ModeloEntrenamiento.objects.create(
+                version=str(i), archivo_modelo=archivo, checksum=checksum, activo=(i == 0),
+                fecha_entrenamiento=timezone.now() + timedelta(minutes=i)
+            )
+
+        store.limpiar(conservar=1)
+
+        remotos = set(os.listdir(self.artifact_dir))
+        self.assertEqual(remotos, {archivos[0], archivos[2]})
+
+
+@override_settings(IA_ARTIFACT_BACKEND='local', IA_MODEL_CHECK_INTERVAL=3600)
+class ModelRegistryTests(DirectorioModelosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        ModelRegistry.invalidar()
+        ModelRegistry._estado = (None, None, None)
+        self.addCleanup(ModelRegistry.invalidar)
+
+    def _registrar(self, version):
+        archivo, checksum = ArtifactStore().guardar({'version': version}, f'modelo_{version}')
+        ModeloEntrenamiento.objects.filter(activo=True).update(activo=False)
+        return ModeloEntrenamiento.objects.create(
+            version=version, archivo_modelo=archivo, checksum=checksum, activo=True
+        )
+
+    def test_sin_modelo_activo(self):
+        self.assertIsNone(ModelRegistry.obtener())
+
+    def test_carga_una_vez_por_proceso(self):
+        modelo = self._registrar('v1')
+
+        primero = ModelRegistry.obtener()
+        with self.assertNumQueries(0):
+            segundo = ModelRegistry.obtener()
+
+        self.assertIs(primero, segundo)
+        self.assertEqual(primero['version'], 'v1')
+        self.assertEqual(ModelRegistry.modelo_id(), modelo.id)
+
+    def test_invalidar_carga_el_nuevo_modelo_activo(self):
+        self._registrar('v1')
+        self.assertEqual(ModelRegistry.obtener()['version'], 'v1')
+
+        modelo = self._registrar('v2')
+        # Dentro del intervalo se sigue sirviendo la versión cargada
+        self.assertEqual(ModelRegistry.obtener()['version'], 'v1')
+
+        ModelRegistry.invalidar()
+        self.assertEqual(ModelRegistry.obtener()['version'], 'v2')
+        self.assertEqual(ModelRegistry.modelo_activo_id(), modelo.id)
+
+
+
+@ENTRENAMIENTO_RAPIDO
+class EntrenamientoIncrementalTests(DirectorioModelosMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generar_ventas()
+
+    def test_incremental_sin_ventas_nuevas_conserva_el_modelo(self):
+        completo = entrenar('completo')
+        self.assertTrue(completo['success'])
+
+        resultado = entrenar('incremental')
+
+        self.assertTrue(resultado['success'])
+        self.assertEqual(resultado['modo'], 'sin_cambios')
+        self.assertEqual(resultado['modelo_id'], completo['modelo_id'])
+        self.assertEqual(ModeloEntrenamiento.objects.count(), 1)
+
+    @override_settings(IA_DRIFT_FACTOR=1000)
+    def test_incremental_reentrena_el_modelo_de_anomalias(self):
+        completo = entrenar('completo')
+        generar_ventas(ventas=100, dias=3, semilla=2)
+
+        resultado = entrenar('incremental')
+
+        self.assertEqual(resultado['modo'], 'incremental')
+        modelo = ModeloEntrenamiento.objects.get(id=resultado['modelo_id'])
+        self.assertEqual(modelo.modelo_base_id, completo['modelo_id'])
+
+        datos = joblib.load(ArtifactStore().ruta_local(modelo.archivo_modelo, modelo.checksum))
+        # El RandomForest crece; el IsolationForest se ajusta de nuevo, sin árboles agregados
+        self.assertEqual(datos['modelo_ventas'].n_estimators, 10 + 10)
+        self.assertEqual(datos['modelo_anomalias'].n_estimators, 100)
+        self.assertTrue(datos['anomalias_relativas'])
+
+    def test_deriva_contra_el_ultimo_entrenamiento_completo(self):
+        completo = ModeloEntrenamiento.objects.create(
+            version='1', archivo_modelo='a.pkl.z', mae=40.0, activo=False
+        )
+        incremental = ModeloEntrenamiento.objects.create(
+            version='2', archivo_modelo='b.pkl.z', mae=5.0, activo=False,
+            tipo_entrenamiento='incremental', modelo_base=completo
+        )
+        siguiente = ModeloEntrenamiento.objects.create(
+            version='3', archivo_modelo='c.pkl.z', mae=90.0, activo=True,
+            tipo_entrenamiento='incremental', modelo_base=incremental
+        )
+
+        self.assertEqual(MLService.mae_referencia(siguiente), 40.0)
+        self.assertEqual(MLService.mae_referencia(completo), 40.0)
+
+
+
+@ENTRENAMIENTO_RAPIDO
+class ModelMonitorTests(DirectorioModelosMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generar_ventas()
+
+    def test_sin_ventas_nuevas_no_evalua(self):
+        entrenar('completo')
+
+        self.assertEqual(ModelMonitor().evaluar_modelo(), 0)
+
+        salida = StringIO()
+        call_command('monitor_ml', '--sin-reentrenar', stdout=salida)
+        self.assertNotIn('❌', salida.getvalue())
+        self.assertIn('Ventas nuevas evaluadas: 0', salida.getvalue())
+
+    def test_evalua_solo_las_ventas_posteriores_a_la_marca(self):
+        entrenar('completo')
+        generar_ventas(ventas=50, dias=2, semilla=2)
+
+        evaluados = ModelMonitor().evaluar_modelo()
+
+        modelo = ModeloEntrenamiento.objects.get(activo=True)
+        self.assertGreater(evaluados, 0)
+        self.assertEqual(modelo.registros_produccion, evaluados)
+        self.assertEqual(modelo.ultima_venta_monitoreada, Venta.objects.latest('id').id)
+        self.assertEqual(ModelMonitor().evaluar_modelo(), 0)
+
+    def test_pronostico_cerrado_se_evalua_una_vez(self):
+        FeatureStore().actualizar()
+        fila = VentaDiariaProducto.objects.order_by('-fecha').first()
+        pronostico = PronosticoProducto.objects.create(
+            producto_id=fila.producto_id, tipo_periodo='mensual', periodo='-',
+            fecha_inicio=fila.fecha, fecha_fin=fila.fecha, ventas_predichas=0,
+            ventas_historicas=0, tendencia='estable', recomendacion='-'
+        )
+
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(days=1)):
+            self.assertEqual(ModelMonitor().evaluar_pronosticos(), 1)
+            self.assertEqual(ModelMonitor().evaluar_pronosticos(), 0)
+
+        pronostico.refresh_from_db()
+        self.assertEqual(pronostico.ventas_reales, fila.ingresos)
+        self.assertEqual(pronostico.error_absoluto, float(fila.ingresos))
+
+
+class FeatureStoreTests(TestCase):
+
+    CAMPOS = [
+        'producto_id', 'fecha', 'unidades', 'ingresos', 'cantidad_detalles',
+        'promedio_movil_7d', 'promedio_movil_30d', 'ingresos_60d',
+        'ingresos_60d_anterior', 'tendencia_60d', 'ultimo_detalle_id',
+    ]
+
+    def _tabla(self):
+        return [
+            tuple(round(v, 6) if isinstance(v, float) else v for v in fila)
+            for fila in VentaDiariaProducto.objects.order_by('producto_id', 'fecha').values_list(*self.CAMPOS)
+        ]
+
+    def test_actualizar_equivale_a_reconstruir(self):
+        generar_ventas(ventas=300, dias=120)
+        FeatureStore().reconstruir()
+
+        # Ventas de los últimos días, incluidas las de días ya agregados
+        generar_ventas(ventas=60, dias=2, semilla=2)
+        FeatureStore().actualizar()
+        incremental = self._tabla()
+
+        FeatureStore().reconstruir()
+        self.assertEqual(incremental, self._tabla())
+
+    def test_actualizar_dos_veces_no_duplica(self):
+        generar_ventas(ventas=100, dias=30)
+        FeatureStore().actualizar()
+        antes = self._tabla()
+
+        FeatureStore().actualizar()
+
+        self.assertEqual(antes, self._tabla())
+        self.assertGreater(len(antes), 0)
+
+
+
+class BatchForecasterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generar_ventas(ventas=300, dias=150)
+
+    def test_lote_coincide_con_el_pronostico_por_producto(self):
+        lote = BatchForecaster().generar(periodo='mensual', cantidad_periodos=3)
+        producto_id = lote[0]['producto_id']
+
+        individual = Predictor().predecir_ventas_producto(producto_id, 'mensual', 3)
+
+        claves = ['periodo', 'fecha_inicio', 'ventas_predichas', 'cantidad_predicha', 'tendencia']
+        self.assertEqual(
+            [{c: p[c] for c in claves} for p in lote if p['producto_id'] == producto_id],
+            [{c: p[c] for c in claves} for p in individual]
+        )
+
+    def test_semanas_iso_estables_durante_la_semana(self):
+        def periodos(dia):
+            momento = timezone.make_aware(datetime.combine(dia, datetime.min.time()))
+            with mock.patch('django.utils.timezone.now', return_value=momento):
+                return BatchForecaster.calcular_periodos('semanal', 2)
+
+        lunes = periodos(date(2025, 12, 29))
+        domingo = periodos(date(2026, 1, 4))
+
+        self.assertEqual(lunes, domingo)
+        self.assertEqual(lunes[0]['fecha_inicio'], date(2025, 12, 29))
+        self.assertEqual(lunes[0]['periodo'], '2026-W01')
+
+    def test_regenerar_no_acumula_filas(self):
+        BatchForecaster().generar(periodo='semanal', cantidad_periodos=4)
+        filas = PronosticoProducto.objects.count()
+
+        BatchForecaster().generar(periodo='semanal', cantidad_periodos=4)
+
+        self.assertEqual(PronosticoProducto.objects.count(), filas)
+
+    @override_settings(IA_MONITOREO_VENTANA_DIAS=30)
+    def test_poda_los_periodos_fuera_de_la_ventana(self):
+        producto_id = BatchForecaster().generar(cantidad_periodos=1)[0]['producto_id']
+        viejo = PronosticoProducto.objects.create(
+            producto_id=producto_id, tipo_periodo='mensual', periodo='2020-01',
+            fecha_inicio=date(2020, 1, 1), fecha_fin=date(2020, 1, 31),
+            ventas_predichas=1, ventas_historicas=1, tendencia='estable', recomendacion='-'
+        )
+
+        BatchForecaster().generar(cantidad_periodos=1)
+
+        self.assertFalse(PronosticoProducto.objects.filter(id=viejo.id).exists())
+
+    def test_mide_la_duracion_del_lote(self):
+        def mediciones():
+            return REGISTRY.get_sample_value('ml_predict_seconds_count', {'operacion': 'pronostico_lote'}) or 0
+        antes = mediciones()
+
+        BatchForecaster().generar(periodo='semanal', cantidad_periodos=1)
+
+        self.assertEqual(mediciones(), antes + 1)
+
+    def test_lote_solo_para_staff(self):
+        client = APIClient()
+        client.force_authenticate(Usuario.objects.create(username='cliente_lote'))
+        self.assertEqual(client.post('/api/ia/forecast-batch/', {}, format='json').status_code, 403)
+
+        client.force_authenticate(Usuario.objects.create(username='staff_lote', is_staff=True))
+        self.assertEqual(client.post('/api/ia/forecast-batch/', {}, format='json').status_code, 200)
+
+
+
+class AlertasAnomaliaTests(DirectorioModelosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        ModelRegistry.invalidar()
+        self.addCleanup(ModelRegistry.invalidar)
+
+        # 10 días de 2 unidades y un pico de 40 hace 3 días
+        self.variante = crear_variante('Chaqueta')
+        hoy = timezone.now().date()
+        for dias in range(4, 14):
+            crear_venta(hoy - timedelta(days=dias), self.variante, 2)
+        self.dia_pico = hoy - timedelta(days=3)
+        crear_venta(self.dia_pico, self.variante, 40)
+
+    def _alertas_producto(self, alertas):
+        return [a for a in alertas if a.tipo == 'producto_anomalo']
+
+    def test_segunda_corrida_no_duplica_ni_reporta(self):
+        primera = self._alertas_producto(AnomalyDetector().detectar_anomalias())
+        self.assertEqual([(a.fecha_referencia, a.producto_id) for a in primera],
+                         [(self.dia_pico, self.variante.producto_id)])
+        self.assertIsNotNone(primera[0].pk)
+
+        self.assertEqual(AnomalyDetector().detectar_anomalias(), [])
+        self.assertEqual(AlertaAnomalia.objects.filter(tipo='producto_anomalo').count(), 1)
+
+    def test_alerta_resuelta_puede_repetirse(self):
+        alerta = self._alertas_producto(AnomalyDetector().detectar_anomalias())[0]
+        AnomalyDetector().marcar_alerta_resuelta(alerta.id)
+
+        nuevas = self._alertas_producto(AnomalyDetector().detectar_anomalias())
+
+        self.assertEqual(len(nuevas), 1)
+        self.assertNotEqual(nuevas[0].id, alerta.id)
+
+    def test_insercion_concurrente_de_la_misma_clave(self):
+        hoy = timezone.now().date()
+        existente = AlertaAnomalia.objects.create(
+            tipo='venta_alta', fecha_referencia=hoy, descripcion='-', score_anomalia=-1
+        )
+
+        def alerta(tipo):
+            return AlertaAnomalia(tipo=tipo, fecha_referencia=hoy, descripcion='-', score_anomalia=-1)
+
+        # Simula que la alerta existente se insertó después de la consulta previa
+        with mock.patch.object(AlertService, 'ESTADOS_ABIERTOS', ['revisada']):
+            insertadas = AlertService.guardar([alerta('venta_alta'), alerta('venta_baja')])
+
+        self.assertEqual([a.tipo for a in insertadas], ['venta_baja'])
+        self.assertEqual(AlertaAnomalia.objects.filter(tipo='venta_alta').get().id, existente.id)
+
+
+class LimiteAlertasTests(DirectorioModelosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        ModelRegistry.invalidar()
+        self.addCleanup(ModelRegistry.invalidar)
+
+    @override_settings(IA_ANOMALY_MAX_ALERTAS=1)
+    def test_zscore_no_se_limita(self):
+        hoy = timezone.now().date()
+        for nombre in ['Camisa', 'Falda', 'Bolso']:
+            variante = crear_variante(nombre)
+            for dias in range(4, 14):
+                crear_venta(hoy - timedelta(days=dias), variante, 2)
+            crear_venta(hoy - timedelta(days=3), variante, 40)
+
+        alertas = AnomalyDetector()._detectar_anomalias_productos(hoy - timedelta(days=30))
+
+        self.assertEqual(len(alertas), 3)
+
+    @ENTRENAMIENTO_RAPIDO
+    @override_settings(IA_ANOMALY_MAX_ALERTAS=3, IA_ANOMALY_SCORE_THRESHOLD=1.0)
+    def test_isolation_forest_retiene_los_de_menor_score(self):
+        generar_ventas(ventas=300, dias=60)
+        entrenar('completo')
+
+        with redirect_stdout(StringIO()) as salida:
+            alertas = AnomalyDetector()._detectar_anomalias_productos(
+                timezone.now().date() - timedelta(days=30)
+            )
+
+        scores = [a.score_anomalia for a in alertas]
+        self.assertEqual(len(alertas), 3)
+        self.assertEqual(scores, sorted(scores))
+        self.assertIn('descartados', salida.getvalue())
+
+
+
+class StreamingAnomalyDetectorTests(TestCase):
+
+    CAMPOS = ['clave', 'dia_actual', 'total_dia', 'dias_observados', 'media', 'm2', 'ewma']
+
+    def setUp(self):
+        self.hoy = timezone.now().date()
+        self.variante = crear_variante('Vestido')
+
+    def _registrar(self, fecha, cantidad):
+        venta = crear_venta(fecha, self.variante, cantidad)
+        return StreamingAnomalyDetector.registrar_venta(
+            fecha, venta.total, {self.variante.producto_id: ('Vestido', venta.total)}
+        )
+
+    def _estadisticas(self):
+        return [
+            tuple(round(v, 6) if isinstance(v, float) else v for v in fila)
+            for fila in EstadisticaVentas.objects.order_by('clave').values_list(*self.CAMPOS)
+        ]
+
+    def test_en_linea_equivale_a_reconstruir(self):
+        # Un día sin ventas (hace 4 días): cuenta como 0 solo en la general
+        for dias, cantidad in [(9, 3), (8, 5), (7, 2), (6, 4), (5, 6), (3, 1), (2, 7), (1, 3), (0, 2)]:
+            self._registrar(self.hoy - timedelta(days=dias), cantidad)
+        self._registrar(self.hoy, 1)
+        en_linea = self._estadisticas()
+
+        StreamingAnomalyDetector.reconstruir(dias=30)
+
+        self.assertEqual(en_linea, self._estadisticas())
+        general, producto = en_linea
+        self.assertEqual(general[3], 9)
+        self.assertEqual(producto[3], 8)
+
+    def test_alerta_de_dia_alto_una_sola_vez(self):
+        for dias, cantidad in enumerate([2, 3, 2, 4, 3, 2, 3, 2], start=1):
+            self._registrar(self.hoy - timedelta(days=9 - dias), cantidad)
+
+        primera = self._registrar(self.hoy, 40)
+        segunda = self._registrar(self.hoy, 1)
+
+        self.assertEqual({a.tipo for a in primera}, {'venta_alta', 'producto_anomalo'})
+        self.assertEqual(segunda, [])
+        self.assertEqual(AlertaAnomalia.objects.count(), 2)
+
+    def test_dia_sin_ventas_alerta_al_cerrar(self):
+        for dias, cantidad in zip(range(10, 1, -1), [10, 11, 9, 10, 12, 10, 9, 11, 10]):
+            self._registrar(self.hoy - timedelta(days=dias), cantidad)
+
+        # Nadie vendió ayer: el cierre diario lo incorpora como 0
+        alertas = StreamingAnomalyDetector.cerrar_dias(self.hoy)
+
+        self.assertEqual(
+            [(a.tipo, a.fecha_referencia) for a in alertas],
+            [('venta_baja', self.hoy - timedelta(days=1))]
+        )
+        self.assertIsNotNone(alertas[0].pk)
+        self.assertEqual(StreamingAnomalyDetector.cerrar_dias(self.hoy), [])
+
+
+class BacktesterTests(TestCase):
+
+    GRILLA = {'n_estimators': [5, 10], 'max_depth': [4], 'min_samples_split': [2]}
+
+    @classmethod
+    def setUpTestData(cls):
+        generar_ventas(ventas=300, dias=120)
+
+    def test_evalua_cada_configuracion_en_todos_los_folds(self):
+        resultados = Backtester(folds=3, procesos=2).ejecutar(grilla=self.GRILLA)
+
+        self.assertEqual(len(resultados), 2)
+        self.assertEqual({r['folds'] for r in resultados}, {3})
+        self.assertEqual([r['mae'] for r in resultados], sorted(r['mae'] for r in resultados))
+
+    def test_cada_fold_entrena_solo_con_el_pasado(self):
+        resultados = Backtester(folds=3, procesos=2).ejecutar(grilla={
+            'n_estimators': [10], 'max_depth': [4], 'min_samples_split': [2]
+        })
+
+        ml_service = MLService()
+        X, y = ml_service._construir_features(ml_service.preparar_datos_entrenamiento())
+        esperados = []
+        for train, test in TimeSeriesSplit(n_splits=3).split(X):
+            modelo = RandomForestRegressor(
+                random_state=42, n_jobs=1, n_estimators=10, max_depth=4, min_samples_split=2
+            ).fit(X.iloc[train].to_numpy(), y.iloc[train].to_numpy())
+            esperados.append(mean_absolute_error(y.iloc[test], modelo.predict(X.iloc[test].to_numpy())))
+
+        self.assertAlmostEqual(resultados[0]['mae'], float(np.mean(esperados)))
+
+    def test_sin_datos_suficientes(self):
+        with self.assertRaises(ValueError):
+            Backtester(folds=1000, procesos=1).ejecutar(grilla=self.GRILLA)
+
+
+@override_settings(IA_REPOSICION_DIAS_DEFECTO=7, IA_REPOSICION_NIVEL_SERVICIO=0.95, IA_REPOSICION_DIAS_COBERTURA=30)
+class ReplenishmentEngineTests(TestCase):
+
+    def setUp(self):
+        # Dos unidades por día en los últimos 60 días, nada en los 60 previos
+        self.variante = crear_variante('Camisa')
+        VarianteProducto.objects.filter(id=self.variante.id).update(stock=100, dias_reposicion=10)
+        for dias in range(1, 61):
+            crear_venta(timezone.now() - timedelta(days=dias), self.variante, cantidad=2)
+
+        self.sin_ventas = crear_variante('Pantalon')
+        VarianteProducto.objects.filter(id=self.sin_ventas.id).update(dias_reposicion=None)
+
+    def test_punto_de_reorden_con_demanda_constante(self):
+        self.assertEqual(ReplenishmentEngine().calcular(), 2)
+
+        sugerencia = SugerenciaReposicion.objects.get(variante=self.variante)
+        self.assertEqual(sugerencia.demanda_diaria, 2.0)
+        self.assertEqual(sugerencia.stock_seguridad, 0)
+        self.assertEqual(sugerencia.punto_reorden, 2 * 10)
+        self.assertEqual(sugerencia.nivel_objetivo, 2 * 10 + 2 * 30)
+        self.assertEqual(sugerencia.dias_cobertura, 50.0)
+
+    def test_sin_dias_de_reposicion_usa_el_valor_por_defecto(self):
+        ReplenishmentEngine().calcular()
+
+        sugerencia = SugerenciaReposicion.objects.get(variante=self.sin_ventas)
+        self.assertEqual(sugerencia.dias_reposicion, 7)
+        self.assertEqual(sugerencia.demanda_diaria, 0)
+        self.assertIsNone(sugerencia.dias_cobertura)
+
+    def test_aplicar_stock_minimo(self):
+        ReplenishmentEngine().calcular(aplicar_stock_minimo=True)
+
+        self.variante.refresh_from_db()
+        self.assertEqual(self.variante.stock_minimo, 20)
+
+    def test_recalcular_reemplaza_la_tabla(self):
+        ReplenishmentEngine().calcular()
+        ReplenishmentEngine().calcular()
+
+        self.assertEqual(SugerenciaReposicion.objects.count(), 2)
+
+    def test_endpoint_lista_solo_las_variantes_bajo_el_punto_de_reorden(self):
+        ReplenishmentEngine().calcular()
+        VarianteProducto.objects.filter(id=self.variante.id).update(stock=15)
+        client = APIClient()
+        client.force_authenticate(Usuario.objects.create(username='reposicion'))
+
+        sugerencias = client.get('/api/ia/replenishment/').json()['sugerencias']
+        todas = client.get('/api/ia/replenishment/', {'todas': 'true'}).json()['sugerencias']
+
+        self.assertEqual([s['variante'] for s in sugerencias], [self.variante.id])
+        self.assertEqual(len(todas), 2)
+
+        VarianteProducto.objects.filter(id=self.variante.id).update(stock=100)
+        self.assertEqual(client.get('/api/ia/replenishment/').json()['cantidad'], 0)
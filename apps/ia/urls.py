@@ -10,6 +10,8 @@ urlpatterns = [
     # Predicciones
     path('predict-general/', views.predict_general, name='predict-general'),
     path('predict-product/<int:producto_id>/', views.predict_product, name='predict-product'),
+    path('forecast-batch/', views.forecast_batch, name='forecast-batch'),
+    path('replenishment/', views.replenishment, name='replenishment'),
     
     # Alertas y Anomalías
     path('alerts/', views.alerts, name='alerts'),
@@ -18,6 +20,7 @@ urlpatterns = [
     
     # Modelo
     path('train/', views.train_model, name='train'),
+    path('train/<int:trabajo_id>/', views.training_job_status, name='train-status'),
     path('model-info/', views.model_info, name='model-info'),
     path('training-history/', views.training_history, name='training-history'),
 ]
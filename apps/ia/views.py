@@ -1,18 +1,20 @@
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from django.db.models import F
 from django.utils import timezone
 
-from .models import ModeloEntrenamiento, AlertaAnomalia
+from .models import ModeloEntrenamiento, AlertaAnomalia, TrabajoEntrenamiento, SugerenciaReposicion
 from .serializers import (
     ModeloEntrenamientoSerializer,
     AlertaAnomaliaSerializer,
+    TrabajoEntrenamientoSerializer,
+    SugerenciaReposicionSerializer,
     PrediccionGeneralSerializer,
     PrediccionProductoSerializer,
     MetricasModeloSerializer
 )
-from .services import MLService, Predictor, AnomalyDetector
 
 
 @api_view(['GET'])
@@ -35,6 +37,7 @@ def predict_general(request):
             )
         
         # Realizar predicción
+        from .services import Predictor
         predictor = Predictor()
         predicciones = predictor.predecir_ventas_generales(
             periodo=periodo,
@@ -72,6 +75,7 @@ def predict_product(request, producto_id):
             )
         
         # Realizar predicción
+        from .services import Predictor
         predictor = Predictor()
         predicciones = predictor.predecir_ventas_producto(
             producto_id=producto_id,
@@ -102,6 +106,85 @@ def predict_product(request, producto_id):
         )
 
 
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def forecast_batch(request):
+    try:
+        periodo = request.data.get('periodo', 'mensual')
+        cantidad = int(request.data.get('cantidad', 3))
+        productos_ids = request.data.get('productos')
+        
+        if periodo not in ['semanal', 'mensual']:
+            return Response(
+                {'error': "El período debe ser 'semanal' o 'mensual'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if cantidad < 1 or cantidad > 12:
+            return Response(
+                {'error': 'La cantidad debe estar entre 1 y 12'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if productos_ids is not None and not isinstance(productos_ids, list):
+            return Response(
+                {'error': 'productos debe ser una lista de IDs'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Pronóstico en lote (se guarda para el endpoint por producto)
+        from .services import BatchForecaster
+        pronosticos = BatchForecaster().generar(
+            productos_ids=productos_ids,
+            periodo=periodo,
+            cantidad_periodos=cantidad
+        )
+        
+        serializer = PrediccionProductoSerializer(pronosticos, many=True)
+        
+        return Response({
+            'success': True,
+            'periodo': periodo,
+            'cantidad_periodos': cantidad,
+            'cantidad_productos': len({p['producto_id'] for p in pronosticos}),
+            'fecha_prediccion': timezone.now(),
+            'predicciones': serializer.data
+        })
+        
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def replenishment(request):
+    try:
+        todas = request.query_params.get('todas', 'false').lower() == 'true'
+        
+        # Precalculado por compute_replenishment; se compara contra el stock actual
+        queryset = SugerenciaReposicion.objects.select_related('variante__producto')
+        if not todas:
+            queryset = queryset.filter(variante__stock__lte=F('punto_reorden'))
+        
+        sugerencias = queryset.order_by('dias_cobertura')
+        serializer = SugerenciaReposicionSerializer(sugerencias, many=True)
+        
+        return Response({
+            'success': True,
+            'cantidad': len(serializer.data),
+            'sugerencias': serializer.data
+        })
+        
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def alerts(request):
@@ -142,6 +225,7 @@ def detect_anomalies(request):
         dias_analisis = request.data.get('dias_analisis', 30)
         
         # Ejecutar detección
+        from .services import AnomalyDetector
         detector = AnomalyDetector()
         alertas = detector.detectar_anomalias(dias_analisis=dias_analisis)
         
@@ -172,31 +256,55 @@ def train_model(request):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Iniciar entrenamiento
-        ml_service = MLService()
-        resultado = ml_service.entrenar()
-        
-        if resultado['success']:
-            return Response({
-                'success': True,
-                'mensaje': 'Modelo entrenado exitosamente',
-                'modelo_id': resultado['modelo_id'],
-                'version': resultado['version'],
-                'metricas': {
-                    'mae': resultado['metricas']['mae'],
-                    'mse': resultado['metricas']['mse'],
-                    'r2_score': resultado['metricas']['r2'],
-                    'registros_entrenamiento': resultado['metricas']['registros_train'],
-                    'registros_prueba': resultado['metricas']['registros_test'],
-                },
-                'archivo_modelo': resultado['archivo']
-            })
-        else:
+        modo = request.data.get('modo', 'auto')
+        if modo not in ['auto', 'completo', 'incremental']:
             return Response(
-                {'error': resultado['error']},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {'error': "El modo debe ser 'auto', 'completo' o 'incremental'"},
+                status=status.HTTP_400_BAD_REQUEST
             )
         
+        # Encolar entrenamiento en un proceso separado
+        from .services import TrainingJobService
+        trabajo, creado = TrainingJobService.encolar(usuario=request.user, modo=modo)
+        serializer = TrabajoEntrenamientoSerializer(trabajo)
+        
+        if not creado:
+            return Response({
+                'success': False,
+                'mensaje': 'Ya hay un entrenamiento en curso',
+                'trabajo': serializer.data
+            }, status=status.HTTP_409_CONFLICT)
+        
+        return Response({
+            'success': True,
+            'mensaje': f'Entrenamiento encolado. Consulta GET /api/ia/train/{trabajo.id}/ para ver el avance',
+            'trabajo': serializer.data
+        }, status=status.HTTP_202_ACCEPTED)
+        
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def training_job_status(request, trabajo_id):
+    try:
+        trabajo = TrabajoEntrenamiento.objects.get(id=trabajo_id)
+        serializer = TrabajoEntrenamientoSerializer(trabajo)
+        
+        return Response({
+            'success': True,
+            'trabajo': serializer.data
+        })
+        
+    except TrabajoEntrenamiento.DoesNotExist:
+        return Response(
+            {'error': 'Trabajo no encontrado'},
+            status=status.HTTP_404_NOT_FOUND
+        )
     except Exception as e:
         return Response(
             {'error': str(e)},
@@ -208,6 +316,7 @@ def train_model(request):
 @permission_classes([IsAuthenticated])
 def model_info(request):
     try:
+        from .services import MLService, ModelMonitor
         ml_service = MLService()
         metricas = ml_service.obtener_metricas_modelo_activo()
         
@@ -216,7 +325,8 @@ def model_info(request):
             return Response({
                 'success': True,
                 'modelo_activo': True,
-                'metricas': serializer.data
+                'metricas': serializer.data,
+                'monitoreo': ModelMonitor().metricas()
             })
         else:
             return Response({
@@ -2,6 +2,7 @@ from django.db import transaction
 from django.utils import timezone
 from decimal import Decimal
 
+from apps.core.metrics import ESPERA_BLOQUEO
 from .models import Pago
 from apps.venta.models import Venta
 
@@ -14,7 +15,8 @@ class PagoService:
         # Registra un pago y actualiza el estado de la venta
         
         try:
-            venta = Venta.objects.select_for_update().get(pk=venta_id)
+            with ESPERA_BLOQUEO.labels(operacion='pago_venta').time():
+                venta = Venta.objects.select_for_update().get(pk=venta_id)
         except Venta.DoesNotExist:
             raise ValueError(f"Venta con ID {venta_id} no existe")
 
@@ -48,10 +50,11 @@ class PagoService:
             from apps.cuota.models import CuotaCredito
             
             try:
-                cuota = CuotaCredito.objects.select_for_update().get(
-                    id=cuota_id,
-                    venta=venta
-                )
+                with ESPERA_BLOQUEO.labels(operacion='pago_cuota').time():
+                    cuota = CuotaCredito.objects.select_for_update().get(
+                        id=cuota_id,
+                        venta=venta
+                    )
             except CuotaCredito.DoesNotExist:
                 raise ValueError(f"Cuota con ID {cuota_id} no existe para esta venta")
             
@@ -123,7 +126,8 @@ class PagoService:
     @transaction.atomic
     def registrar_pago_al_contado(venta_id, metodo_pago, referencia_pago=None):
         try:
-            venta = Venta.objects.select_for_update().get(pk=venta_id)
+            with ESPERA_BLOQUEO.labels(operacion='pago_venta').time():
+                venta = Venta.objects.select_for_update().get(pk=venta_id)
         except Venta.DoesNotExist:
             raise ValueError(f"Venta con ID {venta_id} no existe")
         
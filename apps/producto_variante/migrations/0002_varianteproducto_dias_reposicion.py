@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('producto_variante', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='varianteproducto',
+            name='dias_reposicion',
+            field=models.PositiveIntegerField(blank=True, help_text='Días entre el pedido y la llegada de mercadería (vacío = valor por defecto)', null=True),
+        ),
+    ]
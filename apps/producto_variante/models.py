@@ -8,6 +8,10 @@ class VarianteProducto(models.Model):
     precio = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.PositiveIntegerField()
     stock_minimo = models.PositiveIntegerField()
+    dias_reposicion = models.PositiveIntegerField(
+        null=True, blank=True,
+        help_text='Días entre el pedido y la llegada de mercadería (vacío = valor por defecto)'
+    )
 
     def __str__(self):
         return f'{self.producto.nombre} - Talla {self.talla or "Sin talla"}'
@@ -10,7 +10,7 @@ class VarianteProductoSerializer(serializers.ModelSerializer):
         model = VarianteProducto
         fields = [
             'id', 'producto', 'producto_nombre', 'talla',
-            'precio', 'stock', 'stock_minimo', 'hay_stock', 'stock_bajo'
+            'precio', 'stock', 'stock_minimo', 'dias_reposicion', 'hay_stock', 'stock_bajo'
         ]
 
     def validate(self, data):
@@ -0,0 +1,29 @@
+"""
+Management command para construir las recomendaciones "comprados juntos"
+Uso: python manage.py build_recommendations [--k 10] [--dias 365] [--min-coocurrencias 1]
+"""
+from django.core.management.base import BaseCommand
+from apps.productos.services import RecomendacionService
+
+
+class Command(BaseCommand):
+    help = 'Calcula los productos comprados juntos frecuentemente a partir de las ventas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--k', type=int, help='Recomendaciones por producto')
+        parser.add_argument('--dias', type=int, help='Días de ventas a considerar')
+        parser.add_argument('--min-coocurrencias', type=int, default=1, help='Ventas conjuntas mínimas (default: 1)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING('🛒 Construyendo recomendaciones...'))
+
+        try:
+            cantidad = RecomendacionService.construir_recomendaciones(
+                k=options['k'],
+                dias=options['dias'],
+                min_coocurrencias=options['min_coocurrencias']
+            )
+            self.stdout.write(self.style.SUCCESS(f'✅ {cantidad} recomendaciones guardadas'))
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'❌ Error: {str(e)}'))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductoRecomendado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text='Similitud coseno entre canastas (0-1)')),
+                ('coocurrencias', models.PositiveIntegerField(help_text='Ventas en las que aparecen juntos')),
+                ('posicion', models.PositiveSmallIntegerField()),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recomendaciones', to='productos.producto')),
+                ('recomendado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='productos.producto')),
+            ],
+            options={
+                'ordering': ['producto', 'posicion'],
+                'unique_together': {('producto', 'recomendado')},
+            },
+        ),
+    ]
@@ -11,3 +11,21 @@ class Producto(models.Model):
 
     def __str__(self):
         return self.nombre
+
+
+class ProductoRecomendado(models.Model):
+    """
+    Vecinos precalculados de "comprados juntos frecuentemente"
+    """
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='recomendaciones')
+    recomendado = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField(help_text='Similitud coseno entre canastas (0-1)')
+    coocurrencias = models.PositiveIntegerField(help_text='Ventas en las que aparecen juntos')
+    posicion = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ['producto', 'posicion']
+        unique_together = ['producto', 'recomendado']
+
+    def __str__(self):
+        return f'{self.producto_id} → {self.recomendado_id} ({self.score:.3f})'
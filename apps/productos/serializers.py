@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Producto
+from .models import Producto, ProductoRecomendado
 
 class ProductoSerializer(serializers.ModelSerializer):
     stock = serializers.SerializerMethodField(read_only=True)
@@ -12,4 +12,21 @@ class ProductoSerializer(serializers.ModelSerializer):
     def get_stock(self, obj):
         """Calcula el stock total sumando todas las variantes"""
         total_stock = sum(variante.stock for variante in obj.variantes.all())
-        return total_stock
\ No newline at end of file
+        return total_stock
+
+
+class ProductoResumenSerializer(serializers.ModelSerializer):
+    """Datos mínimos para listar un producto (sin variantes ni stock)"""
+    categoria_nombre = serializers.CharField(source='categoria.nombre', read_only=True)
+
+    class Meta:
+        model = Producto
+        fields = ['id', 'nombre', 'categoria_nombre', 'marca', 'image']
+
+
+class ProductoRecomendadoSerializer(serializers.ModelSerializer):
+    producto = ProductoResumenSerializer(source='recomendado', read_only=True)
+
+    class Meta:
+        model = ProductoRecomendado
+        fields = ['producto', 'score', 'coocurrencias', 'posicion']
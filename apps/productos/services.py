@@ -0,0 +1,90 @@
+import numpy as np
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from scipy import sparse
+
+from apps.venta.models import DetalleVenta
+from .models import ProductoRecomendado
+
+
+class RecomendacionService:
+
+    @staticmethod
+    def construir_recomendaciones(k=None, dias=None, min_coocurrencias=1):
+        """
+        Construye la tabla de productos comprados juntos.
+
+        Arma la matriz dispersa canastas x productos (1 si el producto está
+        en la venta), obtiene la matriz de co-ocurrencias C = Bᵀ·B y la
+        normaliza con similitud coseno: C[i, j] / √(C[i, i] · C[j, j]).
+        Para cada producto se guardan los k vecinos de mayor similitud.
+
+        Args:
+            k (int): Vecinos por producto
+            dias (int): Ventas consideradas hacia atrás
+            min_coocurrencias (int): Ventas conjuntas mínimas para recomendar
+
+        Returns:
+            int: Cantidad de recomendaciones guardadas
+        """
+        k = k or settings.PRODUCTOS_RECOMENDADOS_K
+        dias = dias or settings.PRODUCTOS_RECOMENDADOS_DIAS
+
+        canastas = np.array(
+            DetalleVenta.objects.filter(
+                venta__fecha__gte=timezone.now().date() - timedelta(days=dias)
+            ).values_list('venta_id', 'variante_producto__producto_id').distinct(),
+            dtype=np.int64
+        ).reshape(-1, 2)
+
+        if len(canastas) == 0:
+            with transaction.atomic():
+                ProductoRecomendado.objects.all().delete()
+            return 0
+
+        # Índices compactos para ventas y productos
+        ventas, fila = np.unique(canastas[:, 0], return_inverse=True)
+        productos, columna = np.unique(canastas[:, 1], return_inverse=True)
+
+        B = sparse.csr_matrix(
+            (np.ones(len(canastas), dtype=np.float64), (fila, columna)),
+            shape=(len(ventas), len(productos))
+        )
+        C = (B.T @ B).tocsr()
+
+        frecuencia = C.diagonal()
+        C.setdiag(0)
+        C.eliminate_zeros()
+
+        # Similitud coseno calculada sobre los valores no nulos de C
+        filas = np.repeat(np.arange(C.shape[0]), np.diff(C.indptr))
+        similitud = C.data / np.sqrt(frecuencia[filas] * frecuencia[C.indices])
+
+        recomendaciones = []
+        for i in range(len(productos)):
+            inicio, fin = C.indptr[i], C.indptr[i + 1]
+            vecinos = C.indices[inicio:fin]
+            scores = similitud[inicio:fin]
+            conjuntas = C.data[inicio:fin]
+
+            validos = conjuntas >= min_coocurrencias
+            vecinos, scores, conjuntas = vecinos[validos], scores[validos], conjuntas[validos]
+
+            # Top-k: desempate por co-ocurrencias
+            orden = np.lexsort((-conjuntas, -scores))[:k]
+            for posicion, j in enumerate(orden, start=1):
+                recomendaciones.append(ProductoRecomendado(
+                    producto_id=int(productos[i]),
+                    recomendado_id=int(productos[vecinos[j]]),
+                    score=round(float(scores[j]), 6),
+                    coocurrencias=int(conjuntas[j]),
+                    posicion=posicion
+                ))
+
+        with transaction.atomic():
+            ProductoRecomendado.objects.all().delete()
+            ProductoRecomendado.objects.bulk_create(recomendaciones, batch_size=1000)
+
+        return len(recomendaciones)
@@ -1,3 +1,97 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from apps.categorias.models import Categoria
+from apps.producto_variante.models import VarianteProducto
+from apps.usuarios.models import Usuario
+from apps.venta.models import DetalleVenta, Venta
+from .models import Producto, ProductoRecomendado
+from .services import RecomendacionService
+
+
+def crear_producto(nombre):
+    categoria = Categoria.objects.get_or_create(nombre='Ropa', descripcion='Ropa')[0]
+    producto = Producto.objects.create(
+        nombre=nombre, descripcion=nombre, genero='Unisex', image='productos/x.jpg',
+        marca='Marca', categoria=categoria
+    )
+    VarianteProducto.objects.create(producto=producto, talla='M', precio=100, stock=10, stock_minimo=1)
+    return producto
+
+
+def crear_venta(*productos):
+    venta = Venta.objects.create(tipo_venta='contado', estado='completada', total=100 * len(productos))
+    for producto in productos:
+        variante = producto.variantes.first()
+        DetalleVenta.objects.create(
+            venta=venta, variante_producto=variante, cantidad=1, precio_unitario=variante.precio,
+            sub_total=variante.precio, nombre_producto=producto.nombre, talla=variante.talla
+        )
+    return venta
+
+
+class RecomendacionServiceTests(TestCase):
+
+    def setUp(self):
+        self.camisa = crear_producto('Camisa')
+        self.pantalon = crear_producto('Pantalon')
+        self.gorra = crear_producto('Gorra')
+
+        crear_venta(self.camisa, self.pantalon)
+        crear_venta(self.camisa, self.pantalon)
+        crear_venta(self.camisa, self.gorra)
+
+    def test_ordena_por_similitud_coseno(self):
+        RecomendacionService.construir_recomendaciones(k=5, dias=30)
+
+        recomendados = ProductoRecomendado.objects.filter(producto=self.camisa).order_by('posicion')
+        self.assertEqual([r.recomendado_id for r in recomendados], [self.pantalon.id, self.gorra.id])
+        self.assertAlmostEqual(recomendados[0].score, 2 / 6 ** 0.5, places=5)
+        self.assertEqual(recomendados[0].coocurrencias, 2)
+
+    def test_minimo_de_coocurrencias(self):
+        RecomendacionService.construir_recomendaciones(k=5, dias=30, min_coocurrencias=2)
+
+        self.assertFalse(ProductoRecomendado.objects.filter(recomendado=self.gorra).exists())
+        self.assertFalse(ProductoRecomendado.objects.filter(producto=self.gorra).exists())
+
+    def test_reconstruir_reemplaza_la_tabla(self):
+        RecomendacionService.construir_recomendaciones(k=5, dias=30)
+        RecomendacionService.construir_recomendaciones(k=1, dias=30)
+
+        self.assertEqual(ProductoRecomendado.objects.filter(producto=self.camisa).count(), 1)
+
+
+class RecomendadosEndpointTests(TestCase):
+
+    def setUp(self):
+        self.producto = crear_producto('Camisa')
+        for posicion in range(1, 61):
+            ProductoRecomendado.objects.create(
+                producto=self.producto, recomendado=crear_producto(f'Producto {posicion}'),
+                score=1 / posicion, coocurrencias=1, posicion=posicion
+            )
+
+        self.client = APIClient()
+        self.client.force_authenticate(Usuario.objects.create(username='comprador'))
+        self.url = f'/api/productos/{self.producto.id}/recomendados/'
+
+    def test_limite_no_numerico(self):
+        respuesta = self.client.get(self.url, {'limite': 'diez'})
+
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('error', respuesta.json())
+
+    def test_limite_acotado_entre_1_y_50(self):
+        self.assertEqual(len(self.client.get(self.url, {'limite': 1000}).json()), 50)
+        self.assertEqual(len(self.client.get(self.url, {'limite': 0}).json()), 1)
+        self.assertEqual(len(self.client.get(self.url).json()), 10)
+
+    def test_serializa_un_resumen_del_producto(self):
+        primero = self.client.get(self.url, {'limite': 1}).json()[0]
+
+        self.assertEqual(primero['posicion'], 1)
+        self.assertEqual(
+            set(primero['producto']),
+            {'id', 'nombre', 'categoria_nombre', 'marca', 'image'}
+        )
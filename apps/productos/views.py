@@ -1,9 +1,9 @@
-from rest_framework import viewsets
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Producto
-from .serializers import ProductoSerializer
+from .models import Producto, ProductoRecomendado
+from .serializers import ProductoSerializer, ProductoRecomendadoSerializer
 from apps.producto_variante.serializers import VarianteProductoSerializer
 
 class ProductoViewSet(viewsets.ModelViewSet):
@@ -64,3 +64,31 @@ class ProductoViewSet(viewsets.ModelViewSet):
 
         serializer = VarianteProductoSerializer(variantes, many=True)
         return Response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    def recomendados(self, request, pk=None):
+        """
+        GET /api/productos/{id}/recomendados/
+        Productos comprados juntos frecuentemente (precalculados con
+        manage.py build_recommendations)
+
+        Query params opcionales:
+        - limite: cantidad máxima de recomendaciones, entre 1 y 50 (default: 10)
+        """
+        try:
+            limite = int(request.query_params.get('limite', 10))
+        except ValueError:
+            return Response(
+                {'error': 'El parámetro limite debe ser un número'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limite = min(max(limite, 1), 50)
+
+        recomendaciones = ProductoRecomendado.objects.filter(
+            producto_id=pk
+        ).select_related(
+            'recomendado__categoria'
+        ).order_by('posicion')[:limite]
+
+        serializer = ProductoRecomendadoSerializer(recomendaciones, many=True)
+        return Response(serializer.data)
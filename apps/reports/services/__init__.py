@@ -1,2 +1,3 @@
 # Reports services module
-# This module is intentionally empty as all report logic is now in views.py
+# La lógica de los reportes simples vive en views.py; aquí quedan los
+# cálculos pesados que las vistas consumen ya resueltos
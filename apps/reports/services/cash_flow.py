@@ -0,0 +1,177 @@
+from datetime import datetime, time, timedelta
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from apps.cuota.models import CuotaCredito, RiesgoCliente
+
+
+class CashFlowProjector:
+    """
+    Proyección de cobranza de las cuotas abiertas.
+
+    Cada cuota pendiente se paga a tiempo con la probabilidad de su cliente
+    (1 - score de RiesgoCliente, o la tasa histórica global si el cliente no
+    tiene riesgo calculado). Si no se paga a tiempo se cobra con un atraso
+    exponencial cuya media es el atraso promedio del cliente. Las cuotas ya
+    vencidas parten de hoy.
+
+    Las simulaciones Monte Carlo se hacen en bloque con NumPy y el resultado
+    queda en caché hasta el fin del día.
+    """
+
+    PERIODOS = {'semana': 'W-MON', 'mes': 'MS'}
+    ATRASO_MINIMO = 15
+    # Tope de celdas (cuotas x simulaciones) por bloque de simulación
+    CELDAS_POR_BLOQUE = 5_000_000
+
+    def __init__(self, periodo='semana', horizonte=12, simulaciones=None, semilla=42):
+        if periodo not in self.PERIODOS:
+            raise ValueError(f"Período inválido: {periodo}. Use 'semana' o 'mes'")
+        self.periodo = periodo
+        self.horizonte = horizonte
+        self.simulaciones = simulaciones or settings.REPORTS_PROYECCION_SIMULACIONES
+        self.semilla = semilla
+
+    def proyectar(self, recalcular=False):
+        """
+        Proyección por período, cacheada por día y parámetros.
+
+        Returns:
+            dict: períodos con monto programado, esperado y banda p10-p90
+        """
+        hoy = timezone.localdate()
+        clave = (
+            f'reports:proyeccion_cobranza:{hoy.isoformat()}:'
+            f'{self.periodo}:{self.horizonte}:{self.simulaciones}'
+        )
+
+        if not recalcular:
+            resultado = cache.get(clave)
+            if resultado is not None:
+                return resultado
+
+        resultado = self._simular(hoy)
+
+        manana = timezone.make_aware(datetime.combine(hoy + timedelta(days=1), time.min))
+        cache.set(clave, resultado, timeout=max(60, int((manana - timezone.now()).total_seconds())))
+        return resultado
+
+    def _simular(self, hoy):
+        inicio = pd.Timestamp(hoy).to_period(self.PERIODOS[self.periodo][0]).start_time
+        limites = pd.date_range(inicio, periods=self.horizonte + 1, freq=self.PERIODOS[self.periodo])
+
+        cuotas = pd.DataFrame.from_records(
+            CuotaCredito.objects.filter(
+                estado__in=['pendiente', 'vencida'],
+                fecha_vencimiento__lt=limites[-1].date()
+            ).values_list('venta__cliente_id', 'fecha_vencimiento', 'monto_cuota'),
+            columns=['cliente_id', 'fecha_vencimiento', 'monto_cuota']
+        )
+
+        periodos = [
+            {
+                'inicio': limites[i].date(),
+                'fin': (limites[i + 1] - pd.Timedelta(days=1)).date(),
+            }
+            for i in range(self.horizonte)
+        ]
+
+        if cuotas.empty:
+            for p in periodos:
+                p.update({'programado': 0.0, 'esperado': 0.0, 'p10': 0.0, 'p90': 0.0})
+            return self._respuesta(hoy, periodos, 0, 0.0)
+
+        probabilidad, atraso = self._parametros_clientes(cuotas['cliente_id'])
+        montos = cuotas['monto_cuota'].to_numpy(dtype=float)
+
+        # Día (relativo a hoy) en que vence cada cuota; las vencidas, hoy
+        dias = (pd.to_datetime(cuotas['fecha_vencimiento']) - pd.Timestamp(hoy)).dt.days.to_numpy()
+        vencida = dias < 0
+        base = np.maximum(dias, 0)
+        cortes = (limites - pd.Timestamp(hoy)).days.to_numpy()
+
+        rng = np.random.default_rng(self.semilla)
+        totales = np.zeros((self.simulaciones, self.horizonte))
+        bloque = max(1, self.CELDAS_POR_BLOQUE // len(montos))
+
+        for desde in range(0, self.simulaciones, bloque):
+            n = min(bloque, self.simulaciones - desde)
+
+            # Una cuota ya vencida no puede pagarse a tiempo: siempre tiene demora
+            a_tiempo = (rng.random((n, len(montos))) < probabilidad) & ~vencida
+            demora = rng.exponential(atraso, size=(n, len(montos)))
+            dia_cobro = base + np.where(a_tiempo, 0, np.ceil(demora))
+
+            # Período de cada cobro (-1 o horizonte = fuera de la proyección)
+            indice = np.searchsorted(cortes, dia_cobro, side='right') - 1
+            dentro = (indice >= 0) & (indice < self.horizonte)
+
+            filas = np.broadcast_to(np.arange(n)[:, None], indice.shape)
+            totales[desde:desde + n] = np.bincount(
+                (filas * self.horizonte + indice)[dentro],
+                weights=np.broadcast_to(montos, indice.shape)[dentro],
+                minlength=n * self.horizonte
+            ).reshape(n, self.horizonte)
+
+        programado = np.bincount(
+            np.clip(np.searchsorted(cortes, base, side='right') - 1, 0, self.horizonte - 1),
+            weights=montos,
+            minlength=self.horizonte
+        )
+        esperado = totales.mean(axis=0)
+        p10, p90 = np.percentile(totales, [10, 90], axis=0)
+
+        for i, p in enumerate(periodos):
+            p.update({
+                'programado': round(float(programado[i]), 2),
+                'esperado': round(float(esperado[i]), 2),
+                'p10': round(float(p10[i]), 2),
+                'p90': round(float(p90[i]), 2),
+            })
+
+        return self._respuesta(hoy, periodos, len(montos), float(montos.sum()))
+
+    @staticmethod
+    def _parametros_clientes(clientes):
+        """
+        Probabilidad de pago a tiempo y atraso medio (días) de cada cuota
+        según su cliente
+        """
+        riesgos = pd.DataFrame.from_records(
+            RiesgoCliente.objects.filter(
+                cliente_id__in=clientes.dropna().unique()
+            ).values_list('cliente_id', 'score', 'dias_atraso_promedio'),
+            columns=['cliente_id', 'score', 'dias_atraso_promedio']
+        ).set_index('cliente_id')
+
+        # Valores globales para ventas sin cliente o clientes sin riesgo calculado
+        pagadas = CuotaCredito.objects.filter(estado='pagada', fecha_pago__isnull=False)
+        total_pagadas = pagadas.count()
+        probabilidad_global = (
+            pagadas.filter(fecha_pago__lte=F('fecha_vencimiento')).count() / total_pagadas
+            if total_pagadas else 0.8
+        )
+        atraso_global = float(riesgos['dias_atraso_promedio'].mean()) if not riesgos.empty else 0.0
+
+        por_cuota = riesgos.reindex(clientes.to_numpy())
+        probabilidad = (1 - por_cuota['score']).fillna(probabilidad_global).to_numpy(dtype=float)
+        atraso = np.maximum(
+            por_cuota['dias_atraso_promedio'].fillna(atraso_global).to_numpy(dtype=float),
+            CashFlowProjector.ATRASO_MINIMO
+        )
+        return probabilidad, atraso
+
+    def _respuesta(self, hoy, periodos, cuotas, monto_abierto):
+        return {
+            'fecha_calculo': hoy,
+            'periodo': self.periodo,
+            'simulaciones': self.simulaciones,
+            'cuotas_abiertas': cuotas,
+            'monto_abierto': round(monto_abierto, 2),
+            'periodos': periodos,
+        }
@@ -6,7 +6,8 @@ from .views import (
     ventas_por_categoria_view,
     clientes_frecuentes_view,
     inventario_critico_view,
-    estado_creditos_view
+    estado_creditos_view,
+    proyeccion_cobranza_view
 )
 
 urlpatterns = [
@@ -22,4 +23,5 @@ urlpatterns = [
     path('clientes-frecuentes/', clientes_frecuentes_view, name='clientes-frecuentes'),
     path('inventario-critico/', inventario_critico_view, name='inventario-critico'),
     path('estado-creditos/', estado_creditos_view, name='estado-creditos'),
+    path('proyeccion-cobranza/', proyeccion_cobranza_view, name='proyeccion-cobranza'),
 ]
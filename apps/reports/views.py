@@ -519,4 +519,49 @@ def estado_creditos_view(request):
         return Response(
             {"error": str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        )
+
+
+@api_view(['GET'])
+def proyeccion_cobranza_view(request):
+    """
+    GET /api/v1/reports/proyeccion-cobranza/?periodo=semana&horizonte=12
+
+    Cobranza esperada de las cuotas abiertas por semana o mes, con banda
+    de confianza p10-p90 (Monte Carlo). Se calcula una vez por día.
+
+    Query params opcionales:
+    - periodo: 'semana' o 'mes' (default: semana)
+    - horizonte: cantidad de períodos (default: 12)
+    - recalcular: true para ignorar la caché del día
+    """
+    try:
+        periodo = request.query_params.get('periodo', 'semana')
+        horizonte = int(request.query_params.get('horizonte', 12))
+        recalcular = request.query_params.get('recalcular', 'false').lower() == 'true'
+
+        if not 1 <= horizonte <= 104:
+            return Response(
+                {"error": "horizonte debe estar entre 1 y 104"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Import diferido: numpy/pandas solo se cargan al usar el reporte
+        from .services.cash_flow import CashFlowProjector
+
+        proyeccion = CashFlowProjector(periodo=periodo, horizonte=horizonte).proyectar(
+            recalcular=recalcular
+        )
+
+        return Response(proyeccion, status=status.HTTP_200_OK)
+
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except Exception as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
@@ -5,6 +5,7 @@ from datetime import timedelta
 
 from apps.cuota.models import CuotaCredito
 from apps.core.services.notifications_service import NotificationService
+from apps.core.metrics import CHECKOUT_ETAPA, ESPERA_BLOQUEO, Cronometro
 
 from .models import Venta, DetalleVenta
 from apps.producto_variante.models import VarianteProducto
@@ -33,6 +34,8 @@ class VentaService:
         """
         Crea una venta completa con sus detalles, reducción de stock y cuotas
         """
+        cronometro = Cronometro(CHECKOUT_ETAPA)
+
         # Validar vendedor (opcional)
         vendedor = None
         nombre_vendedor = None
@@ -59,9 +62,10 @@ class VentaService:
         print("🔍 Validando stock...")
         for item in items:
             try:
-                variante = VarianteProducto.objects.select_for_update().get(
-                    id=item['variante_id']
-                )
+                with ESPERA_BLOQUEO.labels(operacion='checkout_stock').time():
+                    variante = VarianteProducto.objects.select_for_update().get(
+                        id=item['variante_id']
+                    )
             except VarianteProducto.DoesNotExist:
                 raise ValueError(f"Variante con ID {item['variante_id']} no existe")
 
@@ -126,11 +130,15 @@ class VentaService:
                 if cliente.rol != 'cliente':
                     raise ValueError(f"El usuario {cliente.username} debe tener rol 'cliente'")
                 print(f"👤 Cliente registrado: {cliente.email}")
+                if tipo_venta == 'credito':
+                    VentaService._informar_riesgo(cliente)
             except Usuario.DoesNotExist:
                 raise ValueError(f"Cliente con ID {cliente_id} no existe")
         else:
             print("👤 Venta sin cliente registrado (datos manuales)")
 
+        cronometro.marcar('validacion')
+
         print("📝 Creando venta...")
         venta = Venta.objects.create(
             cliente=cliente,
@@ -177,9 +185,15 @@ class VentaService:
             print(f"   ✓ {detalle_data['nombre_producto']}{talla_info} x{detalle_data['cantidad']} "
                   f"(Stock: {stock_anterior} → {variante.stock})")
 
+        cronometro.marcar('registro_y_stock')
+
         if tipo_venta == 'credito':
             print("📅 Creando cuotas...")
             VentaService._crear_cuotas(venta, plazo_meses, cuota_mensual)
+            cronometro.marcar('cuotas')
+
+        # 📈 Actualizar estadísticas de anomalías cuando la venta se confirme
+        VentaService._registrar_estadisticas(venta, detalles_data)
 
         # 🔔 Enviar notificación al cliente si tiene token FCM
         if venta.cliente and venta.cliente.fcm_token:
@@ -201,10 +215,28 @@ class VentaService:
                 # No romper la transacción si falla la notificación
                 print(f"⚠️ Error enviando notificación: {str(e)}")
 
+        cronometro.marcar('notificacion')
+
         print(f"🎉 Venta #{venta.pk} completada exitosamente")
         return venta
 
 
+    @staticmethod
+    def _informar_riesgo(cliente):
+        """
+        Muestra el riesgo crediticio precalculado del cliente (una fila
+        indexada de RiesgoCliente, sin recorrer su historial)
+        """
+        from apps.cuota.models import RiesgoCliente
+
+        riesgo = RiesgoCliente.objects.filter(cliente=cliente).only('score', 'nivel').first()
+        if riesgo is None:
+            print("   ℹ️ Cliente sin riesgo crediticio calculado")
+        elif riesgo.nivel == 'alto':
+            print(f"   ⚠️ Riesgo crediticio ALTO (score {riesgo.score:.2f})")
+        else:
+            print(f"   🏦 Riesgo crediticio {riesgo.nivel} (score {riesgo.score:.2f})")
+
     @staticmethod
     def _crear_cuotas(venta, plazo_meses, cuota_mensual):
         """
@@ -233,3 +265,33 @@ class VentaService:
                   f"Vence: {fecha_vencimiento} - "
                   f"Monto: {cuota_mensual}")
 
+    @staticmethod
+    def _registrar_estadisticas(venta, detalles_data):
+        """
+        Programa la actualización de la detección de anomalías en línea para
+        después del commit (si la venta se revierte no se cuenta)
+
+        Args:
+            venta (Venta): Instancia de la venta
+            detalles_data (list): Detalles calculados en crear_venta
+        """
+        montos_productos = {}
+        for detalle_data in detalles_data:
+            producto_id = detalle_data['variante'].producto_id
+            nombre, monto = montos_productos.get(producto_id, (detalle_data['nombre_producto'], 0))
+            montos_productos[producto_id] = (nombre, monto + detalle_data['sub_total'])
+
+        def registrar():
+            from apps.ia.services.streaming_detector import StreamingAnomalyDetector
+
+            try:
+                alertas = StreamingAnomalyDetector.registrar_venta(
+                    venta.fecha, venta.total, montos_productos
+                )
+                for alerta in alertas:
+                    print(f"🚨 {alerta.get_tipo_display()}: {alerta.descripcion}")
+            except Exception as e:
+                # La venta ya está confirmada; no propagar el error
+                print(f"⚠️ Error actualizando estadísticas de anomalías: {str(e)}")
+
+        transaction.on_commit(registrar)
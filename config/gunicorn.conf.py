@@ -0,0 +1,31 @@
+"""
+Configuración de gunicorn
+Uso: gunicorn config.wsgi:application -c config/gunicorn.conf.py
+
+Las métricas de Prometheus se agregan entre workers a través de archivos en
+PROMETHEUS_MULTIPROC_DIR: el directorio se vacía al arrancar el master y cada
+worker que termina se marca como muerto.
+"""
+import os
+import shutil
+
+# Importado como módulo: gunicorn interpreta el nombre `config` como opción
+import decouple
+
+bind = decouple.config('GUNICORN_BIND', default='0.0.0.0:8000')
+workers = decouple.config('GUNICORN_WORKERS', default=3, cast=int)
+timeout = decouple.config('GUNICORN_TIMEOUT', default=60, cast=int)
+
+# Debe existir antes de que los workers importen prometheus_client
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus_multiproc')
+
+
+def on_starting(server):
+    directorio = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(directorio, ignore_errors=True)
+    os.makedirs(directorio, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
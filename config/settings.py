@@ -36,12 +36,24 @@ AWS_QUERYSTRING_AUTH = False  # No incluir query strings en las URLs
 AWS_S3_SIGNATURE_VERSION = 's3v4'
 
 # Storage backends
-DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
-STATICFILES_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
-
-# Media files URL
-MEDIA_URL = f'https://{AWS_S3_CUSTOM_DOMAIN}/'
-MEDIA_ROOT = ''  # No usar MEDIA_ROOT con S3
+# 's3': archivos de media en el bucket (producción)
+# 'local': sistema de archivos en MEDIA_ROOT (tests y ejecución sin conexión)
+STORAGE_BACKEND = config('STORAGE_BACKEND', default='s3')
+
+if STORAGE_BACKEND == 's3':
+    STORAGES = {
+        'default': {'BACKEND': 'storages.backends.s3boto3.S3Boto3Storage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    }
+    MEDIA_URL = f'https://{AWS_S3_CUSTOM_DOMAIN}/'
+    MEDIA_ROOT = ''  # No usar MEDIA_ROOT con S3
+else:
+    STORAGES = {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    }
+    MEDIA_URL = 'media/'
+    MEDIA_ROOT = BASE_DIR / 'media'
 ALLOWED_HOSTS = ['*']
 
 CORS_ALLOW_ALL_ORIGINS = True
@@ -85,7 +97,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'apps.core.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'apps.core.middleware.GZipUmbralMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -126,9 +140,26 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='mypass'),
         'HOST': config('DB_HOST', default='127.0.0.1'),
         'PORT': config('DB_PORT', default='5433'),
+        # Conexiones persistentes: se reutilizan entre peticiones del mismo
+        # worker y se verifican antes de usarse tras un período inactivo
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
     }
 }
 
+# Pool de conexiones en el proceso (requiere psycopg 3 y psycopg-pool).
+# Reemplaza a las conexiones persistentes: Django exige CONN_MAX_AGE = 0.
+# max_size limita las conexiones abiertas por cada worker.
+if config('DB_POOL', default=False, cast=bool) and 'postgresql' in DATABASES['default']['ENGINE']:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+        },
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -155,6 +186,42 @@ USE_TZ = True
 STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Caché compartida (segundo nivel de apps.core.cache)
+# 'redis': REDIS_URL (producción, compartida entre workers y nodos)
+# 'locmem': memoria del proceso | 'file': directorio CACHE_DIR (ejecución local)
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('REDIS_URL', default='redis://127.0.0.1:6379/1'),
+            'KEY_PREFIX': 'boutique',
+        }
+    }
+elif CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': config('CACHE_DIR', default=str(BASE_DIR / '.cache')),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'boutique',
+        }
+    }
+
+# Primer nivel (LRU por proceso): tamaño máximo y vigencia de sus entradas
+CACHE_LOCAL_MAX_ITEMS = config('CACHE_LOCAL_MAX_ITEMS', default=1024, cast=int)
+CACHE_LOCAL_TTL = config('CACHE_LOCAL_TTL', default=30, cast=int)
+# Vigencia por defecto en la caché compartida
+CACHE_DEFAULT_TTL = config('CACHE_DEFAULT_TTL', default=300, cast=int)
+# Cada cuántos segundos un worker revisa la versión de un espacio de nombres
+CACHE_VERSION_TTL = config('CACHE_VERSION_TTL', default=5, cast=int)
+
 
 # Configuración de Email
 EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
@@ -165,20 +232,6 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='')
 
-from django.core.files.storage import default_storage
-print(f"📦 Django está usando: {default_storage.__class__.__name__}")
-print("🔐 AWS KEY:", config('AWS_ACCESS_KEY_ID'))
-from storages.backends.s3boto3 import S3Boto3Storage
-from django.core.files.storage import default_storage
-
-print(f"🧪 BEFORE OVERRIDE: {default_storage.__class__.__name__}")
-
-# Reemplazar default_storage si no es S3
-if not isinstance(default_storage, S3Boto3Storage):
-    default_storage._wrapped = S3Boto3Storage() # type: ignore
-
-print(f"🧪 AFTER OVERRIDE: {default_storage.__class__.__name__}")
-
 # Configuración de REST Framework
 from datetime import timedelta
 
@@ -186,6 +239,52 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    # JSON con orjson y MessagePack según el header Accept / Content-Type
+    'DEFAULT_RENDERER_CLASSES': (
+        'apps.core.renderers.ORJSONRenderer',
+        'apps.core.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'apps.core.parsers.ORJSONParser',
+        'apps.core.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+}
+
+# Tamaño mínimo de respuesta (bytes) para comprimirla con gzip
+API_GZIP_MIN_BYTES = config('API_GZIP_MIN_BYTES', default=1024, cast=int)
+
+# Instrumentación por petición (apps.core.middleware.PerformanceMiddleware): los headers
+# Server-Timing y X-Possible-N-Plus-One exponen detalles internos, solo en entornos de desarrollo
+PERF_SERVER_TIMING = config('PERF_SERVER_TIMING', default=False, cast=bool)
+# Peticiones lentas (ms), repeticiones de una consulta que cuentan como posible N+1
+# y fracción de esas peticiones que se registran en el log
+PERF_SLOW_MS = config('PERF_SLOW_MS', default=500, cast=int)
+PERF_N_MAS_1_UMBRAL = config('PERF_N_MAS_1_UMBRAL', default=10, cast=int)
+PERF_SAMPLE_RATE = config('PERF_SAMPLE_RATE', default=1.0, cast=float)
+# Captura de consultas lentas (manage.py slow_queries): umbral en ms (0 = desactivada)
+# y fracción de ellas a las que se les obtiene el plan con EXPLAIN
+DB_SLOW_QUERY_MS = config('DB_SLOW_QUERY_MS', default=0, cast=int)
+DB_SLOW_QUERY_EXPLAIN_RATE = config('DB_SLOW_QUERY_EXPLAIN_RATE', default=0.1, cast=float)
+# Acceso a /metrics: se acepta la petición si trae 'Authorization: Bearer <token>'
+# o si REMOTE_ADDR está entre las IPs permitidas (separadas por coma); si no, 404
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_IPS_PERMITIDAS = config('METRICS_IPS_PERMITIDAS', default='127.0.0.1', cast=Csv())
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'mensaje': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'mensaje'},
+    },
+    'loggers': {
+        'apps.performance': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
 }
 
 SIMPLE_JWT = {
@@ -198,3 +297,68 @@ SIMPLE_JWT = {
 # Firebase Configuration
 import os
 FIREBASE_CREDENTIAL_PATH = os.path.join(BASE_DIR, 'firebase', 'project-boutique-firebase-adminsdk-fbsvc-7169b4f99d.json')
+
+# Módulo IA
+# Segundos entre verificaciones de la versión activa del modelo en cada worker
+IA_MODEL_CHECK_INTERVAL = config('IA_MODEL_CHECK_INTERVAL', default=30, cast=int)
+# Mapear en memoria los arrays del modelo en lugar de copiarlos al heap
+IA_MODEL_MMAP = config('IA_MODEL_MMAP', default=True, cast=bool)
+# Días hacia atrás que update_feature_store vuelve a agregar (ventas confirmadas tarde)
+IA_FEATURE_STORE_DIAS_RELECTURA = config('IA_FEATURE_STORE_DIAS_RELECTURA', default=2, cast=int)
+# Núcleos usados por los entrenamientos (n_jobs de scikit-learn, -1 = todos)
+IA_TRAINING_N_JOBS = config('IA_TRAINING_N_JOBS', default=2, cast=int)
+# Incremento de "nice" del proceso de entrenamiento (0 = misma prioridad)
+IA_TRAINING_NICE = config('IA_TRAINING_NICE', default=10, cast=int)
+# Segundos entre latidos de un trabajo en ejecución y segundos sin latido tras
+# los cuales se considera caído
+IA_TRAINING_HEARTBEAT = config('IA_TRAINING_HEARTBEAT', default=30, cast=int)
+IA_TRAINING_TIMEOUT = config('IA_TRAINING_TIMEOUT', default=300, cast=int)
+# Entrenamiento incremental
+IA_FULL_RETRAIN_DAYS = config('IA_FULL_RETRAIN_DAYS', default=7, cast=int)
+IA_INCREMENTAL_ARBOLES = config('IA_INCREMENTAL_ARBOLES', default=10, cast=int)
+IA_INCREMENTAL_MIN_REGISTROS = config('IA_INCREMENTAL_MIN_REGISTROS', default=50, cast=int)
+# Factor sobre el MAE del modelo base a partir del cual se fuerza un entrenamiento completo
+IA_DRIFT_FACTOR = config('IA_DRIFT_FACTOR', default=1.5, cast=float)
+# Monitoreo en producción (manage.py monitor_ml): registros mínimos antes de declarar
+# deriva, ventana de precisión de pronósticos y reentrenamiento automático
+IA_DRIFT_MIN_REGISTROS = config('IA_DRIFT_MIN_REGISTROS', default=50, cast=int)
+IA_MONITOREO_VENTANA_DIAS = config('IA_MONITOREO_VENTANA_DIAS', default=90, cast=int)
+IA_DRIFT_AUTO_RETRAIN = config('IA_DRIFT_AUTO_RETRAIN', default=True, cast=bool)
+# Umbral del score del IsolationForest (decision_function) bajo el cual un
+# producto-día se reporta como anómalo; 0 es la frontera del modelo (10% de los días)
+IA_ANOMALY_SCORE_THRESHOLD = config('IA_ANOMALY_SCORE_THRESHOLD', default=-0.1, cast=float)
+# Máximo de alertas de producto por corrida del IsolationForest (las de menor score)
+IA_ANOMALY_MAX_ALERTAS = config('IA_ANOMALY_MAX_ALERTAS', default=20, cast=int)
+# Z-score usado cuando no hay modelo entrenado
+IA_ANOMALY_ZSCORE_PRODUCTO = config('IA_ANOMALY_ZSCORE_PRODUCTO', default=2.5, cast=float)
+# Peso del último día en el promedio exponencial de la detección en línea
+IA_STREAMING_EWMA_ALPHA = config('IA_STREAMING_EWMA_ALPHA', default=0.2, cast=float)
+# Directorio local de modelos: caché de artefactos, logs y bloqueo de entrenamiento
+IA_MODEL_DIR = config('IA_MODEL_DIR', default=os.path.join(BASE_DIR, 'ml_models'))
+# Almacén de artefactos de modelos: 'local', 'directorio' (IA_ARTIFACT_DIR compartido) o 's3'
+IA_ARTIFACT_BACKEND = config('IA_ARTIFACT_BACKEND', default='local')
+IA_ARTIFACT_DIR = config('IA_ARTIFACT_DIR', default=os.path.join(BASE_DIR, 'ml_artifacts'))
+IA_ARTIFACT_S3_PREFIX = config('IA_ARTIFACT_S3_PREFIX', default='ml_models')
+# Cantidad de artefactos que se conservan (además del modelo activo)
+IA_ARTIFACT_KEEP = config('IA_ARTIFACT_KEEP', default=5, cast=int)
+# Nivel de compresión zlib (1-9)
+IA_ARTIFACT_COMPRESS = config('IA_ARTIFACT_COMPRESS', default=3, cast=int)
+# Hiperparámetros del RandomForest de ventas (elegir con manage.py backtest_ml; max_depth 0 = sin límite)
+IA_RF_N_ESTIMATORS = config('IA_RF_N_ESTIMATORS', default=100, cast=int)
+IA_RF_MAX_DEPTH = config('IA_RF_MAX_DEPTH', default=10, cast=int)
+IA_RF_MIN_SAMPLES_SPLIT = config('IA_RF_MIN_SAMPLES_SPLIT', default=5, cast=int)
+# Reposición de stock (manage.py compute_replenishment)
+IA_REPOSICION_DIAS_DEFECTO = config('IA_REPOSICION_DIAS_DEFECTO', default=7, cast=int)
+IA_REPOSICION_NIVEL_SERVICIO = config('IA_REPOSICION_NIVEL_SERVICIO', default=0.95, cast=float)
+IA_REPOSICION_DIAS_COBERTURA = config('IA_REPOSICION_DIAS_COBERTURA', default=30, cast=int)
+
+# Recomendaciones "comprados juntos" (manage.py build_recommendations)
+PRODUCTOS_RECOMENDADOS_K = config('PRODUCTOS_RECOMENDADOS_K', default=10, cast=int)
+PRODUCTOS_RECOMENDADOS_DIAS = config('PRODUCTOS_RECOMENDADOS_DIAS', default=365, cast=int)
+
+# Riesgo crediticio de clientes (manage.py compute_credit_risk): umbrales del score
+CUOTA_RIESGO_UMBRAL_MEDIO = config('CUOTA_RIESGO_UMBRAL_MEDIO', default=0.3, cast=float)
+CUOTA_RIESGO_UMBRAL_ALTO = config('CUOTA_RIESGO_UMBRAL_ALTO', default=0.6, cast=float)
+
+# Proyección de cobranza (/api/reports/proyeccion-cobranza/): simulaciones Monte Carlo
+REPORTS_PROYECCION_SIMULACIONES = config('REPORTS_PROYECCION_SIMULACIONES', default=2000, cast=int)
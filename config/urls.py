@@ -2,6 +2,7 @@
 from unittest.mock import patch
 from django.contrib import admin
 from django.urls import path, include
+from apps.core.views import metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -14,4 +15,6 @@ urlpatterns = [
     path('api/', include("apps.cuota.urls")),
     path('api/reports/', include("apps.reports.urls")),
     path('api/ia/', include("apps.ia.urls")),
+    path('api/core/', include("apps.core.urls")),
+    path('metrics', metrics, name='metrics'),
 ]